@@ -11,10 +11,23 @@ Usage:
     python main.py --api-key YOUR_API_KEY
     python main.py --output-dir /path/to/output
     python main.py --generate-image --leonardo-key YOUR_LEONARDO_KEY
+    python main.py --build-corpus
+    python main.py --stage render_zh
+    python main.py --backfill --since 2026-01-01
+    python main.py --search '"Channel of Struggle"'
+    python main.py --build-site
+    python main.py --build-variants
+    python main.py --prefetch-gates
+    python main.py --metrics-textfile /var/lib/node_exporter/textfile/ihds.prom
+    python main.py --profile --force
+    python main.py --when-due
+    python main.py --daemon --health-port 8787
+    python main.py --lookahead
 """
 
 import os
 import sys
+import time
 import argparse
 from pathlib import Path
 
@@ -39,6 +52,51 @@ Examples:
     # 生成 AI 艺术海报
     python main.py --generate-image
     python main.py --generate-image --leonardo-key YOUR_KEY
+    
+    # 从历史归档构建双语语料库
+    python main.py --build-corpus
+    
+    # 只重跑某个阶段（上游输入取自已保存的内容），或跳过某个阶段
+    python main.py --stage render_zh
+    python main.py --skip-stage ai_prompt
+    
+    # 修改模板后，离线重新生成历史归档
+    python main.py --backfill
+    python main.py --backfill --since 2026-01-01 --until 2026-01-31 --workers 4
+    
+    # 全文检索历史归档（中英文）
+    python main.py --search '"Channel of Struggle"'
+    python main.py --search 掙扎 --search-lang zh --limit 5
+    
+    # 按本地星历调度：当前 Gate.Line 已抓取时直接退出（定时任务每小时运行）
+    python main.py --when-due
+    python main.py --next-run
+    python main.py --verify-ephemeris
+    
+    # 常驻模式：睡到下一次计划的检查，页面变化时才运行完整流程
+    python main.py --daemon
+    python main.py --daemon --health-port 8787 --retry-interval 10
+    
+    # 运行结束后为下一个 Gate 预下载图片、预热翻译缓存
+    python main.py --lookahead
+    python main.py --daemon --lookahead
+    
+    # 增量生成静态网站（每天一页、Gate 索引、月历）
+    python main.py --build-site
+    python main.py --build-site --site-dir ./public --force
+    
+    # 为图片收藏目录生成缩略图、JPEG 与 WebP 变体，Markdown、网站和订阅源引用较小的版本
+    python main.py --build-variants --workers 4
+    
+    # 校验 64 张 Gate 图片，并行补齐缺失或损坏的图片（校验和记录在 gate_images.json）
+    python main.py --prefetch-gates
+    python main.py --prefetch-gates --workers 8
+    
+    # 生成了内容的运行的耗时与成本指标写入 logs/metrics.jsonl，Prometheus 文本文件可指定路径
+    python main.py --metrics-textfile /var/lib/node_exporter/textfile/ihds.prom
+    
+    # 性能分析：各阶段的热点函数、内存峰值与最大分配位置写入当天日期目录的 profile/
+    python main.py --profile --force
         """
     )
     
@@ -56,6 +114,227 @@ Examples:
         help='输出目录 (默认: output/daily_views/)'
     )
     
+    # 翻译参数
+    parser.add_argument(
+        '--translate-workers',
+        type=int,
+        default=4,
+        help='并发翻译的线程数，1 表示逐个翻译 (默认: 4)'
+    )
+    
+    parser.add_argument(
+        '--translate-deadline',
+        type=float,
+        default=120,
+        help='整次翻译的截止时间（秒），超时字段保留英文原文 (默认: 120)'
+    )
+    
+    parser.add_argument(
+        '--no-batch-translate',
+        action='store_true',
+        help='关闭批量翻译，每个字段单独请求一次 DeepSeek'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='关闭翻译缓存 (默认缓存于 output/.cache/translations.sqlite3)'
+    )
+    
+    parser.add_argument(
+        '--no-translation-memory',
+        action='store_true',
+        help='关闭句段级翻译记忆，按整个字段翻译'
+    )
+    
+    parser.add_argument(
+        '--no-corpus',
+        action='store_true',
+        help='不使用 Gate.Line 双语语料库，所有字段都重新翻译'
+    )
+    
+    parser.add_argument(
+        '--build-corpus',
+        action='store_true',
+        help='从历史归档构建 Gate.Line 双语语料库后退出'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='即使页面与上次运行相同也重新处理'
+    )
+    
+    # 流水线阶段
+    stage_names = [stage[0] for stage in DailyViewFetcher.STAGES]
+    parser.add_argument(
+        '--stage',
+        action='append',
+        choices=stage_names,
+        metavar='STAGE',
+        help=f'只重跑该阶段，上游输入取自已保存的 content_{{date}}.json，可重复指定 (可选: {", ".join(stage_names)})'
+    )
+    
+    parser.add_argument(
+        '--skip-stage',
+        action='append',
+        choices=stage_names,
+        metavar='STAGE',
+        help='跳过该阶段，依赖它的阶段也会被跳过，可重复指定'
+    )
+    
+    # 历史归档回填
+    parser.add_argument(
+        '--backfill',
+        action='store_true',
+        help='用已保存的内容离线重新生成历史归档的 Markdown 与提示词后退出'
+    )
+    
+    parser.add_argument(
+        '--since',
+        type=str,
+        default=None,
+        help='回填的起始日期（含），格式 YYYY-MM-DD'
+    )
+    
+    parser.add_argument(
+        '--until',
+        type=str,
+        default=None,
+        help='回填的结束日期（含），格式 YYYY-MM-DD'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='回填与生成图片变体使用的进程数 (默认: CPU 核数)；预取 Gate 图片的下载线程数 (默认: 4)'
+    )
+    
+    # 全文检索
+    parser.add_argument(
+        '--search',
+        type=str,
+        default=None,
+        metavar='QUERY',
+        help='检索历史归档，按相关度列出日期和 Gate.Line 后退出（双引号括起的部分按短语匹配）'
+    )
+    
+    parser.add_argument(
+        '--search-lang',
+        choices=['en', 'zh'],
+        default=None,
+        help='只检索英文或中文版 (默认: 两者)'
+    )
+    
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='检索结果的最大数量 (默认: 20)'
+    )
+    
+    # 星历调度
+    parser.add_argument(
+        '--when-due',
+        action='store_true',
+        help='按本地星历判断：太阳所在的 Gate.Line 已抓取时不访问网络直接退出'
+    )
+    
+    parser.add_argument(
+        '--next-run',
+        action='store_true',
+        help='显示太阳当前所在的 Gate.Line 和下一次换 Line 的时间后退出'
+    )
+    
+    parser.add_argument(
+        '--verify-ephemeris',
+        action='store_true',
+        help='用历史归档中的 Gate.Line 校验本地星历后退出'
+    )
+    
+    parser.add_argument(
+        '--lookahead',
+        action='store_true',
+        help='运行结束后按 gate_range 为下一个 Gate 预下载图片、预热翻译缓存'
+    )
+    
+    # 常驻模式
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='常驻运行：按星历睡到下一次检查，先探测页面是否变化，变化时才运行完整流程'
+    )
+    
+    parser.add_argument(
+        '--health-port',
+        type=int,
+        default=None,
+        help='常驻模式下在本机该端口提供 /health 与 /status (默认: 不启动)'
+    )
+    
+    parser.add_argument(
+        '--retry-interval',
+        type=float,
+        default=15,
+        help='常驻模式下需要抓取但页面尚未更新时的重试间隔（分钟）(默认: 15)'
+    )
+    
+    # 订阅源
+    parser.add_argument(
+        '--feed-base-url',
+        type=str,
+        default=os.environ.get('IHDS_FEED_BASE_URL'),
+        help='output/ 发布后的地址，订阅源中的图片和链接使用绝对地址 (默认使用环境变量 IHDS_FEED_BASE_URL)'
+    )
+    
+    parser.add_argument(
+        '--feed-items',
+        type=int,
+        default=30,
+        help='订阅源保留的最近天数 (默认: 30)'
+    )
+    
+    # 耗时与成本指标
+    parser.add_argument(
+        '--metrics-textfile',
+        type=str,
+        default=os.environ.get('IHDS_METRICS_TEXTFILE'),
+        help='Prometheus 文本文件路径，例如 node_exporter 的 textfile 目录中的 ihds.prom (默认: logs/metrics.prom，或环境变量 IHDS_METRICS_TEXTFILE)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='性能分析：各阶段依次在 cProfile 与 tracemalloc 下运行，翻译单线程执行，报告写入当天日期目录的 profile/（结果文件不变，不计入指标）'
+    )
+    
+    # 静态网站
+    parser.add_argument(
+        '--build-site',
+        action='store_true',
+        help='把历史归档增量生成为静态 HTML 网站后退出（--force 时全部重新生成）'
+    )
+    
+    parser.add_argument(
+        '--site-dir',
+        type=str,
+        default=None,
+        help='静态网站输出目录 (默认: output/site/)'
+    )
+    
+    parser.add_argument(
+        '--build-variants',
+        action='store_true',
+        help='为图片收藏目录增量生成缩略图与 WebP 变体后退出（需要 Pillow；--force 时全部重新生成）'
+    )
+    
+    parser.add_argument(
+        '--prefetch-gates',
+        action='store_true',
+        help='校验全部 64 张 Gate 图片，并行下载缺失或校验失败的图片后退出（--force 时全部重新下载）'
+    )
+    
     # Leonardo.AI 图片生成参数
     parser.add_argument(
         '--generate-image',
@@ -91,18 +370,228 @@ Examples:
     # 运行 Daily View 抓取
     fetcher = DailyViewFetcher(
         deepseek_api_key=api_key,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        translate_workers=args.translate_workers,
+        translate_deadline=args.translate_deadline,
+        batch_translate=not args.no_batch_translate,
+        use_cache=not args.no_cache,
+        use_translation_memory=not args.no_translation_memory,
+        use_corpus=not args.no_corpus,
+        force=args.force,
+        feed_base_url=args.feed_base_url,
+        feed_items=args.feed_items,
+        lookahead=args.lookahead,
+        metrics_textfile=args.metrics_textfile,
+        profile=args.profile
     )
     
-    result = fetcher.run()
+    if args.build_corpus:
+        build_corpus(fetcher)
+        return
+    
+    if args.backfill:
+        backfill_archive(fetcher, args)
+        return
+    
+    if args.search:
+        search_archive(fetcher, args)
+        return
+    
+    if args.build_site:
+        build_site(fetcher, args)
+        return
+    
+    if args.build_variants:
+        build_variants(fetcher, args)
+        return
+    
+    if args.prefetch_gates:
+        prefetch_gate_images(fetcher, args)
+        return
+    
+    if args.next_run:
+        show_next_run(fetcher)
+        return
+    
+    if args.verify_ephemeris:
+        verify_ephemeris(fetcher)
+        return
+    
+    if args.daemon:
+        run_daemon(fetcher, args)
+        return
+    
+    if args.when_due and not args.force and not args.stage:
+        due, transit = fetcher.check_due()
+        if not due:
+            print(f"⏭️  {transit.gate_line} 已抓取，下次換 Line: {_local(transit.end)}")
+            return
+        print(f"⏰ {transit.gate_line} 自 {_local(transit.start)} 開始，尚未抓取")
+    
+    record = fetcher.run(stages=args.stage, skip=args.skip_stage)
     
     # 可选：生成 AI 艺术海报
     if args.generate_image:
-        generate_art_poster(fetcher, args)
+        generate_art_poster(fetcher, args, record)
+
+
+def backfill_archive(fetcher, args):
+    """离线重新生成历史归档（--force 时忽略增量签名）"""
+    from ihds.backfill import backfill
+    
+    # Markdown 引用图片变体：先补齐 Markdown 用的变体
+    build_variants(fetcher, args, force=False, variants=(fetcher.MARKDOWN_VARIANT,))
+    span = f"{args.since or '最早'} ~ {args.until or '最新'}"
+    print(f"🔁 正在回填 {fetcher.base_output_dir}（{span}）...")
+    start = time.time()
+    stats = backfill(
+        fetcher.base_output_dir,
+        since=args.since,
+        until=args.until,
+        workers=args.workers,
+        force=args.force,
+        state_path=fetcher.cache_dir / "backfill_state.json",
+        manifest=fetcher.manifest,
+        variants=fetcher.variants
+    )
+    print(f"   ✅ 重新生成 {stats['rendered']} 天，跳過 {stats['skipped']} 天（未變化）")
+    if stats['failed']:
+        print(f"   ⚠️ {stats['failed']} 天失敗")
+    print(f"   ⏱️  耗時 {time.time() - start:.1f}s")
+
+
+def search_archive(fetcher, args):
+    """全文检索历史归档（先增量更新索引）"""
+    from ihds.search import SearchIndex
+    
+    fetcher.update_search_index()
+    with SearchIndex(fetcher.search_index_path) as index:
+        start = time.perf_counter()
+        hits = index.search(args.search, lang=args.search_lang, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+    
+    print(f"🔎 「{args.search}」: {len(hits)} 個結果（{elapsed:.1f} ms）")
+    for rank, hit in enumerate(hits, 1):
+        print(f"  {rank:>3}. {hit.date}  {hit.gate_line:<6} {hit.score:>6.2f}  [{hit.langs}]  {hit.title}")
+
+
+def _local(when) -> str:
+    """UTC 时间 -> 本地时间字符串"""
+    return when.astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
+
+
+def run_daemon(fetcher, args):
+    """常驻运行，SIGTERM / Ctrl-C 时在当前步骤结束后退出"""
+    import signal
+    from ihds.daemon import DailyViewDaemon
+    
+    on_record = None
+    if args.generate_image:
+        on_record = lambda record: generate_art_poster(fetcher, args, record)
+    daemon = DailyViewDaemon(
+        fetcher,
+        retry_interval=args.retry_interval * 60,
+        health_port=args.health_port,
+        on_record=on_record
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    print(f"🛰️  常駐模式啟動 (pid {os.getpid()})，狀態: {daemon.status_path}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        daemon.stop()
+    print("👋 常駐模式已結束")
 
 
-def generate_art_poster(fetcher, args):
-    """生成 AI 艺术海报"""
+def show_next_run(fetcher):
+    """显示当前 Gate.Line、下一次换 Line 的时间，以及现在是否需要抓取"""
+    due, transit = fetcher.check_due()
+    print(f"☀️ 太陽位於 {transit.gate_line}（{_local(transit.start)} ~ {_local(transit.end)}）")
+    print(f"   {'⏰ 尚未抓取，下次運行會抓取' if due else '✅ 已抓取'}")
+    print(f"   ⏭️  下次換 Line: {_local(transit.end)}")
+
+
+def verify_ephemeris(fetcher):
+    """用历史归档校验本地星历"""
+    from ihds.ephemeris import verify_archive
+    
+    print(f"🔭 正在用 {fetcher.base_output_dir} 校驗星曆...")
+    stats = verify_archive(fetcher.base_output_dir)
+    print(f"   ✅ {stats['matched']}/{stats['checked']} 天的 Gate.Line 與當天太陽經過的 Line 一致")
+    for dir_name, gate_line, expected in stats['mismatches']:
+        print(f"   ⚠️ {dir_name}: 歸檔為 {gate_line}，星曆為 {' / '.join(expected)}")
+
+
+def build_site(fetcher, args):
+    """增量生成静态网站（只重建依赖数据变化的页面）"""
+    from ihds.site import SiteBuilder
+    
+    site_dir = Path(args.site_dir) if args.site_dir else fetcher.base_output_dir.parent / "site"
+    build_variants(fetcher, args, force=False)
+    print(f"🌐 正在生成靜態網站 {site_dir}...")
+    start = time.time()
+    builder = SiteBuilder(fetcher.manifest, site_dir, fetcher.cache_dir / "site_state.json", variants=fetcher.variants)
+    stats = builder.build(force=args.force)
+    print(f"   ✅ 生成 {stats['rendered']} 頁，跳過 {stats['skipped']} 頁（未變化），刪除 {stats['removed']} 頁")
+    print(f"   ⏱️  耗時 {time.time() - start:.1f}s")
+    # 订阅源条目只链接已生成的每日页面：网站生成后补上链接
+    feed_paths = fetcher.feed.refresh()
+    if feed_paths:
+        print(f"   📰 已更新訂閱源中的頁面連結: {', '.join(Path(path).name for path in feed_paths)}")
+
+
+def build_variants(fetcher, args, force=None, variants=None):
+    """增量生成图片变体（只处理新增或哈希变化的图片；variants 为 None 时生成全部用途）"""
+    from ihds.variants import VARIANTS, available
+    
+    if not available():
+        print("⏭️  未安裝 Pillow（pip install -r requirements.txt），跳過圖片變體，頁面引用原圖")
+        return
+    print(f"🖼️  正在生成圖片變體 {fetcher.variants.collection_dir}...")
+    start = time.time()
+    stats = fetcher.variants.sync(
+        workers=args.workers,
+        force=args.force if force is None else force,
+        variants=variants or tuple(VARIANTS)
+    )
+    print(f"   ✅ 生成 {stats['built']} 張，跳過 {stats['skipped']} 張（未變化），刪除 {stats['removed']} 張")
+    if stats['failed']:
+        print(f"   ⚠️ {stats['failed']} 張失敗")
+    totals = fetcher.variants.stats()
+    print(f"   📦 {totals['sources']} 張原圖，{totals['variants']} 個變體，共 {totals['bytes'] / 1024 / 1024:.1f} MB")
+    print(f"   ⏱️  耗時 {time.time() - start:.1f}s")
+
+
+def prefetch_gate_images(fetcher, args):
+    """校验全部 Gate 图片，只下载缺失或校验失败的图片"""
+    from ihds.gate_images import DEFAULT_WORKERS
+    
+    print(f"📥 正在校驗 Gate 圖片 {fetcher.gate_images.collection_dir}...")
+    start = time.time()
+    stats = fetcher.prefetch_gate_images(workers=args.workers or DEFAULT_WORKERS, force=args.force)
+    print(f"   ✅ 校驗通過 {stats['verified']} 張，下載 {stats['downloaded']} 張，重新下載 {stats['repaired']} 張")
+    if stats['failed']:
+        print(f"   ⚠️ {stats['failed']} 張失敗")
+    print(f"   📁 {fetcher.gate_images.manifest_path}")
+    print(f"   ⏱️  耗時 {time.time() - start:.1f}s")
+    if stats['downloaded'] or stats['repaired']:
+        build_variants(fetcher, args, force=False, variants=(fetcher.MARKDOWN_VARIANT,))
+
+
+def build_corpus(fetcher):
+    """从历史归档构建 Gate.Line 双语语料库"""
+    from ihds.corpus import GateLineCorpus
+    
+    corpus_path = fetcher.cache_dir / "gate_line_corpus.json"
+    print(f"📚 正在從 {fetcher.base_output_dir} 構建語料庫...")
+    corpus = GateLineCorpus.build(fetcher.base_output_dir, corpus_path)
+    stats = corpus.stats()
+    print(f"   ✅ {stats['entries']} 個 Gate.Line，{stats['fields']} 個雙語字段，覆蓋 {stats['gates']}/64 個 Gate")
+    print(f"   📁 {corpus_path}")
+
+
+def generate_art_poster(fetcher, args, record):
+    """生成 AI 艺术海报（record 为 fetcher.run() 返回的当天内容记录）"""
     from ihds import LeonardoImageGenerator
     
     if not args.leonardo_key:
@@ -110,33 +599,28 @@ def generate_art_poster(fetcher, args):
         print("   请通过 --leonardo-key 参数或环境变量 LEONARDO_API_KEY 设置")
         return
     
+    if record is None:
+        print("\n⚠️  未找到最新的 Daily View 内容")
+        return
+    
+    generator = None
+    output_path = None
     try:
         generator = LeonardoImageGenerator(api_key=args.leonardo_key)
         
-        # 获取当前内容（需要从 fetcher 获取）
-        # 这里我们需要读取最新生成的英文 Markdown 并解析
-        latest_en_path = fetcher.base_output_dir / "latest_en.md"
-        
-        if not latest_en_path.exists():
-            print("\n⚠️  未找到最新的 Daily View 内容")
-            return
-        
-        # 简单解析内容
-        content = parse_markdown_content(latest_en_path)
-        
         # 获取 Gate 图片路径（如果使用参考图）
         gate_image_path = None
-        if args.use_gate_ref and fetcher.gate_num:
-            gate_image_path = fetcher.images_collection_dir / f"Gate-{fetcher.gate_num}.jpg"
+        if args.use_gate_ref and record.gate:
+            gate_image_path = fetcher.images_collection_dir / f"Gate-{record.gate}.jpg"
             if not gate_image_path.exists():
                 gate_image_path = None
         
         # 生成海报
         output_path = generator.generate_daily_art(
-            content=content,
-            output_dir=str(fetcher.output_dir) if fetcher.output_dir else str(fetcher.base_output_dir),
+            content=record.en.to_dict(),
+            output_dir=str(record.path) if record.path else str(fetcher.base_output_dir),
             gate_image_path=str(gate_image_path) if gate_image_path else None,
-            date_str=fetcher.date_str
+            date_str=record.date
         )
         
         if output_path:
@@ -144,42 +628,11 @@ def generate_art_poster(fetcher, args):
         
     except Exception as e:
         print(f"\n⚠️  图片生成失败: {e}")
-
-
-def parse_markdown_content(md_path: Path) -> dict:
-    """从 Markdown 文件解析内容"""
-    content = {}
-    
-    with open(md_path, 'r', encoding='utf-8') as f:
-        text = f.read()
-    
-    # 解析标题
-    title_match = text.split('\n')[0]
-    if title_match.startswith('# '):
-        content['gate_title'] = title_match[2:].strip()
-    
-    # 解析副标题
-    import re
-    subtitle_match = re.search(r'## \*(.+?)\*', text)
-    if subtitle_match:
-        content['gate_subtitle'] = subtitle_match.group(1)
-    
-    # 解析引用描述
-    lead_match = re.search(r'> (.+?)(?=\n\n|\n###)', text, re.DOTALL)
-    if lead_match:
-        content['lead_description'] = lead_match.group(1).strip()
-    
-    # 解析 Line 标题
-    line_match = re.search(r'### (Line \d+ - .+?)(?=\n)', text)
-    if line_match:
-        content['line_title'] = line_match.group(1)
-    
-    # 解析高阶表达
-    exalt_match = re.search(r'Exaltation:\*\* (.+?)(?=\n\n|\n\*\*)', text, re.DOTALL)
-    if exalt_match:
-        content['exaltation'] = exalt_match.group(1).strip()
-    
-    return content
+    finally:
+        # 上传、轮询等耗时与抓取的指标写入同一个日志（job 为 poster）；生成失败的运行同样记录
+        if generator is not None:
+            generator.metrics.finish(ok=bool(output_path))
+            fetcher.export_metrics(generator.metrics)
 
 
 def generate_test_poster():
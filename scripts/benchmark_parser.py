@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+解析器基准测试：流式抽取器 vs. BeautifulSoup 原始实现
+
+Usage:
+    python scripts/benchmark_parser.py                   # 使用 output/.cache/pages/*.html
+    python scripts/benchmark_parser.py page1.html ...    # 使用指定的已保存页面
+    python scripts/benchmark_parser.py --repeat 20
+
+未指定页面且 output/.cache/pages/ 为空时，会先下载一次当前的 Daily View 页面保存到该目录。
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
+
+from ihds.fetcher import IHDSDailyViewFetcher
+from ihds.extractor import extract_daily_view
+
+
+PAGES_DIR = PROJECT_ROOT / "output" / ".cache" / "pages"
+
+
+def save_live_page() -> Path:
+    """下载当前页面保存到 output/.cache/pages/"""
+    import requests
+
+    PAGES_DIR.mkdir(parents=True, exist_ok=True)
+    response = requests.get(
+        IHDSDailyViewFetcher.DAILY_VIEW_URL,
+        headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"},
+        timeout=30
+    )
+    response.raise_for_status()
+    path = PAGES_DIR / f"daily_view_{datetime.now().strftime('%Y-%m-%d')}.html"
+    path.write_text(response.text, encoding='utf-8')
+    print(f"📥 已保存頁面: {path}")
+    return path
+
+
+def measure(func, page_html: str, repeat: int) -> float:
+    """返回多次运行的耗时中位数（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(page_html)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the streaming extractor against BeautifulSoup')
+    parser.add_argument('pages', nargs='*', help='Saved Daily View HTML pages')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per page and parser (default: 10)')
+    args = parser.parse_args()
+
+    pages = [Path(p) for p in args.pages] or sorted(PAGES_DIR.glob('*.html'))
+    if not pages:
+        pages = [save_live_page()]
+
+    fetcher = IHDSDailyViewFetcher.__new__(IHDSDailyViewFetcher)
+
+    print(f"{'page':<40} {'size':>9} {'soup ms':>9} {'stream ms':>10} {'speedup':>8}  same")
+    for path in pages:
+        page_html = path.read_text(encoding='utf-8')
+        same = fetcher.parse_content_soup(page_html) == extract_daily_view(page_html)
+        soup_ms = measure(fetcher.parse_content_soup, page_html, args.repeat)
+        stream_ms = measure(extract_daily_view, page_html, args.repeat)
+        print(
+            f"{path.name[:40]:<40} {len(page_html) // 1024:>7}KB {soup_ms:>9.1f} {stream_ms:>10.1f} "
+            f"{soup_ms / stream_ms:>7.1f}x  {'✅' if same else '❌'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
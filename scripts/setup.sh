@@ -57,7 +57,7 @@ launchctl unload "$LAUNCH_AGENTS_DIR/$PLIST_FILE" 2>/dev/null || true
 
 # 加载新任务
 launchctl load "$LAUNCH_AGENTS_DIR/$PLIST_FILE"
-echo "   ✅ 定时任务已加载（每天早上 8:00 执行）"
+echo "   ✅ 定时任务已加载（每小时检查一次，换 Line 后自动抓取）"
 echo ""
 
 # 6. 测试运行
@@ -76,7 +76,8 @@ echo "✨ 安装完成!"
 echo "============================================================"
 echo ""
 echo "📋 使用说明:"
-echo "   - 定时任务将每天早上 8:00 自动运行"
+echo "   - 定时任务每小时按本地星历检查一次，只在闘门/爻线切换后抓取"
+echo "   - 查看下次切换时间: python3 $PROJECT_ROOT/main.py --next-run"
 echo "   - 生成的文件保存在: $PROJECT_ROOT/output/daily_views/"
 echo "   - 日志文件保存在: $PROJECT_ROOT/logs/"
 echo ""
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Daily View Archive
+~~~~~~~~~~~~~~~~~~
+
+读取 output/daily_views 下按「日期-Gate.Line」组织的历史归档。
+
+Usage:
+    from ihds.archive import iter_archive_days, parse_markdown_fields
+
+    for day in iter_archive_days("output/daily_views"):
+        fields = parse_markdown_fields(day.en_path.read_text(encoding="utf-8"))
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional
+
+
+# 目录名格式: 2026-01-10-54.6（Gate/Line 缺失时退化为 2026-01-10-54 或 2026-01-10）
+DAY_DIR_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})(?:-(\d+)(?:\.(\d+))?)?$')
+
+
+class ArchiveDay(NamedTuple):
+    """归档中的一天"""
+    date: str
+    gate: str
+    line: str
+    path: Path
+
+    @property
+    def gate_line(self) -> str:
+        """Gate.Line 键，例如 "54.6"（缺少 Line 时只有 Gate 号）"""
+        return f"{self.gate}.{self.line}" if self.line else self.gate
+
+    @property
+    def en_path(self) -> Path:
+        return self.path / f"daily_view_{self.date}_en.md"
+
+    @property
+    def zh_path(self) -> Path:
+        return self.path / f"daily_view_{self.date}_zh.md"
+
+    @property
+    def prompt_path(self) -> Path:
+        return self.path / f"ai_prompt_{self.date}.txt"
+
+    @property
+    def content_path(self) -> Path:
+        """结构化内容 content_{date}.json（见 content.py）"""
+        return self.path / f"content_{self.date}.json"
+
+
+def parse_day_dir_name(name: str) -> Optional[ArchiveDay]:
+    """解析日期目录名，不符合格式时返回 None"""
+    match = DAY_DIR_PATTERN.match(name)
+    if not match:
+        return None
+    date, gate, line = match.groups()
+    return ArchiveDay(date, gate or "", line or "", Path(name))
+
+
+def iter_archive_days(base_dir, since: str = None, until: str = None) -> Iterator[ArchiveDay]:
+    """
+    按日期顺序遍历归档目录
+
+    Args:
+        base_dir: 归档根目录（output/daily_views）
+        since: 起始日期（含），格式 YYYY-MM-DD
+        until: 结束日期（含），格式 YYYY-MM-DD
+    """
+    base_dir = Path(base_dir)
+    if not base_dir.exists():
+        return
+    for entry in sorted(base_dir.iterdir()):
+        if not entry.is_dir():
+            continue
+        day = parse_day_dir_name(entry.name)
+        if day is None:
+            continue
+        if since and day.date < since:
+            continue
+        if until and day.date > until:
+            continue
+        yield day._replace(path=entry)
+
+
+def read_text(path) -> str:
+    """读取归档文件，保留原文中的 \r（不做换行符转换）"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def _image_file(block: str) -> str:
+    """从 ![alt](path) 中取出图片文件名（相对于图片收藏目录，例如 mandalas/<sha256>.png）"""
+    match = re.match(r'!\[[^\]]*\]\(([^)]+)\)', block)
+    if not match:
+        return ""
+    path = match.group(1)
+    if "Gate_Rave_Mandala_Collection/" in path:
+        return path.split("Gate_Rave_Mandala_Collection/", 1)[1]
+    return path.rsplit('/', 1)[-1]
+
+
+def parse_markdown_fields(text: str) -> Dict[str, str]:
+    """
+    从 renderer 生成的 Markdown 中还原内容字段
+
+    Markdown 由两条 "---" 分为三部分：标题区、正文区（含 Rave Mandala）、Line 区。
+    中英文版本的结构相同，仅标签文字不同。
+
+    Returns:
+        内容字典（只包含文件中出现的字段）
+    """
+    content = {}
+    if '\n---\n' not in text:
+        # 整个文件以 CRLF 换行（字段内单独的 \r 属于原文，保持不变）
+        text = text.replace('\r\n', '\n')
+    sections = re.split(r'\n---\n', text)
+    header = sections[0] if sections else ""
+    body = sections[1] if len(sections) > 2 else ""
+    line_section = sections[-1] if len(sections) > 1 else ""
+
+    # 译文可能包含空行，标记之外的段落属于上一个字段
+    header_fields = []
+    for index, block in enumerate(b.strip() for b in header.split('\n\n')):
+        if not block:
+            continue
+        if block.startswith('# '):
+            header_fields.append(['gate_title', block[2:]])
+        elif index == 1 and re.match(r'^\*\*[^*\n]+\*\*$', block):
+            header_fields.append([None, block])  # 日期行
+        elif block.startswith('## '):
+            header_fields.append(['gate_subtitle', block[3:]])
+        elif block.startswith('### '):
+            header_fields.append(['cross_info', block[4:]])
+        elif block.startswith('> '):
+            header_fields.append(['lead_description', block[2:]])
+        elif block.startswith('!['):
+            content['gate_image_local'] = _image_file(block)
+            header_fields.append([None, block])
+        elif block.startswith('*') and not block.startswith('**'):
+            header_fields.append(['quarter_theme', block])
+        elif header_fields:
+            header_fields[-1][1] += '\n\n' + block
+
+    for field, value in header_fields:
+        if field == 'gate_subtitle':
+            content[field] = value.strip().strip('*').strip()
+        elif field == 'quarter_theme':
+            content[field] = value[1:-1] if value.endswith('*') else value[1:]
+        elif field:
+            content[field] = value.strip()
+
+    paragraphs = []
+    for block in (b.strip() for b in body.split('\n\n')):
+        if not block:
+            continue
+        if block.startswith('!['):
+            content['rave_mandala_local'] = _image_file(block)
+        else:
+            paragraphs.append(block)
+    if paragraphs:
+        content['main_description'] = '\n\n'.join(paragraphs)
+
+    line_fields = []
+    for block in (b.strip() for b in line_section.split('\n\n')):
+        if not block:
+            continue
+        if block.startswith('### '):
+            line_fields.append(['line_title', block[4:]])
+        elif block.startswith('**☀️'):
+            line_fields.append(['exaltation', re.sub(r'^\*\*☀️[^*]*\*\*\s*', '', block)])
+        elif block.startswith('**🌑'):
+            line_fields.append(['detriment', re.sub(r'^\*\*🌑[^*]*\*\*\s*', '', block)])
+        elif line_fields:
+            line_fields[-1][1] += '\n\n' + block
+    for field, value in line_fields:
+        content[field] = value.strip()
+
+    return content
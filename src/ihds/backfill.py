@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Archive Backfill
+~~~~~~~~~~~~~~~~
+
+离线重新生成历史归档中的 Markdown 与 AI 绘图提示词。
+
+修改 Markdown 版式或提示词模板后，用已保存的结构化内容（content_{date}.json，
+旧目录没有时从 Markdown 还原并补存）重新渲染指定日期范围内的每一天
+（不访问网络、不调用翻译 API），多个进程并行处理。
+output/.cache/backfill_state.json 记录每一天的输入签名（模板版本 + 内容文件哈希 +
+引用的图片变体），签名未变化且输出文件齐全的日期会被跳过。Markdown 与每次运行一样
+引用图片变体（变体尚未生成时引用原图）。
+
+Usage:
+    from ihds.backfill import backfill
+
+    stats = backfill("output/daily_views", since="2026-01-01", workers=4)
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .archive import ArchiveDay, iter_archive_days, read_text
+from .content import DailyViewContent, load_day
+from .fetcher import IHDSDailyViewFetcher
+from .manifest import ArchiveManifest
+from .renderer import IMAGE_COLLECTION, MARKDOWN_RENDERER, RenderKey
+from .storage import atomic_write_json, atomic_write_text
+from .variants import ImageVariants
+
+# 内容中引用图片的字段
+IMAGE_FIELDS = ('gate_image_local', 'rave_mandala_local')
+
+
+def input_files(day: ArchiveDay) -> List[Path]:
+    """回填时读取的内容文件（有 content_{date}.json 时只读取它）"""
+    if day.content_path.exists():
+        return [day.content_path]
+    return [day.en_path, day.zh_path]
+
+
+def output_files(day: ArchiveDay) -> List[Path]:
+    """回填生成的文件（中文版缺失时不生成）"""
+    outputs = [day.en_path, day.prompt_path, day.content_path]
+    if day.zh_path.exists():
+        outputs.append(day.zh_path)
+    return outputs
+
+
+def _referenced_images(data: bytes) -> List[str]:
+    """content_{date}.json 中引用的图片（原图文件名）"""
+    try:
+        record = json.loads(data)
+    except ValueError:
+        return []
+    names = set()
+    for lang in ('en', 'zh'):
+        content = record.get(lang) if isinstance(record, dict) else None
+        if isinstance(content, dict):
+            names.update(content[key] for key in IMAGE_FIELDS if content.get(key))
+    return sorted(names)
+
+
+def input_signature(day: ArchiveDay, images: Optional[Dict[str, str]] = None) -> str:
+    """模板版本 + 内容文件的哈希 + 引用的图片变体（images：原图 -> 变体文件名）"""
+    digest = hashlib.sha256(f"template:{IHDSDailyViewFetcher.TEMPLATE_VERSION}".encode())
+    for path in input_files(day):
+        digest.update(b"\x00" + path.name.encode())
+        if path.exists():
+            data = path.read_bytes()
+            digest.update(b"\x00" + data)
+            if path == day.content_path:
+                # 变体生成或变化后重新渲染
+                for source in _referenced_images(data):
+                    digest.update(b"\x00" + (images or {}).get(source, source).encode())
+    return digest.hexdigest()
+
+
+def render_day(day: ArchiveDay, images: Optional[Dict[str, str]] = None) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    重新生成一天的文件（在子进程中运行）
+
+    没有 content_{date}.json 的旧目录会先从 Markdown 还原内容并保存该文件。
+
+    Args:
+        day: 日期目录
+        images: 原图文件名 -> Markdown 引用的变体文件名（ImageVariants.files()）
+
+    Returns:
+        (目录名, 新的输入签名, 错误信息)
+    """
+    try:
+        record = load_day(day)
+        if not day.content_path.exists():
+            record.save()
+        # 中英文 Markdown 一次渲染
+        rendered = MARKDOWN_RENDERER.render(
+            _contents(record), datetime.strptime(day.date, "%Y-%m-%d"), image_files=_lookup(images)
+        )
+        atomic_write_text(day.en_path, rendered[RenderKey('md', 'en', 2)])
+        if RenderKey('md', 'zh', 2) in rendered:
+            atomic_write_text(day.zh_path, rendered[RenderKey('md', 'zh', 2)])
+
+        prompt = IHDSDailyViewFetcher.render_ai_prompt(record.en.to_dict(), day.date, day.gate or None)
+        atomic_write_text(day.prompt_path, prompt)
+    except Exception as e:
+        return day.path.name, None, str(e)
+    return day.path.name, input_signature(day, images), None
+
+
+def _load_state(state_path: Path) -> Dict[str, str]:
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state.get('days', {}) if isinstance(state, dict) else {}
+
+
+def backfill(
+    base_dir,
+    since: str = None,
+    until: str = None,
+    workers: int = None,
+    force: bool = False,
+    state_path=None,
+    manifest: ArchiveManifest = None,
+    variants: ImageVariants = None
+) -> Dict[str, int]:
+    """
+    重新生成日期范围内的归档文件
+
+    Args:
+        base_dir: 归档根目录（output/daily_views）
+        since: 起始日期（含），格式 YYYY-MM-DD
+        until: 结束日期（含），格式 YYYY-MM-DD
+        workers: 进程数（默认 CPU 核数）
+        force: 忽略签名，全部重新生成
+        state_path: 签名记录文件（默认 output/.cache/backfill_state.json）
+        manifest: 归档索引（默认 output/.cache/manifest.json），重新生成的日期会更新其中的哈希
+        variants: 图片变体（默认为归档旁的图片收藏目录），Markdown 引用磁盘上已有的 640px JPEG
+
+    Returns:
+        统计：rendered / skipped / failed
+    """
+    base_dir = Path(base_dir)
+    state_path = Path(state_path) if state_path else base_dir.parent / ".cache" / "backfill_state.json"
+    state = _load_state(state_path)
+    if manifest is None:
+        manifest = ArchiveManifest(base_dir.parent / ".cache" / "manifest.json", base_dir)
+    if variants is None:
+        variants = ImageVariants(base_dir.parent / IMAGE_COLLECTION, base_dir.parent / ".cache" / "image_variants.json")
+    images = variants.files(IHDSDailyViewFetcher.MARKDOWN_VARIANT)
+
+    days = []
+    skipped = 0
+    for day in iter_archive_days(base_dir, since, until):
+        if not day.en_path.exists() and not day.content_path.exists():
+            continue
+        if (
+            not force
+            and state.get(day.path.name) == input_signature(day, images)
+            and all(path.exists() for path in output_files(day))
+        ):
+            skipped += 1
+            continue
+        days.append(day)
+
+    rendered = failed = 0
+    if days:
+        by_name = {day.path.name: day for day in days}
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(days))) as executor:
+            chunksize = max(1, len(days) // (workers * 4))
+            results = executor.map(render_day, days, [images] * len(days), chunksize=chunksize)
+            for name, signature, error in results:
+                if error:
+                    failed += 1
+                    print(f"   ⚠️ {name} 回填失敗: {error}")
+                    continue
+                state[name] = signature
+                manifest.update_day(by_name[name].path)
+                rendered += 1
+
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(state_path, {
+            'template_version': IHDSDailyViewFetcher.TEMPLATE_VERSION,
+            'days': dict(sorted(state.items()))
+        })
+
+        manifest.save()
+
+        # 最新一天被重新生成时，同步更新 latest 文件
+        latest = manifest.latest()
+        if latest is not None and latest[2]['dir'] in by_name:
+            _refresh_latest(base_dir, by_name[latest[2]['dir']], images)
+
+    return {'rendered': rendered, 'skipped': skipped, 'failed': failed}
+
+
+def _contents(record) -> Dict[str, Optional[DailyViewContent]]:
+    """渲染器的输入（没有中文译文时只渲染英文）"""
+    return {'en': record.en, 'zh': record.zh if record.zh.gate_title else None}
+
+
+def _lookup(images: Optional[Dict[str, str]]):
+    """原图 -> 变体的字典换成 Renderer 的 image_files（没有变体时引用原图）"""
+    if not images:
+        return None
+    return lambda source: images.get(source, source)
+
+
+def _refresh_latest(base_dir: Path, day: ArchiveDay, images: Optional[Dict[str, str]] = None):
+    """用最新一天的记录重新生成 latest_*"""
+    record = load_day(day)
+    if record is None:
+        return
+    date = datetime.strptime(day.date, "%Y-%m-%d")
+    rendered = IHDSDailyViewFetcher.RENDERER.render(_contents(record), date, image_files=_lookup(images))
+    IHDSDailyViewFetcher.write_latest(base_dir, rendered)
+    if day.prompt_path.exists():
+        atomic_write_text(base_dir / "latest_ai_prompt.txt", read_text(day.prompt_path))
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Daily View Content Record
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+一天的结构化内容：英文原文与繁体中文译文的字段、日期、Gate.Line。
+
+每次运行都会把记录保存为日期目录中的 content_{date}.json，
+海报生成、回填、语料库等后续步骤直接读取字段，不必再从 Markdown 中解析。
+旧的归档目录没有该文件时，退回到解析 Markdown。
+
+Usage:
+    from ihds.content import load_day
+
+    record = load_day(day)
+    print(record.en.gate_title, record.zh.line_title)
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .archive import ArchiveDay, parse_day_dir_name, parse_markdown_fields, read_text
+from .storage import atomic_write_json
+
+
+# 记录中保存的内容字段（不包含内嵌图片数据）
+CONTENT_FIELDS = (
+    'gate_title', 'gate_subtitle', 'lead_description',
+    'cross_info', 'quarter_theme', 'main_description',
+    'line_title', 'exaltation', 'detriment', 'footer_note',
+    'gate_image_url', 'gate_image_local', 'rave_mandala_local',
+)
+
+# content_{date}.json 的格式版本
+SIDECAR_VERSION = 1
+
+
+class DailyViewContent:
+    """一种语言的内容字段（缺失的字段为空字符串）"""
+
+    __slots__ = CONTENT_FIELDS
+
+    def __init__(self, **fields: str):
+        for name in CONTENT_FIELDS:
+            setattr(self, name, fields.get(name) or '')
+
+    @classmethod
+    def from_dict(cls, content: Dict[str, Any]) -> "DailyViewContent":
+        """从内容字典创建（忽略记录以外的键）"""
+        return cls(**{name: content[name] for name in CONTENT_FIELDS if content.get(name)})
+
+    def to_dict(self) -> Dict[str, str]:
+        """返回非空字段组成的字典"""
+        return {name: getattr(self, name) for name in CONTENT_FIELDS if getattr(self, name)}
+
+    def get(self, name: str, default: str = '') -> str:
+        """与内容字典相同的读取方式"""
+        return getattr(self, name, '') or default
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, DailyViewContent) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"DailyViewContent(gate_title={self.gate_title!r}, line_title={self.line_title!r})"
+
+
+class DailyView:
+    """一天的记录：日期、Gate.Line、中英文内容，以及所在的日期目录"""
+
+    __slots__ = ('date', 'gate', 'line', 'en', 'zh', 'path')
+
+    def __init__(
+        self,
+        date: str,
+        gate: str,
+        line: str,
+        en: DailyViewContent,
+        zh: Optional[DailyViewContent] = None,
+        path: Optional[Path] = None
+    ):
+        self.date = date
+        self.gate = gate
+        self.line = line
+        self.en = en
+        self.zh = zh or DailyViewContent()
+        self.path = Path(path) if path else None
+
+    @property
+    def gate_line(self) -> str:
+        return f"{self.gate}.{self.line}" if self.line else self.gate
+
+    @property
+    def en_path(self) -> Optional[Path]:
+        return self.path / f"daily_view_{self.date}_en.md" if self.path else None
+
+    @property
+    def zh_path(self) -> Optional[Path]:
+        return self.path / f"daily_view_{self.date}_zh.md" if self.path else None
+
+    @property
+    def sidecar_path(self) -> Optional[Path]:
+        return self.path / f"content_{self.date}.json" if self.path else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': SIDECAR_VERSION,
+            'date': self.date,
+            'gate': self.gate,
+            'line': self.line,
+            'en': self.en.to_dict(),
+            'zh': self.zh.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], path: Optional[Path] = None) -> "DailyView":
+        return cls(
+            date=data.get('date', ''),
+            gate=str(data.get('gate') or ''),
+            line=str(data.get('line') or ''),
+            en=DailyViewContent.from_dict(data.get('en') or {}),
+            zh=DailyViewContent.from_dict(data.get('zh') or {}),
+            path=path
+        )
+
+    def save(self) -> Path:
+        """写入日期目录中的 content_{date}.json"""
+        atomic_write_json(self.sidecar_path, self.to_dict())
+        return self.sidecar_path
+
+    def __repr__(self) -> str:
+        return f"DailyView({self.date} {self.gate_line})"
+
+
+def load_sidecar(path) -> Optional[DailyView]:
+    """读取 content_{date}.json，文件不存在或格式不兼容时返回 None"""
+    path = Path(path)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != SIDECAR_VERSION:
+        return None
+    return DailyView.from_dict(data, path=path.parent)
+
+
+def load_day(day: ArchiveDay) -> Optional[DailyView]:
+    """
+    读取归档中一天的记录：优先使用 content_{date}.json，没有时解析 Markdown
+
+    Returns:
+        记录；英文 Markdown 也不存在时返回 None
+    """
+    record = load_sidecar(day.content_path)
+    if record is not None:
+        return record
+    if not day.en_path.exists():
+        return None
+    en = DailyViewContent.from_dict(parse_markdown_fields(read_text(day.en_path)))
+    zh = None
+    if day.zh_path.exists():
+        zh = DailyViewContent.from_dict(parse_markdown_fields(read_text(day.zh_path)))
+    return DailyView(day.date, day.gate, day.line, en, zh, path=day.path)
+
+
+def load_day_dir(path) -> Optional[DailyView]:
+    """按日期目录路径读取记录（目录名不符合格式时返回 None）"""
+    path = Path(path)
+    day = parse_day_dir_name(path.name)
+    if day is None:
+        return None
+    return load_day(day._replace(path=path))
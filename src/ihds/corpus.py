@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Gate.Line Bilingual Corpus
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+以 Gate.Line 为键的离线双语语料库（64 Gate × 6 Line）。
+
+语料库由历史归档中成对的 daily_view_*_en.md / _zh.md 构建，保存每个字段的
+英文原文与繁体中文译文。抓取时先按 Gate.Line 查找：英文原文未变的字段直接
+使用已有译文，只有缺失或有变化的字段才需要调用 DeepSeek。
+
+Usage:
+    from ihds.corpus import GateLineCorpus
+
+    corpus = GateLineCorpus.build("output/daily_views", "output/.cache/gate_line_corpus.json")
+    known = corpus.resolve("29.5", en_content)
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Any
+
+from .archive import iter_archive_days
+from .content import load_day
+from .storage import atomic_write_json
+
+
+# 语料库收录的字段（footer_note 不在 Markdown 中，由翻译缓存负责）
+CORPUS_FIELDS = [
+    'gate_title', 'gate_subtitle', 'lead_description',
+    'cross_info', 'quarter_theme', 'main_description',
+    'line_title', 'exaltation', 'detriment'
+]
+
+FAILED_MARKER = "[翻译失败]"
+
+
+class GateLineCorpus:
+    """Gate.Line 双语语料库（JSON 文件存储）"""
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        """
+        加载语料库，文件不存在时为空库
+
+        Args:
+            path: 语料库 JSON 文件路径
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.entries = data.get('entries', {})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, gate_line: str) -> bool:
+        return gate_line in self.entries
+
+    def save(self):
+        """原子写入语料库文件"""
+        data = {
+            "version": self.VERSION,
+            "entries": dict(sorted(self.entries.items(), key=lambda kv: _sort_key(kv[0])))
+        }
+        atomic_write_json(self.path, data)
+
+    def update(
+        self,
+        gate_line: str,
+        date: str,
+        en_content: Dict[str, Any],
+        zh_content: Dict[str, Any]
+    ) -> int:
+        """
+        写入一天的中英文内容（翻译失败的字段不收录）
+
+        Returns:
+            新增或变化的字段数
+        """
+        entry = self.entries.setdefault(gate_line, {"fields": {}})
+        entry['date'] = date
+        changed = 0
+        for field in CORPUS_FIELDS:
+            en_text = en_content.get(field)
+            zh_text = zh_content.get(field)
+            if not en_text or not zh_text or FAILED_MARKER in zh_text:
+                continue
+            pair = {"en": en_text, "zh": zh_text}
+            if entry['fields'].get(field) != pair:
+                entry['fields'][field] = pair
+                changed += 1
+        return changed
+
+    def resolve(self, gate_line: str, en_content: Dict[str, Any]) -> Dict[str, str]:
+        """
+        查找已有译文
+
+        Args:
+            gate_line: Gate.Line 键，例如 "29.5"
+            en_content: 今天解析出的英文内容
+
+        Returns:
+            字段名 -> 繁体中文译文（只包含英文原文与语料库一致的字段）
+        """
+        entry = self.entries.get(gate_line)
+        if not entry:
+            return {}
+        known = {}
+        for field, pair in entry['fields'].items():
+            if en_content.get(field) and en_content[field] == pair['en']:
+                known[field] = pair['zh']
+        return known
+
+    @classmethod
+    def build(cls, archive_dir: str, path: str) -> "GateLineCorpus":
+        """
+        从历史归档构建语料库（按日期顺序，较新的内容覆盖较旧的内容）
+
+        Args:
+            archive_dir: 归档根目录（output/daily_views）
+            path: 语料库 JSON 文件路径
+
+        Returns:
+            构建完成并已保存的语料库
+        """
+        corpus = cls(path)
+        corpus.entries = {}
+
+        for day in iter_archive_days(archive_dir):
+            if not day.line:
+                continue
+            record = load_day(day)
+            if record is None or not record.zh.gate_title:
+                continue
+            corpus.update(day.gate_line, day.date, record.en.to_dict(), record.zh.to_dict())
+
+        corpus.save()
+        return corpus
+
+    def stats(self) -> Dict[str, int]:
+        """返回语料库统计：Gate.Line 条目数、已有译文的字段数、覆盖的 Gate 数"""
+        return {
+            "entries": len(self.entries),
+            "fields": sum(len(e['fields']) for e in self.entries.values()),
+            "gates": len({key.split('.')[0] for key in self.entries}),
+        }
+
+
+def _sort_key(gate_line: str):
+    """按 Gate 号、Line 号的数值排序"""
+    return tuple(int(part) for part in gate_line.split('.') if part.isdigit())
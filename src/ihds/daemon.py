@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Daily View Daemon
+~~~~~~~~~~~~~~~~~
+
+常驻模式：一个进程持续运行，HTTP 连接、翻译缓存、语料库和归档索引都保留在内存中。
+
+每次醒来的流程：
+1. 按本地星历判断（不访问网络）：太阳所在的 Gate.Line 已抓取时睡到下一次换 Line
+2. 需要抓取时先做一次廉价的变化探测（带 ETag / Last-Modified 的条件请求，
+   以及去空白后的页面哈希）；页面未变化时隔 retry_interval 再试
+3. 页面变化时复用探测得到的页面运行完整流水线，不再重复下载
+
+每次醒来后把状态写入 output/.cache/daemon_status.json；指定端口时还会在本机提供
+GET /health（正常 200，出错或卡住 503）和 GET /status（状态 JSON）。
+
+Usage:
+    from ihds.daemon import DailyViewDaemon
+
+    daemon = DailyViewDaemon(fetcher, health_port=8787)
+    daemon.serve_forever()   # SIGTERM / Ctrl-C 时调用 daemon.stop()
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from .storage import atomic_write_json
+
+
+# 没有新内容时的重试间隔（秒）
+DEFAULT_RETRY_INTERVAL = 15 * 60
+
+# 换 Line 之后等待网站更新的时间（秒）
+TRANSITION_GRACE = 5 * 60
+
+# 单次睡眠的上限（秒）：系统休眠或时钟调整后也能及时重新计算
+MAX_SLEEP = 60 * 60
+
+# 连续出错达到该次数时 /health 返回 503
+UNHEALTHY_ERRORS = 3
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(when: Optional[datetime]) -> Optional[str]:
+    return when.astimezone(timezone.utc).isoformat(timespec='seconds') if when else None
+
+
+class DailyViewDaemon:
+    """按星历和页面变化调度抓取的常驻循环"""
+
+    def __init__(
+        self,
+        fetcher,
+        status_path=None,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        health_port: Optional[int] = None,
+        health_host: str = "127.0.0.1",
+        on_record: Optional[Callable[[Any], None]] = None
+    ):
+        """
+        Args:
+            fetcher: IHDSDailyViewFetcher（整个进程复用同一个实例）
+            status_path: 状态文件（默认 output/.cache/daemon_status.json）
+            retry_interval: 需要抓取但页面未更新或出错时的重试间隔（秒）
+            health_port: 健康检查 HTTP 端口（None 表示不启动）
+            health_host: 健康检查监听的地址
+            on_record: 每次完整运行后调用（参数为当天的内容记录），例如生成海报
+        """
+        self.fetcher = fetcher
+        self.status_path = status_path or fetcher.cache_dir / "daemon_status.json"
+        self.retry_interval = max(60.0, float(retry_interval))
+        self.health_port = health_port
+        self.health_host = health_host
+        self.on_record = on_record
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.next_wakeup = _now()
+        self.status: Dict[str, Any] = {
+            'pid': os.getpid(),
+            'started_at': _iso(_now()),
+            'state': 'starting',
+            'last_check': None,
+            'last_result': None,
+            'last_error': None,
+            'consecutive_errors': 0,
+            'last_run': None,
+            'transit': None,
+            'next_wakeup': None,
+            'counts': {'checks': 0, 'probes': 0, 'runs': 0, 'errors': 0},
+        }
+
+    # ------------------------------------------------------------------
+    # 主循环
+    # ------------------------------------------------------------------
+
+    def serve_forever(self):
+        """运行到 stop() 被调用为止"""
+        if self.health_port is not None:
+            self._start_health_server()
+        try:
+            while not self._stop.is_set():
+                remaining = (self.next_wakeup - _now()).total_seconds()
+                if remaining > 0:
+                    self._update(state='sleeping')
+                    self._stop.wait(min(remaining, MAX_SLEEP))
+                    continue
+                self.next_wakeup = self.check()
+                self._update(next_wakeup=_iso(self.next_wakeup))
+        finally:
+            self._update(state='stopped')
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+
+    def stop(self):
+        """结束循环（可在信号处理函数中调用）"""
+        self._stop.set()
+
+    def check(self) -> datetime:
+        """
+        醒来一次：判断、探测，必要时运行完整流水线
+
+        Returns:
+            下一次醒来的时间（UTC）
+        """
+        now = _now()
+        self._update(state='checking', last_check=_iso(now))
+        self.status['counts']['checks'] += 1
+        retry_at = now + timedelta(seconds=self.retry_interval)
+        try:
+            # 其他进程（手动运行、回填）可能更新过归档索引
+            self.fetcher.manifest.reload_if_changed()
+            due, transit = self.fetcher.check_due(now)
+            transition_at = transit.end + timedelta(seconds=TRANSITION_GRACE)
+            self._update(transit={
+                'gate_line': transit.gate_line,
+                'start': _iso(transit.start),
+                'end': _iso(transit.end),
+            })
+            if not due:
+                print(f"   💤 {transit.gate_line} 已抓取，睡到換 Line 之後: {_local(transition_at)}")
+                self._finish('not_due')
+                return transition_at
+
+            self._update(state='probing')
+            self.status['counts']['probes'] += 1
+            # 探测属于随后的运行：先打开运行的指标，fetch_page 的耗时与重试不会被 run() 丢掉
+            self.fetcher.begin_run()
+            page_html = self.fetcher.fetch_page(conditional=True)
+            if page_html is None:
+                print(f"   ⏳ {transit.gate_line} 尚未抓取，頁面未更新，{_local(retry_at)} 再試")
+                self._finish('unchanged')
+                return min(retry_at, transition_at)
+
+            self._update(state='running')
+            started = time.time()
+            record = self.fetcher.run(page_html=page_html)
+            self.status['counts']['runs'] += 1
+            self._update(last_run={
+                'at': _iso(_now()),
+                'seconds': round(time.time() - started, 1),
+                'gate_line': record.gate_line if record else None,
+                'dir': record.path.name if record and record.path else None,
+            })
+            if record is not None and self.on_record is not None:
+                self.on_record(record)
+
+            # 网站可能还停留在上一条 Line：仍需抓取时按重试间隔再来
+            due, transit = self.fetcher.check_due()
+            self._finish('fetched')
+            if due:
+                return min(retry_at, transit.end + timedelta(seconds=TRANSITION_GRACE))
+            return transit.end + timedelta(seconds=TRANSITION_GRACE)
+        except Exception as e:
+            print(f"   ⚠️ 檢查失敗: {e}，{_local(retry_at)} 再試")
+            self.status['counts']['errors'] += 1
+            self._finish('error', error=f"{type(e).__name__}: {e}")
+            return retry_at
+
+    def _finish(self, result: str, error: Optional[str] = None):
+        with self._lock:
+            self.status['last_result'] = result
+            if error is None:
+                self.status['consecutive_errors'] = 0
+            else:
+                self.status['last_error'] = {'at': _iso(_now()), 'message': error}
+                self.status['consecutive_errors'] += 1
+
+    # ------------------------------------------------------------------
+    # 状态与健康检查
+    # ------------------------------------------------------------------
+
+    def _update(self, **fields):
+        """更新状态并写入状态文件（失败不影响主循环）"""
+        with self._lock:
+            self.status.update(fields)
+            snapshot = json.loads(json.dumps(self.status))
+        try:
+            atomic_write_json(self.status_path, snapshot)
+        except OSError as e:
+            print(f"   ⚠️ 狀態文件寫入失敗: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态（附带健康判断）"""
+        with self._lock:
+            status = json.loads(json.dumps(self.status))
+        status['healthy'] = self.healthy(status)
+        return status
+
+    def healthy(self, status: Optional[Dict[str, Any]] = None) -> bool:
+        """没有连续出错，且没有错过计划的醒来时间太久（主循环未卡住）"""
+        status = status or self.snapshot()
+        if status['consecutive_errors'] >= UNHEALTHY_ERRORS:
+            return False
+        if status['state'] in ('sleeping', 'stopped') or not status['next_wakeup']:
+            return True
+        # 检查或运行中：允许持续到计划时间之后一个重试间隔（含翻译等耗时）
+        overdue = _now() - datetime.fromisoformat(status['next_wakeup'])
+        return overdue.total_seconds() <= self.retry_interval + MAX_SLEEP
+
+    def _start_health_server(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path not in ('/health', '/status'):
+                    self.send_error(404)
+                    return
+                status = daemon.snapshot()
+                if path == '/health':
+                    code = 200 if status['healthy'] else 503
+                    body = b"ok\n" if status['healthy'] else b"unhealthy\n"
+                    content_type = "text/plain; charset=utf-8"
+                else:
+                    code = 200
+                    body = json.dumps(status, ensure_ascii=False, indent=1).encode('utf-8')
+                    content_type = "application/json; charset=utf-8"
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.health_host, self.health_port), Handler)
+        self._server.daemon_threads = True
+        thread = threading.Thread(target=self._server.serve_forever, name="ihds-health", daemon=True)
+        thread.start()
+        print(f"   🩺 健康檢查: http://{self.health_host}:{self._server.server_port}/health")
+
+
+def _local(when: datetime) -> str:
+    """UTC 时间 -> 本地时间字符串"""
+    return when.astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Sun Transit Ephemeris
+~~~~~~~~~~~~~~~~~~~~~
+
+本地计算太阳所在的 Gate.Line 及下一次换 Line 的时间（不需要网络）。
+
+Daily View 的内容对应太阳在人类图曼陀罗上的位置：曼陀罗从宝瓶座 2°（黄经 302°）
+的 Gate 41 开始，按固定顺序排列 64 个 Gate，每个 Gate 5.625°，每条 Line 0.9375°。
+太阳视黄经使用 Meeus《Astronomical Algorithms》第 25 章的低精度公式
+（误差约 0.01°，对应换 Line 时间误差约 15 分钟）。
+
+Usage:
+    from ihds.ephemeris import active_transit
+
+    transit = active_transit()
+    print(transit.gate_line, transit.start, transit.end)
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .archive import iter_archive_days
+
+
+# 曼陀罗起点（Gate 41 Line 1 的起始黄经）与宽度
+MANDALA_START = 302.0
+GATE_WIDTH = 360 / 64
+LINE_WIDTH = GATE_WIDTH / 6
+
+# 从黄经 302° 起依次经过的 Gate
+GATE_ORDER = (
+    41, 19, 13, 49, 30, 55, 37, 63, 22, 36, 25, 17, 21, 51, 42, 3,
+    27, 24, 2, 23, 8, 20, 16, 35, 45, 12, 15, 52, 39, 53, 62, 56,
+    31, 33, 7, 4, 29, 59, 40, 64, 47, 6, 46, 18, 48, 57, 32, 50,
+    28, 44, 1, 43, 14, 34, 9, 5, 26, 11, 10, 58, 38, 54, 61, 60,
+)
+
+# 力学时与世界时之差（秒），近年约 69 秒
+DELTA_T = 69.0
+
+# 太阳平均每天移动的黄经（度）
+MEAN_DAILY_MOTION = 0.9856
+
+# 归档日期的时区（定时任务按北京时间运行，日期目录按北京时间命名）：
+# 新建日期目录、重复检测和校验历史归档都按它计算日期（archive_date）
+ARCHIVE_TIMEZONE = timezone(timedelta(hours=8))
+
+_UNIX_EPOCH_JD = 2440587.5
+_J2000 = 2451545.0
+
+
+class Transit(NamedTuple):
+    """太阳在一条 Line 中停留的时段"""
+    gate: int
+    line: int
+    start: datetime  # 进入该 Line 的时间（UTC）
+    end: datetime    # 离开该 Line 的时间（UTC），即下一次换 Line
+
+    @property
+    def gate_line(self) -> str:
+        return f"{self.gate}.{self.line}"
+
+
+def _utc(when: Optional[datetime]) -> datetime:
+    if when is None:
+        return datetime.now(timezone.utc)
+    # 不带时区的时间视为本地时间
+    return when.astimezone(timezone.utc)
+
+
+def sun_longitude(when: Optional[datetime] = None) -> float:
+    """
+    太阳的视黄经（度，0 ~ 360）
+
+    Args:
+        when: 时间（默认现在；不带时区时视为本地时间）
+    """
+    when = _utc(when)
+    jde = when.timestamp() / 86400 + _UNIX_EPOCH_JD + DELTA_T / 86400
+    t = (jde - _J2000) / 36525
+    mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t * t
+    mean_anomaly = math.radians(357.52911 + 35999.05029 * t - 0.0001537 * t * t)
+    center = (
+        (1.914602 - 0.004817 * t - 0.000014 * t * t) * math.sin(mean_anomaly)
+        + (0.019993 - 0.000101 * t) * math.sin(2 * mean_anomaly)
+        + 0.000289 * math.sin(3 * mean_anomaly)
+    )
+    # 章动与光行差修正
+    omega = math.radians(125.04 - 1934.136 * t)
+    return (mean_longitude + center - 0.00569 - 0.00478 * math.sin(omega)) % 360
+
+
+def gate_line_at(longitude: float) -> Tuple[int, int]:
+    """黄经 -> (Gate, Line)"""
+    index = _line_index(longitude)
+    return GATE_ORDER[index // 6], index % 6 + 1
+
+
+def next_gate(gate: int) -> int:
+    """太阳在曼陀罗上经过 gate 之后进入的 Gate"""
+    return GATE_ORDER[(GATE_ORDER.index(int(gate)) + 1) % len(GATE_ORDER)]
+
+
+def _line_index(longitude: float) -> int:
+    return int(((longitude - MANDALA_START) % 360) // LINE_WIDTH) % (64 * 6)
+
+
+def _crossing(index: int, guess: datetime) -> datetime:
+    """太阳进入第 index 条 Line（从 Gate 41 Line 1 起算）的时间：已在该 Line 中的第一个整秒"""
+    boundary = (MANDALA_START + index * LINE_WIDTH) % 360
+    when = guess
+    for _ in range(10):
+        delta = (boundary - sun_longitude(when) + 180) % 360 - 180
+        step = timedelta(days=delta / MEAN_DAILY_MOTION)
+        when += step
+        if abs(step) < timedelta(milliseconds=1):
+            break
+    # 取整到秒：从不同起点迭代得到相同的结果
+    when = when.replace(microsecond=0)
+    while _line_index(sun_longitude(when)) != index:
+        when += timedelta(seconds=1)
+    return when
+
+
+def active_transit(when: Optional[datetime] = None) -> Transit:
+    """
+    某个时间太阳所在的 Gate.Line，以及进入和离开该 Line 的时间
+
+    Args:
+        when: 时间（默认现在）
+    """
+    when = _utc(when)
+    index = _line_index(sun_longitude(when))
+    start = _crossing(index, when)
+    end = _crossing((index + 1) % (64 * 6), when)
+    # 边界附近的数值误差：确保 start <= when < end
+    if start > when:
+        start = when
+    if end <= when:
+        end = when + timedelta(seconds=1)
+    return Transit(GATE_ORDER[index // 6], index % 6 + 1, start, end)
+
+
+def next_transition(when: Optional[datetime] = None) -> datetime:
+    """下一次换 Line 的时间（UTC）"""
+    return active_transit(when).end
+
+
+def archive_date(when: Optional[datetime] = None, tz: timezone = ARCHIVE_TIMEZONE) -> str:
+    """某一时刻（默认现在；不带时区时视为本地时间）在 tz 时区的日期，格式 YYYY-MM-DD"""
+    return _utc(when).astimezone(tz).strftime("%Y-%m-%d")
+
+
+def transits_on(date: str, tz: timezone = ARCHIVE_TIMEZONE) -> List[Transit]:
+    """
+    某一天（按 tz 时区）中太阳经过的所有 Line
+
+    Args:
+        date: YYYY-MM-DD
+        tz: 日期所在的时区
+    """
+    day_start = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=tz)
+    day_end = day_start + timedelta(days=1)
+    transits = []
+    when = day_start
+    while when < day_end:
+        transit = active_transit(when)
+        transits.append(transit)
+        when = transit.end
+    return transits
+
+
+def verify_archive(base_dir, tz: timezone = ARCHIVE_TIMEZONE) -> Dict[str, object]:
+    """
+    用历史归档校验星历：每个日期目录的 Gate.Line 应是当天太阳经过的某条 Line
+
+    Args:
+        base_dir: 归档根目录（output/daily_views）
+        tz: 日期目录所用的时区
+
+    Returns:
+        统计：checked / matched / mismatches [(目录名, 归档的 Gate.Line, 当天经过的 Gate.Line)]
+    """
+    checked = matched = 0
+    mismatches = []
+    for day in iter_archive_days(base_dir):
+        if not day.line:
+            continue
+        checked += 1
+        expected = [transit.gate_line for transit in transits_on(day.date, tz)]
+        if day.gate_line in expected:
+            matched += 1
+        else:
+            mismatches.append((day.path.name, day.gate_line, expected))
+    return {'checked': checked, 'matched': matched, 'mismatches': mismatches}
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Streaming Daily View Extractor
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+单次流式解析 Daily View 页面，取代对 BeautifulSoup 树的多次 find / find_all。
+
+抽取规则以声明式的 Rule 列表描述，模块加载时按标签名编译成查找表；
+解析时只维护一个轻量的元素栈，元素关闭时即与规则匹配，整个文档只遍历一次。
+输出字典与 IHDSDailyViewFetcher.parse_content_soup 完全一致。
+
+Usage:
+    from ihds.extractor import extract_daily_view
+
+    content = extract_daily_view(page_html)
+
+    # 也可以边下载边解析
+    extractor = DailyViewExtractor()
+    for chunk in chunks:
+        extractor.feed(chunk)
+    content = extractor.result()
+"""
+
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+RAVE_MANDALA_PREFIX = "data:image/png;base64,"
+
+DEFAULT_FOOTER_NOTE = (
+    "The Daily View reflects the impact the Sun (70% of the neutrino influence) "
+    "is having on humanity as it moves through the Gates and Lines of the Mandala. "
+    "Transits are potentials that you can witness in others and the world around you, "
+    "and, if correct for you, as you follow your individual Strategy and Authority, "
+    "may become a part of your experience as well."
+)
+
+# 正文段落收集到这些内容时停止
+MAIN_DESCRIPTION_STOP_WORDS = [
+    'Daily View reflects', 'Exaltation', 'Detriment',
+    'Copyright', 'Projectors are designed', 'Unlike energy Types',
+    'young people', 'register for an IHDS'
+]
+
+# 与 BeautifulSoup 一致的空元素（没有结束标签）
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed',
+    'frame', 'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link',
+    'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr'
+])
+
+# 这些元素内的文字不计入 get_text()
+NON_TEXT_ELEMENTS = frozenset(['script', 'style', 'template'])
+
+# within_class 规则只识别这些容器元素
+CONTAINER_ELEMENTS = frozenset(['div'])
+
+
+class Rule(NamedTuple):
+    """
+    一条抽取规则
+
+    Attributes:
+        name: 规则名（结果中以此为键）
+        tag: 元素标签名
+        class_: 要求包含的 class（None 表示不限）
+        string: 对元素 .string 的判断（与 BeautifulSoup 的 string= 参数语义相同）
+        capture: 'text'（get_text(strip=True)）、'em'（优先取 <em> 子元素文字）或 'attr:<name>'
+        first: True 只保留第一个匹配，False 按文档顺序保留全部
+        within_class: 只收集位于带有该 class 的 div 内的元素（按每个祖先 div 各计一次）
+    """
+    name: str
+    tag: str
+    class_: Optional[str] = None
+    string: Optional[Callable[[Optional[str]], Any]] = None
+    capture: str = 'text'
+    first: bool = True
+    within_class: Optional[str] = None
+
+
+DAILY_VIEW_RULES = [
+    Rule('gate_image', 'img', class_='gate', capture='attr:src'),
+    Rule('gate_title', 'h2'),
+    Rule('gate_subtitle', 'h4', string=lambda x: x and 'Gate of' in x, capture='em'),
+    Rule('first_h4', 'h4', capture='em'),
+    Rule('lead_description', 'p', class_='lead'),
+    Rule('text_lg', 'p', class_='text-lg', first=False),
+    Rule('cross_info', 'h4', string=lambda x: x and 'Cross' in x),
+    Rule('paragraphs', 'p', first=False),
+    Rule('line_title', 'h6', string=lambda x: x and 'Line' in x),
+    Rule('col_paragraphs', 'p', first=False, within_class='col-md-6'),
+    Rule('footer_note', 'p', string=lambda x: x and 'The Daily View reflects' in x),
+]
+
+
+def compile_rules(rules: List[Rule]) -> Dict[str, List[Rule]]:
+    """按标签名编译规则查找表"""
+    table: Dict[str, List[Rule]] = {}
+    for rule in rules:
+        table.setdefault(rule.tag, []).append(rule)
+    return table
+
+
+COMPILED_RULES = compile_rules(DAILY_VIEW_RULES)
+
+
+class _Node:
+    """解析过程中的轻量元素记录"""
+
+    __slots__ = ('tag', 'attrs', 'order', 'collect', 'pieces', 'children', 'only_child', 'em', 'ancestors')
+
+    def __init__(self, tag: str, attrs: Dict[str, str], order: int, collect: bool, ancestors: Tuple[int, ...]):
+        self.tag = tag
+        self.attrs = attrs
+        self.order = order          # 开始标签在文档中的序号
+        self.collect = collect      # 是否需要收集文字（只有规则涉及的元素才收集）
+        self.pieces: List[str] = []  # get_text(strip=True) 的组成部分
+        self.children = 0           # 直接子节点数（含空白文字、注释）
+        self.only_child = None      # 唯一子节点（str 或 _Node），用于计算 .string
+        self.em = None              # 文档顺序上第一个 <em> 子孙元素：(序号, 文字)
+        self.ancestors = ancestors  # 带有 within_class 的祖先 div 的序号
+
+    def text(self) -> str:
+        return ''.join(self.pieces)
+
+    def string(self) -> Optional[str]:
+        """与 BeautifulSoup Tag.string 相同：只有一个子节点时递归取其文字"""
+        if self.children != 1:
+            return None
+        child = self.only_child
+        return child if isinstance(child, str) else child.string()
+
+    def has_class(self, class_name: str) -> bool:
+        value = self.attrs.get('class')
+        if value is None:
+            return False
+        return value == class_name or class_name in value.split()
+
+
+class DailyViewExtractor(HTMLParser):
+    """单次流式解析 Daily View 页面"""
+
+    def __init__(self, rules: Dict[str, List[Rule]] = None):
+        super().__init__(convert_charrefs=True)
+        self.rules = rules if rules is not None else COMPILED_RULES
+        self.within_classes = {r.within_class for rs in self.rules.values() for r in rs if r.within_class}
+        self.matches: Dict[str, List[Tuple]] = {}
+        self.rave_mandala_b64 = None
+
+        self._stack: List[_Node] = []
+        self._order = 0
+        self._text_buffer: List[str] = []
+        self._non_text_depth = 0
+
+    # ---- HTMLParser 回调 ----
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        attr_map = {}
+        for key, value in attrs:
+            attr_map[key] = value if value is not None else ''
+            if value and self.rave_mandala_b64 is None and value.startswith(RAVE_MANDALA_PREFIX):
+                self.rave_mandala_b64 = value[len(RAVE_MANDALA_PREFIX):]
+
+        parent = self._stack[-1] if self._stack else None
+        ancestors = parent.ancestors if parent else ()
+        collect = tag in self.rules or tag == 'em'
+        node = _Node(tag, attr_map, self._order, collect, ancestors)
+        self._order += 1
+        if parent is not None:
+            self._add_child(parent, node)
+        if tag in CONTAINER_ELEMENTS and any(node.has_class(c) for c in self.within_classes):
+            node.ancestors = ancestors + (node.order,)
+
+        if tag in VOID_ELEMENTS:
+            self._close(node)
+        else:
+            self._stack.append(node)
+            if tag in NON_TEXT_ELEMENTS:
+                self._non_text_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        # 与 BeautifulSoup 相同：关闭到最近的同名元素，找不到则忽略
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index].tag == tag:
+                while len(self._stack) > index:
+                    self._close(self._stack.pop())
+                return
+
+    def handle_data(self, data):
+        self._text_buffer.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+        if self._stack:
+            self._add_child(self._stack[-1], data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        while self._stack:
+            self._close(self._stack.pop())
+
+    # ---- 内部处理 ----
+
+    def _add_child(self, parent: _Node, child):
+        parent.children += 1
+        parent.only_child = child if parent.children == 1 else None
+
+    def _flush_text(self):
+        if not self._text_buffer:
+            return
+        text = ''.join(self._text_buffer)
+        self._text_buffer = []
+        if not self._stack:
+            return
+        self._add_child(self._stack[-1], text)
+        stripped = text.strip()
+        if stripped and not self._non_text_depth:
+            for node in self._stack:
+                if node.collect:
+                    node.pieces.append(stripped)
+
+    def _close(self, node: _Node):
+        if node.tag in NON_TEXT_ELEMENTS and self._non_text_depth:
+            self._non_text_depth -= 1
+        if node.tag == 'em':
+            em = (node.order, node.text())
+            for ancestor in self._stack:
+                if ancestor.em is None or ancestor.em[0] > node.order:
+                    ancestor.em = em
+        # 子元素的文字已在 _flush_text 中计入所有祖先，这里只需匹配规则
+        for rule in self.rules.get(node.tag, ()):
+            self._match(rule, node)
+
+    def _match(self, rule: Rule, node: _Node):
+        # 元素按关闭顺序到达，first 规则保留开始序号最小的匹配
+        if rule.first and rule.name in self.matches and self.matches[rule.name][0][0] < node.order:
+            return
+        if rule.class_ and not node.has_class(rule.class_):
+            return
+        if rule.string is not None and not rule.string(node.string()):
+            return
+        if rule.within_class:
+            if not node.ancestors:
+                return
+            values = [(ancestor, node.order, node.text()) for ancestor in node.ancestors]
+        elif rule.capture.startswith('attr:'):
+            values = [(node.order, node.attrs.get(rule.capture[5:]))]
+        elif rule.capture == 'em':
+            values = [(node.order, node.em[1] if node.em is not None else node.text())]
+        else:
+            values = [(node.order, node.text())]
+
+        if rule.first:
+            self.matches[rule.name] = values
+        else:
+            self.matches.setdefault(rule.name, []).extend(values)
+
+    # ---- 结果 ----
+
+    def _first(self, name: str) -> Optional[str]:
+        values = self.matches.get(name)
+        return values[0][-1] if values else None
+
+    def _all(self, name: str) -> List[str]:
+        return [value[-1] for value in sorted(self.matches.get(name, []))]
+
+    def result(self) -> Dict[str, Any]:
+        """结束解析并生成内容字典"""
+        self.close()
+        content = {}
+
+        if 'gate_image' in self.matches:
+            img_url = self._first('gate_image')
+            if img_url:
+                content['gate_image_url'] = img_url
+                content['gate_image_filename'] = img_url.split('/')[-1]
+
+        if self.rave_mandala_b64:
+            content['rave_mandala_b64'] = self.rave_mandala_b64
+
+        if 'gate_title' in self.matches:
+            content['gate_title'] = self._first('gate_title')
+
+        subtitle_rule = 'gate_subtitle' if 'gate_subtitle' in self.matches else 'first_h4'
+        if subtitle_rule in self.matches:
+            content['gate_subtitle'] = self._first(subtitle_rule)
+
+        if 'lead_description' in self.matches:
+            content['lead_description'] = self._first('lead_description')
+
+        text_lg = self._all('text_lg')
+        if text_lg:
+            content['gate_range'] = text_lg[0]
+
+        if 'cross_info' in self.matches:
+            content['cross_info'] = self._first('cross_info')
+
+        for text in text_lg:
+            if 'Quarter' in text:
+                content['quarter_theme'] = text
+                break
+
+        main_paragraphs = []
+        found_main = False
+        for text in self._all('paragraphs'):
+            if text and 'This Gate is part of' in text:
+                main_paragraphs.append(text)
+                found_main = True
+            elif found_main and len(text) > 100:
+                if any(skip in text for skip in MAIN_DESCRIPTION_STOP_WORDS):
+                    break
+                main_paragraphs.append(text)
+        if main_paragraphs:
+            content['main_description'] = '\n\n'.join(main_paragraphs)
+
+        if 'line_title' in self.matches:
+            content['line_title'] = self._first('line_title')
+
+        for text in self._all('col_paragraphs'):
+            if 'Exaltation' in text:
+                content['exaltation'] = text.replace('Exaltation:', '').strip()
+            elif 'Detriment' in text:
+                content['detriment'] = text.replace('Detriment:', '').strip()
+
+        footer = self._first('footer_note')
+        content['footer_note'] = footer if footer is not None else DEFAULT_FOOTER_NOTE
+
+        return content
+
+
+def extract_daily_view(page_html: str) -> Dict[str, Any]:
+    """解析完整的页面 HTML，返回内容字典"""
+    extractor = DailyViewExtractor()
+    extractor.feed(page_html)
+    return extractor.result()
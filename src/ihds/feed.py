@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Daily View Feeds
+~~~~~~~~~~~~~~~~
+
+最近 N 天的订阅源：JSON Feed（output/feed.json）、RSS 2.0（output/rss.xml）
+和 Atom（output/atom.xml）。
+
+feed.json 本身就是订阅源的存储：每次运行读取它，把当天的条目插到最前面
+（同一天重跑时替换该条目，保留首次发布时间），截断为 N 条后重新写出三个文件。
+不会为了生成订阅源去重新读取归档。
+
+条目正文是中英文双语内容，由与 Markdown 相同的版式渲染（HTML 与纯文本）。
+阅读器无法解析相对路径，因此图片和链接只在设置 IHDS_FEED_BASE_URL（例如 GitHub Pages
+上 output/ 对应的地址）后输出，使用绝对地址；未设置时条目不含图片和链接。
+条目链接指向静态网站的每日页面，只在该页面已生成（output/site/days/ 中存在）时输出；
+之后生成网站时用 refresh() 补上链接。
+
+Usage:
+    from ihds.feed import FeedWriter
+
+    writer = FeedWriter("output", base_url="https://example.github.io/ihds")
+    writer.add(record)
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .content import DailyView
+from .renderer import IMAGE_COLLECTION, RenderKey, Renderer
+from .storage import atomic_write_json, atomic_write_text
+
+
+FEED_TITLE = "IHDS Daily View"
+FEED_DESCRIPTION = "IHDS Daily View 每日人類圖視圖（中英文）"
+FEED_HOME = "https://ihdschool.com/the-daily-view"
+JSON_FEED_VERSION = "https://jsonfeed.org/version/1.1"
+ITEM_ID_PREFIX = "urn:ihds-daily-view:"
+
+# 默认保留的条目数
+DEFAULT_MAX_ITEMS = 30
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+
+def feed_base_url(base_url: Optional[str] = None) -> str:
+    """订阅源中链接的前缀（参数优先，其次是环境变量 IHDS_FEED_BASE_URL），以 / 结尾或为空"""
+    base_url = (base_url or os.environ.get('IHDS_FEED_BASE_URL', '')).strip()
+    return base_url.rstrip('/') + '/' if base_url else ''
+
+
+def _no_image(name: str) -> str:
+    return ''
+
+
+class FeedWriter:
+    """增量维护 feed.json / rss.xml / atom.xml"""
+
+    def __init__(self, output_dir, base_url: Optional[str] = None, max_items: int = DEFAULT_MAX_ITEMS, variants=None):
+        """
+        Args:
+            output_dir: 订阅源所在目录（output/，与 Gate_Rave_Mandala_Collection 同级）
+            base_url: output/ 发布后的地址（默认使用环境变量 IHDS_FEED_BASE_URL）
+            max_items: 保留的条目数
+            variants: ImageVariants；提供时条目中的图片使用 640px JPEG 变体（已生成时）
+        """
+        self.variants = variants
+        self.output_dir = Path(output_dir)
+        self.base_url = feed_base_url(base_url)
+        self.max_items = max(1, int(max_items))
+        self.json_path = self.output_dir / "feed.json"
+        self.rss_path = self.output_dir / "rss.xml"
+        self.atom_path = self.output_dir / "atom.xml"
+        # 条目链接指向的静态网站（main.py --build-site 的默认位置）
+        self.site_dir = self.output_dir / "site"
+        if not self.base_url:
+            # 没有发布地址时图片只能是相对路径，阅读器无法加载：图片块整块省略
+            image_files = _no_image
+        elif variants is not None:
+            image_files = variants.resolver('email')
+        else:
+            image_files = None
+        self.renderer = Renderer(
+            formats=('html', 'txt'),
+            depths=(0,),
+            image_prefixes={0: f"{self.base_url}{IMAGE_COLLECTION}/"},
+            image_files=image_files
+        )
+
+    def load_items(self) -> List[Dict[str, Any]]:
+        """读取 feed.json 中已有的条目（文件不存在或损坏时为空）"""
+        try:
+            with open(self.json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        items = data.get('items') if isinstance(data, dict) else None
+        return items if isinstance(items, list) else []
+
+    def item(self, record: DailyView, published: datetime) -> Dict[str, Any]:
+        """一天的 JSON Feed 条目"""
+        dir_name = record.path.name if record.path else record.date
+        contents = {'zh': record.zh if record.zh.gate_title else None, 'en': record.en}
+        rendered = self.renderer.render(contents, datetime.strptime(record.date, "%Y-%m-%d"))
+        html_parts = []
+        text_parts = []
+        for lang in ('zh', 'en'):
+            if RenderKey('html', lang, 0) in rendered:
+                html_parts.append(rendered[RenderKey('html', lang, 0)])
+                text_parts.append(rendered[RenderKey('txt', lang, 0)])
+
+        title = record.zh.gate_title or record.en.gate_title or record.gate_line
+        item = {
+            'id': f"{ITEM_ID_PREFIX}{dir_name}",
+            'title': f"{record.date} · {record.gate_line} · {title}",
+            'content_html': "<hr>\n".join(html_parts),
+            'content_text': ("\n" + "=" * 40 + "\n\n").join(text_parts),
+            'date_published': published.isoformat(timespec='seconds'),
+            'tags': [f"Gate {record.gate}", f"Line {record.line}"] if record.line else [f"Gate {record.gate}"],
+        }
+        if self.base_url:
+            if record.en.gate_image_local:
+                image = record.en.gate_image_local
+                if self.variants is not None:
+                    image = self.variants.resolve(image, 'email')
+                item['image'] = f"{self.base_url}{IMAGE_COLLECTION}/{image}"
+        return item
+
+    def _site_url(self, page: str) -> Optional[str]:
+        """静态网站中页面的地址（没有发布地址或页面尚未生成时为 None）"""
+        if self.base_url and (self.site_dir / page).exists():
+            return f"{self.base_url}site/{page}"
+        return None
+
+    def _link_items(self, items: List[Dict[str, Any]]) -> bool:
+        """按每日页面当前是否存在设置或去掉条目的 url，返回是否有变化"""
+        changed = False
+        for item in items:
+            item_id = item.get('id', '')
+            url = None
+            if item_id.startswith(ITEM_ID_PREFIX):
+                url = self._site_url(f"days/{item_id[len(ITEM_ID_PREFIX):]}.html")
+            if item.get('url') != url:
+                changed = True
+                if url:
+                    item['url'] = url
+                else:
+                    item.pop('url', None)
+        return changed
+
+    def add(self, record: DailyView, now: Optional[datetime] = None) -> List[str]:
+        """
+        把一天的内容插到订阅源最前面并写出三个文件
+
+        Args:
+            record: 当天的内容记录
+            now: 发布时间（默认当前 UTC 时间）
+
+        Returns:
+            写入的文件路径
+        """
+        now = now or datetime.now(timezone.utc)
+        items = self.load_items()
+        new_item = self.item(record, now)
+        for old in items:
+            if old.get('id') == new_item['id']:
+                # 重跑同一天：保留首次发布时间
+                new_item['date_published'] = old.get('date_published', new_item['date_published'])
+                new_item['date_modified'] = now.isoformat(timespec='seconds')
+                break
+        items = [new_item] + [old for old in items if old.get('id') != new_item['id']]
+        items = items[:self.max_items]
+        self._link_items(items)
+        return self._write(items, now)
+
+    def refresh(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        生成静态网站后更新已有条目的链接（不添加条目）
+
+        Returns:
+            写入的文件路径（没有条目或链接没有变化时为空）
+        """
+        items = self.load_items()
+        if not items or not self._link_items(items):
+            return []
+        return self._write(items, now or datetime.now(timezone.utc))
+
+    def _write(self, items: List[Dict[str, Any]], now: datetime) -> List[str]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.json_path, self.json_feed(items))
+        atomic_write_text(self.rss_path, self.rss(items, now))
+        atomic_write_text(self.atom_path, self.atom(items, now))
+        return [str(self.json_path), str(self.rss_path), str(self.atom_path)]
+
+    def json_feed(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        feed = {
+            'version': JSON_FEED_VERSION,
+            'title': FEED_TITLE,
+            'description': FEED_DESCRIPTION,
+            'home_page_url': self._site_url("index.html") or FEED_HOME,
+            'language': 'zh-Hant',
+            'items': items,
+        }
+        if self.base_url:
+            feed['feed_url'] = f"{self.base_url}feed.json"
+        return feed
+
+    def rss(self, items: List[Dict[str, Any]], now: datetime) -> str:
+        rss = ET.Element('rss', version='2.0')
+        channel = ET.SubElement(rss, 'channel')
+        ET.SubElement(channel, 'title').text = FEED_TITLE
+        ET.SubElement(channel, 'link').text = self._site_url("index.html") or FEED_HOME
+        ET.SubElement(channel, 'description').text = FEED_DESCRIPTION
+        ET.SubElement(channel, 'language').text = 'zh-Hant'
+        ET.SubElement(channel, 'lastBuildDate').text = format_datetime(now)
+        for item in items:
+            entry = ET.SubElement(channel, 'item')
+            ET.SubElement(entry, 'title').text = item['title']
+            if item.get('url'):
+                ET.SubElement(entry, 'link').text = item['url']
+            ET.SubElement(entry, 'guid', isPermaLink='false').text = item['id']
+            ET.SubElement(entry, 'pubDate').text = format_datetime(datetime.fromisoformat(item['date_published']))
+            for tag in item.get('tags', []):
+                ET.SubElement(entry, 'category').text = tag
+            ET.SubElement(entry, 'description').text = item['content_html']
+        return '<?xml version="1.0" encoding="utf-8"?>\n' + ET.tostring(rss, encoding='unicode') + '\n'
+
+    def atom(self, items: List[Dict[str, Any]], now: datetime) -> str:
+        feed = ET.Element('feed', xmlns=ATOM_NS)
+        ET.SubElement(feed, 'id').text = f"{self.base_url}atom.xml" if self.base_url else "urn:ihds-daily-view:feed"
+        ET.SubElement(feed, 'title').text = FEED_TITLE
+        ET.SubElement(feed, 'subtitle').text = FEED_DESCRIPTION
+        ET.SubElement(feed, 'updated').text = now.isoformat(timespec='seconds')
+        ET.SubElement(ET.SubElement(feed, 'author'), 'name').text = FEED_TITLE
+        if self.base_url:
+            ET.SubElement(feed, 'link', rel='self', href=f"{self.base_url}atom.xml")
+        ET.SubElement(feed, 'link', rel='alternate', href=self._site_url("index.html") or FEED_HOME)
+        for item in items:
+            entry = ET.SubElement(feed, 'entry')
+            ET.SubElement(entry, 'id').text = item['id']
+            ET.SubElement(entry, 'title').text = item['title']
+            ET.SubElement(entry, 'published').text = item['date_published']
+            ET.SubElement(entry, 'updated').text = item.get('date_modified', item['date_published'])
+            if item.get('url'):
+                ET.SubElement(entry, 'link', rel='alternate', href=item['url'])
+            for tag in item.get('tags', []):
+                ET.SubElement(entry, 'category', term=tag)
+            ET.SubElement(entry, 'content', type='html').text = item['content_html']
+        return '<?xml version="1.0" encoding="utf-8"?>\n' + ET.tostring(feed, encoding='unicode') + '\n'
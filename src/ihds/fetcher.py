@@ -8,12 +8,38 @@ import os
 import re
 import json
 import base64
+import codecs
+import hashlib
 import html
-import requests
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from bs4 import BeautifulSoup
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+
+from .content import DailyView, DailyViewContent, load_day_dir, load_sidecar
+from .corpus import GateLineCorpus
+from .ephemeris import Transit, active_transit, archive_date, next_gate
+from .extractor import DEFAULT_FOOTER_NOTE, DailyViewExtractor, extract_daily_view
+from .feed import DEFAULT_MAX_ITEMS, FeedWriter
+from .gate_images import DEFAULT_WORKERS as GATE_IMAGE_WORKERS, GateImageCollection
+from .inline_image import InlineImageSpooler, SPOOLED_PLACEHOLDER
+from .mandala_store import MandalaStore, mandala_file
+from .manifest import ArchiveManifest
+from .metrics import RunMetrics, export_metrics
+from .search import SearchIndex
+from .pipeline import Pipeline, PipelineHalt, Stage
+from .profiling import StageProfiler
+from .renderer import RenderKey, Renderer, render_markdown
+from .transport import HttpTransport, get_transport
+from .storage import atomic_write_json, atomic_write_text
+from .translation_cache import TranslationCache
+from .translation_memory import TranslationMemory
+from .variants import ImageVariants, available as variants_available
 
 
 class IHDSDailyViewFetcher:
@@ -22,25 +48,188 @@ class IHDSDailyViewFetcher:
     DAILY_VIEW_URL = "https://ihdschool.com/the-daily-view"
     DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
     
-    def __init__(self, deepseek_api_key: str, output_dir: str = None):
+    # 需要翻译的字段（结果按此顺序返回）
+    TRANSLATE_FIELDS = [
+        'gate_title', 'gate_subtitle', 'lead_description',
+        'cross_info', 'quarter_theme', 'main_description',
+        'line_title', 'exaltation', 'detriment', 'footer_note'
+    ]
+    
+    # DeepSeek 翻译参数
+    DEEPSEEK_MODEL = "deepseek-chat"
+    TRANSLATE_TEMPERATURE = 0.3
+    TRANSLATE_SYSTEM_PROMPT = (
+        "你是一位專業的 Human Design（人類圖）翻譯專家。"
+        "請將以下英文內容翻譯成流暢、準確的繁體中文。"
+        "保留專有名詞如 Gate、Channel、Center 等的英文原文，可以在括號中加中文說明。"
+        "注意保持原文的專業性和深度。必須使用繁體中文。"
+    )
+    BATCH_SYSTEM_PROMPT = (
+        TRANSLATE_SYSTEM_PROMPT +
+        "輸入是一個 JSON 物件，每個值是一段待翻譯的英文。"
+        "請只輸出一個 JSON 物件：鍵與輸入完全相同，值為對應的繁體中文譯文，不要添加任何其他內容。"
+    )
+    # 翻译缓存的命名空间：批量提示词只是在翻译要求之后追加 JSON 输出格式，逐个翻译、批量翻译
+    # 和句段拼接得到的译文遵循同一份翻译要求，缓存键因此只包含翻译要求本身，不区分请求用的提示词；
+    # 修改 TRANSLATE_SYSTEM_PROMPT 时缓存随之失效
+    CACHE_NAMESPACE = TRANSLATE_SYSTEM_PROMPT
+    # 预读时从归档复制的译文：来自以前的提示词和模型，不属于上面的缓存键，单独存放在这个命名空间，
+    # translate_content 在模型缓存未命中后才查询
+    ARCHIVE_NAMESPACE = "archive"
+    # 批量翻译的输出 token 上限（deepseek-chat 最大 8K）
+    BATCH_MAX_TOKENS = 8192
+    
+    # 页面上的相邻 Gate："Gate 10 < Gate 58 > Gate 38"
+    GATE_RANGE_PATTERN = re.compile(r'Gate\s*(\d+)\s*<\s*Gate\s*(\d+)\s*>\s*Gate\s*(\d+)')
+    
+    # 同一个 Gate.Line 在这么多天内已有完整内容时视为重复（一年约循环一次）
+    DUPLICATE_WINDOW_DAYS = 7
+    
+    # Markdown / 提示词模板版本：修改 renderer.py 的版式（LAYOUT / TEMPLATES）或 render_ai_prompt 时递增，
+    # 回填（--backfill）会据此重新生成历史归档
+    TEMPLATE_VERSION = 2
+    
+    # 每次运行一遍渲染出的格式：Markdown（日期目录与 latest），以及 HTML 片段与纯文本邮件正文
+    RENDERER = Renderer(formats=('md', 'html', 'txt'))
+    # Markdown、HTML 片段引用的图片变体（640px JPEG，邮件客户端和 GitHub 都能显示）；
+    # 变体尚未生成时引用原图
+    MARKDOWN_VARIANT = 'email'
+    LATEST_FILES = {
+        'md': "latest_{lang}.md",
+        'html': "latest_{lang}.html",
+        'txt': "latest_email_{lang}.txt",
+    }
+    
+    def __init__(
+        self,
+        deepseek_api_key: str,
+        output_dir: str = None,
+        translate_workers: int = 4,
+        translate_deadline: float = 120,
+        batch_translate: bool = True,
+        use_cache: bool = True,
+        cache_max_entries: int = 5000,
+        use_translation_memory: bool = True,
+        use_corpus: bool = True,
+        force: bool = False,
+        transport: HttpTransport = None,
+        feed_base_url: str = None,
+        feed_items: int = DEFAULT_MAX_ITEMS,
+        lookahead: bool = False,
+        metrics_textfile: str = None,
+        profile: bool = False
+    ):
         self.api_key = deepseek_api_key
+        # 共用的 HTTP 传输层（连接池、默认超时、退避重试）
+        self.http = transport or get_transport()
+        # 并发翻译：工作线程数（1 表示逐个翻译）与整次翻译的截止时间（秒）
+        self.translate_workers = max(1, int(translate_workers))
+        self.translate_deadline = translate_deadline
+        # 批量翻译：一次请求翻译所有字段，失败的字段再逐个翻译
+        self.batch_translate = batch_translate
+        # 从 src/ihds/fetcher.py 向上两级到项目根目录
+        project_root = Path(__file__).parent.parent.parent
         # 默认输出到项目根目录的 output/daily_views
         if output_dir:
             self.base_output_dir = Path(output_dir)
         else:
-            # 从 src/ihds/fetcher.py 向上两级到项目根目录
-            project_root = Path(__file__).parent.parent.parent
             self.base_output_dir = project_root / "output" / "daily_views"
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
         
         # 统一的图片收藏目录
         self.images_collection_dir = self.base_output_dir.parent / "Gate_Rave_Mandala_Collection"
         self.images_collection_dir.mkdir(parents=True, exist_ok=True)
+        # Rave Mandala 图片库（按内容哈希去重）
+        self.mandalas = MandalaStore(self.images_collection_dir)
+        # Gate 图片与校验清单（gate_images.json）
+        self.gate_images = GateImageCollection(self.images_collection_dir, self.http)
+        
+        # 持久化翻译缓存（output/.cache/translations.sqlite3）
+        self.cache_dir = self.base_output_dir.parent / ".cache"
+        self.translation_cache = None
+        if use_cache:
+            self.translation_cache = TranslationCache(
+                self.cache_dir / "translations.sqlite3",
+                max_entries=cache_max_entries
+            )
         
-        # 日期字符串，目录会在解析内容后创建
-        self.date_str = datetime.now().strftime("%Y-%m-%d")
+        # 句段级翻译记忆（句段译文同样存放在翻译缓存中）
+        self.translation_memory = None
+        if use_translation_memory and self.translation_cache is not None:
+            self.translation_memory = TranslationMemory(
+                lookup=self._cache_get,
+                store=self._cache_put
+            )
+        
+        # Gate.Line 双语语料库：英文未变的字段直接使用已有译文
+        self.corpus = None
+        if use_corpus:
+            self.corpus = GateLineCorpus(self.cache_dir / "gate_line_corpus.json")
+        
+        # 归档索引：日期 -> Gate.Line -> 产物，用于重复检测和查找最新一天
+        self.manifest = ArchiveManifest(self.cache_dir / "manifest.json", self.base_output_dir)
+        # 全文检索索引（随归档索引增量更新）
+        self.search_index_path = self.cache_dir / "search.sqlite3"
+        # 订阅源：output/feed.json、rss.xml、atom.xml（每天在最前面插入一条）
+        # 图片变体（缩略图、JPEG、WebP；需要 Pillow），Markdown、网站和订阅源引用较小的版本
+        self.variants = ImageVariants(self.images_collection_dir, self.cache_dir / "image_variants.json")
+        self.feed = FeedWriter(
+            self.base_output_dir.parent,
+            base_url=feed_base_url,
+            max_items=feed_items,
+            variants=self.variants
+        )
+        
+        # 预读：运行结束后为下一个 Gate 预先下载图片、预热翻译缓存
+        self.lookahead_enabled = lookahead
+        
+        # 抓取状态：用于条件请求和页面未变化时提前结束（force=True 时忽略）
+        self.force = force
+        self.fetch_state_path = self.cache_dir / "fetch_state.json"
+        self._pending_fetch_state = None
+        # 流式下载时 Rave Mandala 的临时文件（确定 Gate 号后再移动到图片目录）；
+        # 每次下载单独创建，常驻进程与手动运行不会互相覆盖
+        self.rave_mandala_spool: Optional[Path] = None
+        # 下载时边接收边解析的结果：(页面 HTML, 内容字典)，parse_content 遇到同一页面时直接使用
+        self._streamed_content: Optional[Tuple[str, Dict[str, Any]]] = None
+        
+        # 耗时与成本指标：JSON Lines 日志与 Prometheus 文本文件（产生了新内容的运行结束时导出），
+        # 与运行日志一起放在项目根目录的 logs/（不提交到仓库）
+        self.metrics_log_path = project_root / "logs" / "metrics.jsonl"
+        self.metrics_textfile = Path(metrics_textfile) if metrics_textfile else project_root / "logs" / "metrics.prom"
+        
+        # 性能分析模式：各阶段依次在 cProfile 与 tracemalloc 下运行，报告写入日期目录的 profile/
+        self.profile_enabled = profile
+        if profile:
+            # cProfile 只记录启用它的线程（阶段所在的线程）：翻译也要在该线程中逐个执行，
+            # 否则工作线程中的请求与解析不会出现在报告里
+            self.translate_workers = 1
+        
+        self._run_open = False
+        self._reset_run_state()
+    
+    def begin_run(self):
+        """
+        提前开始一次运行：重置当天的状态并打开本次运行的指标
+        
+        run() 会自己调用 _reset_run_state；先用 fetch_page 探测页面、再把页面交给
+        run(page_html=...) 的调用方（常驻进程）应在探测前调用，探测的 fetch_page span
+        与重试次数因此记入同一次运行，不会被 run() 重置掉。
+        """
+        self._reset_run_state()
+        self._run_open = True
+    
+    def _reset_run_state(self):
+        """每次运行开始前重置当天的状态（常驻进程中同一个实例会运行多天）"""
+        # 日期字符串（按归档时区，与 check_due 一致），目录会在解析内容后创建
+        self.date_str = archive_date()
         self.output_dir = None
         self.gate_num = None  # 当前 Gate 号
+        self.line_num = None  # 当前 Line 号
+        self.metrics = RunMetrics('daily_view', transport=self.http)
+        # 本次运行是否生成了内容（页面未变化、内容已存在而提前结束时为 False）
+        self.produced_content = False
+        self.profiler = StageProfiler() if self.profile_enabled else None
     
     def _extract_gate_line_numbers(self, content: Dict[str, Any]) -> tuple:
         """从内容中提取 Gate 号和 Line 号"""
@@ -61,10 +250,11 @@ class IHDSDailyViewFetcher:
         
         return gate_num, line_num
     
-    def _setup_daily_directory(self, content: Dict[str, Any]):
-        """根据内容创建今天的目录，格式: 2026-01-06-54.1"""
+    def _setup_daily_directory(self, content: Dict[str, Any], create: bool = True):
+        """根据内容确定今天的目录，格式: 2026-01-06-54.1（create=False 时只确定路径，不创建）"""
         gate_num, line_num = self._extract_gate_line_numbers(content)
         self.gate_num = gate_num  # 保存 Gate 号供图片命名使用
+        self.line_num = line_num
         
         # 构建目录名: 日期-Gate号.Line号
         if gate_num and line_num:
@@ -75,20 +265,119 @@ class IHDSDailyViewFetcher:
             dir_name = self.date_str
         
         self.output_dir = self.base_output_dir / dir_name
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if create:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # 不再创建 images 子目录，图片统一存放在 Gate_Rave_Mandala_Collection
         
         return dir_name
         
-    def fetch_page(self) -> str:
-        """获取网页 HTML 内容"""
+    def _load_fetch_state(self) -> Dict[str, Any]:
+        """读取上次成功运行时保存的抓取状态（ETag / Last-Modified / 页面哈希）"""
+        try:
+            with open(self.fetch_state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_fetch_state(self, output_path: str):
+        """运行成功后保存抓取状态，供下次条件请求使用"""
+        if not self._pending_fetch_state:
+            return
+        state = dict(self._pending_fetch_state, output_path=output_path)
+        atomic_write_json(self.fetch_state_path, state)
+        self._pending_fetch_state = None
+    
+    # 流式下载的块大小
+    FETCH_CHUNK_SIZE = 16 * 1024
+    
+    def fetch_page(self, conditional: bool = True) -> Optional[str]:
+        """
+        获取网页 HTML 内容
+        
+        页面以流式方式下载：内联的 Rave Mandala base64 在下载过程中按块解码写入
+        本次下载的临时文件 rave_mandala_spool，返回的 HTML 中只保留一个占位符，
+        因此内存占用不随图片大小增长。每个块同时送入 DailyViewExtractor，
+        下载结束时内容也已解析完成（见 parse_content）。
+        
+        Args:
+            conditional: 是否使用上次保存的 ETag / Last-Modified 发送条件请求，
+                         并在页面内容哈希（去掉所有空白字符）未变化时视为无更新
+        
+        Returns:
+            网页 HTML（base64 图片已替换为占位符）；页面与上次成功运行时相同则返回 None
+        """
         headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
         }
-        response = requests.get(self.DAILY_VIEW_URL, headers=headers, timeout=30)
-        response.raise_for_status()
-        return response.text
+        state = self._load_fetch_state() if conditional else {}
+        if state.get('etag'):
+            headers["If-None-Match"] = state['etag']
+        if state.get('last_modified'):
+            headers["If-Modified-Since"] = state['last_modified']
+        
+        with self.metrics.span('fetch_page', conditional=bool(state)) as labels:
+            return self._download_page(headers, state, labels)
+    
+    def _download_page(self, headers: Dict[str, str], state: Dict[str, Any], labels: Dict[str, Any]) -> Optional[str]:
+        """fetch_page 的下载部分（labels 为 span 标签，记录结果：not_modified / unchanged / changed）"""
+        response = self.http.get(self.DAILY_VIEW_URL, headers=headers, timeout=30, stream=True)
+        with response:
+            if response.status_code == 304:
+                labels['result'] = 'not_modified'
+                return None
+            response.raise_for_status()
+            
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            spooler = InlineImageSpooler(self._new_spool())
+            extractor = DailyViewExtractor()
+            digest = hashlib.sha256()
+            parts = []
+            for raw in response.iter_content(chunk_size=self.FETCH_CHUNK_SIZE):
+                chunk = decoder.decode(raw)
+                # 去掉空白后逐块更新哈希，结果与整页去空白后计算相同
+                digest.update(re.sub(r'\s+', '', chunk).encode('utf-8'))
+                parts.append(spooler.feed(chunk))
+                extractor.feed(parts[-1])
+            chunk = decoder.decode(b'', final=True)
+            digest.update(re.sub(r'\s+', '', chunk).encode('utf-8'))
+            parts.append(spooler.feed(chunk))
+            parts.append(spooler.close())
+            extractor.feed(parts[-2] + parts[-1])
+        
+        page_hash = digest.hexdigest()
+        self._pending_fetch_state = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "page_hash": page_hash,
+            "fetched_at": datetime.now().isoformat(timespec='seconds'),
+        }
+        if state.get('page_hash') == page_hash:
+            labels['result'] = 'unchanged'
+            self._discard_spool()
+            return None
+        labels['result'] = 'changed'
+        if spooler.found:
+            print(f"   🖼️  Rave Mandala 已流式解碼 ({spooler.bytes_written} 字節)")
+        else:
+            self._discard_spool()
+        page_html = ''.join(parts)
+        self._streamed_content = (page_html, extractor.result())
+        return page_html
+    
+    def _new_spool(self) -> Path:
+        """为本次下载创建 Rave Mandala 临时文件（替换上一次未使用的临时文件）"""
+        self._discard_spool()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix="rave_mandala-", suffix=".png.tmp", delete=False) as spool:
+            self.rave_mandala_spool = Path(spool.name)
+        return self.rave_mandala_spool
+    
+    def _discard_spool(self):
+        """删除本次下载还没有存入图片库的 Rave Mandala 临时文件"""
+        if self.rave_mandala_spool is not None and self.rave_mandala_spool.exists():
+            self.rave_mandala_spool.unlink()
+        self.rave_mandala_spool = None
     
     def download_images(self, content: Dict[str, Any]) -> Dict[str, Any]:
         """下载图片到统一目录 Gate_Rave_Mandala_Collection"""
@@ -96,24 +385,20 @@ class IHDSDailyViewFetcher:
         
         # Gate 图片：检查是否已存在，不存在则下载
         if content.get('gate_image_url') and gate_num:
-            gate_image_path = self.images_collection_dir / f"Gate-{gate_num}.jpg"
-            
-            if not gate_image_path.exists():
-                try:
-                    response = requests.get(content['gate_image_url'], timeout=30)
-                    response.raise_for_status()
-                    with open(gate_image_path, 'wb') as f:
-                        f.write(response.content)
-                    print(f"   ✅ Gate-{gate_num}.jpg 已下載")
-                except Exception as e:
-                    print(f"   ⚠️ Gate 圖片下載失敗: {e}")
-            else:
-                print(f"   ⏭️  Gate-{gate_num}.jpg 已存在")
-            
+            with self.metrics.span('gate_image'):
+                self._download_gate_image(gate_num, content['gate_image_url'])
             content['gate_image_local'] = f"Gate-{gate_num}.jpg"
         
-        # Rave Mandala：每天動態生成，保存為 Gate-{num}-Rave-Mandala.png
-        if content.get('rave_mandala_b64') and gate_num:
+        # Rave Mandala：每天動態生成，按內容哈希保存到圖片庫（相同的星盤只保存一份）
+        if content.get('rave_mandala_b64') == SPOOLED_PLACEHOLDER and gate_num:
+            # 已在下载时流式解码，直接存入图片库
+            if self.rave_mandala_spool is not None and self.rave_mandala_spool.exists():
+                with self.metrics.span('mandala_store'):
+                    content['rave_mandala_local'] = self.mandalas.add_file(self.rave_mandala_spool, remove=True)
+                self.rave_mandala_spool = None
+            else:
+                print("   ⚠️ Rave Mandala 臨時文件不存在")
+        elif content.get('rave_mandala_b64') and gate_num:
             try:
                 b64_data = content['rave_mandala_b64']
                 
@@ -128,21 +413,54 @@ class IHDSDailyViewFetcher:
                 if missing_padding:
                     b64_data += '=' * (4 - missing_padding)
                 
-                img_data = base64.b64decode(b64_data)
-                rave_mandala_path = self.images_collection_dir / f"Gate-{gate_num}-Rave-Mandala.png"
+                with self.metrics.span('image_decode'):
+                    img_data = base64.b64decode(b64_data)
                 
-                # Rave Mandala 每天都更新（因为行星位置每天变化）
-                with open(rave_mandala_path, 'wb') as f:
-                    f.write(img_data)
-                content['rave_mandala_local'] = f"Gate-{gate_num}-Rave-Mandala.png"
-                print(f"   ✅ Gate-{gate_num}-Rave-Mandala.png 已保存 ({len(img_data)} 字節)")
+                # Rave Mandala 每天都更新（因为行星位置每天变化），每天指向自己的那一份
+                with self.metrics.span('mandala_store'):
+                    content['rave_mandala_local'] = self.mandalas.add_bytes(img_data)
             except Exception as e:
                 print(f"   ⚠️ Rave Mandala 解碼失敗: {e}")
         
         return content
     
+    def _download_gate_image(self, gate_num, url: str) -> Optional[Path]:
+        """确保 Gate 图片在图片收藏目录中且通过校验（缺失或损坏时下载），返回本地路径；失败时返回 None"""
+        return self.gate_images.ensure(gate_num, url)
+    
+    def prefetch_gate_images(self, workers: int = GATE_IMAGE_WORKERS, force: bool = False) -> Dict[str, int]:
+        """
+        校验全部 64 张 Gate 图片，并行下载缺失或校验失败的图片
+        
+        还不知道图片地址的规律时（新的图片收藏目录），先抓取一次当天页面得到一个图片地址。
+        
+        Args:
+            workers: 下载线程数
+            force: 全部重新下载
+            
+        Returns:
+            统计：verified / downloaded / repaired / failed
+        """
+        if self.gate_images.url_template is None:
+            page_html = self.fetch_page(conditional=False)
+            # 只需要图片地址：丢弃流式解码的 Rave Mandala
+            self._discard_spool()
+            url = extract_daily_view(page_html).get('gate_image_url') if page_html else None
+            if not url or not self.gate_images.learn_url(url):
+                print(f"   ⚠️ 無法從當天頁面確定 Gate 圖片地址: {url}")
+        return self.gate_images.prefetch(workers=workers, force=force)
+    
     def parse_content(self, page_html: str) -> Dict[str, Any]:
         """解析网页内容，提取每日视图信息（不下载图片）"""
+        # 刚下载的页面已在下载循环中解析过；其他来源（--stage 重跑、测试）再单次流式解析。
+        # 两者结果都与 parse_content_soup 相同
+        streamed, self._streamed_content = self._streamed_content, None
+        if streamed is not None and streamed[0] is page_html:
+            return streamed[1]
+        return extract_daily_view(page_html)
+    
+    def parse_content_soup(self, page_html: str) -> Dict[str, Any]:
+        """基于 BeautifulSoup 的原始解析实现（用于对照测试和基准测试）"""
         soup = BeautifulSoup(page_html, 'html.parser')
         content = {}
         
@@ -241,77 +559,232 @@ class IHDSDailyViewFetcher:
         if footer_text:
             content['footer_note'] = footer_text.get_text(strip=True)
         else:
-            content['footer_note'] = (
-                "The Daily View reflects the impact the Sun (70% of the neutrino influence) "
-                "is having on humanity as it moves through the Gates and Lines of the Mandala. "
-                "Transits are potentials that you can witness in others and the world around you, "
-                "and, if correct for you, as you follow your individual Strategy and Authority, "
-                "may become a part of your experience as well."
-            )
+            content['footer_note'] = DEFAULT_FOOTER_NOTE
         
         return content
     
-    def translate_to_chinese(self, text: str) -> str:
-        """使用 DeepSeek API 将文本翻译成中文"""
-        if not text:
-            return ""
-        
+    def _chat_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 2000,
+        json_mode: bool = False,
+        timeout: float = 60,
+        deadline: Optional[float] = None
+    ) -> str:
+        """调用 DeepSeek Chat Completion，返回回复文本（失败时抛出异常；deadline 见 _translation_deadline）"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
         payload = {
-            "model": "deepseek-chat",
+            "model": self.DEEPSEEK_MODEL,
             "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "你是一位專業的 Human Design（人類圖）翻譯專家。"
-                        "請將以下英文內容翻譯成流暢、準確的繁體中文。"
-                        "保留專有名詞如 Gate、Channel、Center 等的英文原文，可以在括號中加中文說明。"
-                        "注意保持原文的專業性和深度。必須使用繁體中文。"
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": f"請將以下內容翻譯成繁體中文（台灣用語）：\n\n{text}"
-                }
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
             ],
-            "temperature": 0.3,
-            "max_tokens": 2000
+            "temperature": self.TRANSLATE_TEMPERATURE,
+            "max_tokens": max_tokens
         }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
         
-        try:
-            response = requests.post(
+        mode = 'batch' if json_mode else 'field'
+        with self.metrics.span('deepseek_request', mode=mode):
+            # 翻译请求可以安全重放，5xx 时同样重试
+            response = self.http.post(
                 self.DEEPSEEK_API_URL,
                 headers=headers,
                 json=payload,
-                timeout=60
+                timeout=timeout,
+                idempotent=True,
+                deadline=deadline
             )
             response.raise_for_status()
             result = response.json()
-            return result['choices'][0]['message']['content'].strip()
+        self.metrics.add_usage(result.get('usage'), mode=mode)
+        return result['choices'][0]['message']['content'].strip()
+    
+    def _cache_get(self, text: str) -> Optional[str]:
+        """查询翻译缓存（未启用缓存时返回 None）"""
+        if self.translation_cache is None:
+            return None
+        return self.translation_cache.get(
+            text, self.CACHE_NAMESPACE, self.DEEPSEEK_MODEL, self.TRANSLATE_TEMPERATURE
+        )
+    
+    def _cache_put(self, text: str, translation: str):
+        """写入翻译缓存（翻译失败的结果不缓存）"""
+        if self.translation_cache is None or translation.startswith("[翻译失败]"):
+            return
+        self.translation_cache.put(
+            text, self.CACHE_NAMESPACE, self.DEEPSEEK_MODEL,
+            self.TRANSLATE_TEMPERATURE, translation
+        )
+    
+    def _archived_get(self, text: str) -> Optional[str]:
+        """查询预读时保存的归档译文（未启用缓存时返回 None）"""
+        if self.translation_cache is None:
+            return None
+        return self.translation_cache.get(text, self.ARCHIVE_NAMESPACE, '', 0.0)
+    
+    def _archived_put(self, text: str, translation: str):
+        """保存归档中的译文（与模型无关，不写入 CACHE_NAMESPACE）"""
+        if self.translation_cache is None or "[翻译失败]" in translation:
+            return
+        self.translation_cache.put(text, self.ARCHIVE_NAMESPACE, '', 0.0, translation)
+    
+    def translate_to_chinese(self, text: str, deadline: Optional[float] = None) -> str:
+        """使用 DeepSeek API 将文本翻译成中文（优先读取翻译缓存；deadline 为请求的截止时间）"""
+        if not text:
+            return ""
+        
+        cached = self._cache_get(text)
+        if cached is not None:
+            return cached
+        return self._request_translation(text, deadline)
+    
+    def _request_translation(self, text: str, deadline: Optional[float] = None) -> str:
+        """请求 DeepSeek 翻译一段文本并写入缓存（不查询缓存：调用方已经查询过）"""
+        try:
+            translation = self._chat_completion(
+                self.TRANSLATE_SYSTEM_PROMPT,
+                f"請將以下內容翻譯成繁體中文（台灣用語）：\n\n{text}",
+                deadline=deadline
+            )
         except Exception as e:
             print(f"翻译失败: {e}")
             return f"[翻译失败] {text}"
+        
+        self._cache_put(text, translation)
+        return translation
     
-    def translate_content(self, content: Dict[str, Any]) -> Dict[str, Any]:
-        """翻译所有内容到中文"""
-        chinese_content = {}
+    def _translation_deadline(self) -> Optional[float]:
+        """整次翻译的截止时间（time.monotonic()，从现在起 translate_deadline 秒）；未设置时为 None"""
+        return time.monotonic() + self.translate_deadline if self.translate_deadline else None
+    
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        """距截止时间的剩余秒数（不小于 0）；没有截止时间时为 None"""
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+    
+    def translate_batch(self, texts: Dict[str, str], deadline: Optional[float] = None) -> Dict[str, str]:
+        """
+        一次请求批量翻译多个字段
         
-        # 需要翻译的字段
-        fields_to_translate = [
-            'gate_title', 'gate_subtitle', 'lead_description',
-            'cross_info', 'quarter_theme', 'main_description',
-            'line_title', 'exaltation', 'detriment', 'footer_note'
-        ]
+        将所有字段组成 JSON 物件发送给 DeepSeek（JSON 输出模式），
+        再按键映射回译文。回复无法解析或缺少的字段，改为逐个并发翻译。
+        批量请求与逐个翻译共用同一个截止时间，整次翻译不超过 translate_deadline。
         
-        print("正在翻譯內容為繁體中文...")
-        for field in fields_to_translate:
-            if field in content and content[field]:
-                print(f"  翻譯 {field}...")
-                chinese_content[field] = self.translate_to_chinese(content[field])
+        Args:
+            texts: 字段名 -> 英文原文
+            deadline: 截止时间（默认从现在起 translate_deadline 秒）
+            
+        Returns:
+            字段名 -> 繁体中文译文（与 texts 的键一一对应）
+        """
+        if not texts:
+            return {}
+        
+        if deadline is None:
+            deadline = self._translation_deadline()
+        results = {}
+        if len(texts) > 1:
+            # 中文译文的 token 数大致与英文字符数的一半相当，预留结构开销
+            source_chars = sum(len(text) for text in texts.values())
+            max_tokens = min(self.BATCH_MAX_TOKENS, source_chars // 2 + 500)
+            try:
+                reply = self._chat_completion(
+                    self.BATCH_SYSTEM_PROMPT,
+                    json.dumps(texts, ensure_ascii=False, indent=2),
+                    max_tokens=max_tokens,
+                    json_mode=True,
+                    timeout=max(60, self.translate_deadline or 0),
+                    deadline=deadline
+                )
+                parsed = json.loads(reply)
+                if isinstance(parsed, dict):
+                    for key in texts:
+                        value = parsed.get(key)
+                        if isinstance(value, str) and value.strip():
+                            results[key] = value.strip()
+                            self._cache_put(texts[key], results[key])
+                print(f"  📦 批量翻譯完成 {len(results)}/{len(texts)} 個字段")
+            except Exception as e:
+                print(f"  ⚠️ 批量翻譯失敗: {e}")
+        
+        # 缺失的字段回退为逐个翻译
+        missing = {key: text for key, text in texts.items() if key not in results}
+        if missing:
+            print(f"  🔁 逐個翻譯剩餘 {len(missing)} 個字段...")
+            results.update(self._translate_fields(missing, deadline=deadline))
+        
+        return {key: results[key] for key in texts}
+    
+    def translate_content(
+        self,
+        content: Dict[str, Any],
+        known: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        翻译所有内容到中文
+        
+        known 中已有译文的字段（例如来自 Gate.Line 语料库）直接使用；
+        其余字段先查询持久化翻译缓存，再查询预读时保存的归档译文（ARCHIVE_NAMESPACE）；
+        都未命中的字段经翻译记忆切分为句段，只有
+        新句段才请求 DeepSeek。默认一次请求批量翻译（batch_translate），
+        缺失的部分再并发逐个翻译（线程数由 translate_workers 控制）。结果按
+        TRANSLATE_FIELDS 的固定顺序写回；超过 translate_deadline 仍未返回
+        的字段不再等待，标记为翻译失败并保留英文原文。
+        """
+        chinese_content = {}
+        fields = [f for f in self.TRANSLATE_FIELDS if content.get(f)]
+        # 批量请求、逐个翻译和翻译记忆的句段共用一个截止时间
+        deadline = self._translation_deadline()
+        
+        # 先用已知译文和翻译缓存，只有未命中的字段才请求 DeepSeek
+        translated = {f: known[f] for f in fields if known and known.get(f)}
+        if translated:
+            print(f"  📚 語料庫命中 {len(translated)}/{len(fields)} 個字段")
+        cache_hits = archived_hits = 0
+        for field in fields:
+            if field in translated:
+                continue
+            cached = self._cache_get(content[field])
+            if cached is not None:
+                translated[field] = cached
+                cache_hits += 1
+                continue
+            archived = self._archived_get(content[field])
+            if archived is not None:
+                translated[field] = archived
+                archived_hits += 1
+        if cache_hits:
+            print(f"  💾 緩存命中 {cache_hits}/{len(fields)} 個字段")
+        if archived_hits:
+            print(f"  🗄️  歸檔譯文命中 {archived_hits}/{len(fields)} 個字段")
+        texts = {f: content[f] for f in fields if f not in translated}
+        
+        if texts and self.translation_memory is not None:
+            translate = self.translate_batch if self.batch_translate else self._translate_fields
+            segmented = self.translation_memory.translate(texts, partial(translate, deadline=deadline))
+            for field, translation in segmented.items():
+                if "[翻译失败]" not in translation:
+                    self._cache_put(texts[field], translation)
+            translated.update(segmented)
+        elif texts and self.batch_translate:
+            print(f"正在批量翻譯內容為繁體中文（{len(texts)} 個字段）...")
+            translated.update(self.translate_batch(texts, deadline=deadline))
+        elif texts:
+            print(f"正在翻譯內容為繁體中文（{len(texts)} 個字段，{self.translate_workers} 線程）...")
+            translated.update(self._translate_fields(texts, deadline=deadline))
+        for field in fields:
+            chinese_content[field] = translated[field]
+        
+        if self.translation_cache is not None:
+            stats = self.translation_cache.stats()
+            print(f"  💾 翻譯緩存: 命中 {stats['hits']}，未命中 {stats['misses']}，共 {stats['entries']} 條")
         
         # 复制不需要翻译的字段
         for key in content:
@@ -320,270 +793,618 @@ class IHDSDailyViewFetcher:
         
         return chinese_content
     
-    def generate_markdown_en(self, content: Dict[str, Any]) -> str:
-        """生成英文 Markdown 文件"""
-        date_display = datetime.now().strftime("%B %d, %Y")
-        
-        # 图片路径：相对于日期目录，指向 Gate_Rave_Mandala_Collection
-        gate_image_file = content.get('gate_image_local', '')
-        rave_mandala_file = content.get('rave_mandala_local', '')
-        gate_image = f"../../Gate_Rave_Mandala_Collection/{gate_image_file}" if gate_image_file else ''
-        rave_mandala = f"../../Gate_Rave_Mandala_Collection/{rave_mandala_file}" if rave_mandala_file else ''
-        gate_title = content.get('gate_title', '')
-        gate_subtitle = content.get('gate_subtitle', '')
-        lead = content.get('lead_description', '')
-        cross = content.get('cross_info', '')
-        quarter = content.get('quarter_theme', '')
-        main_desc = content.get('main_description', '')
-        line_title = content.get('line_title', '')
-        exaltation = content.get('exaltation', '')
-        detriment = content.get('detriment', '')
-        
-        md = f"""# {gate_title}
-
-**{date_display}**
-
-"""
-        
-        # Gate 图片
-        if gate_image:
-            md += f"""![Gate]({gate_image})
-
-"""
-        
-        md += f"""## *{gate_subtitle}*
-
-> {lead}
-
-"""
-        
-        if cross:
-            md += f"""### {cross}
-
-"""
-        
-        if quarter:
-            md += f"""*{quarter}*
-
-"""
-        
-        md += """---
-
-"""
-        
-        if main_desc:
-            md += f"""{main_desc}
-
-"""
-        
-        # Rave Mandala 大图
-        if rave_mandala:
-            md += f"""![Rave Mandala]({rave_mandala})
-
-"""
-        
-        md += """---
-
-"""
-        
-        if line_title:
-            md += f"""### {line_title}
-
-"""
-        
-        if exaltation:
-            md += f"""**☀️ Exaltation:** {exaltation}
-
-"""
-        
-        if detriment:
-            md += f"""**🌑 Detriment:** {detriment}
-"""
+    def _translate_fields(self, texts: Dict[str, str], deadline: Optional[float] = None) -> Dict[str, str]:
+        """
+        并发翻译多个字段
         
-        return md
+        Args:
+            texts: 字段名 -> 英文原文
+            deadline: 截止时间（默认从现在起 translate_deadline 秒）
+            
+        Returns:
+            字段名 -> 繁体中文译文；超时的字段返回 "[翻译失败] 原文"
+        """
+        if not texts:
+            return {}
+        
+        if deadline is None:
+            deadline = self._translation_deadline()
+        
+        if self.translate_workers == 1 or len(texts) == 1:
+            # 逐个翻译同样受截止时间约束：到期后剩余字段不再请求
+            results = {}
+            for field, text in texts.items():
+                if deadline is not None and time.monotonic() >= deadline:
+                    results[field] = f"[翻译失败] {text}"
+                    print(f"  ⚠️ {field} 超時未翻譯（{self.translate_deadline}s）")
+                    continue
+                print(f"  翻譯 {field}...")
+                results[field] = self._translate_field(field, text, deadline)
+            return results
+        
+        start = time.time()
+        # 不使用 with 语句：超时后不等待慢字段，直接返回
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.translate_workers, len(texts)),
+            thread_name_prefix="translate"
+        )
+        futures = {
+            field: executor.submit(self._translate_field, field, text, deadline)
+            for field, text in texts.items()
+        }
+        wait(list(futures.values()), timeout=self._remaining(deadline))
+        for future in futures.values():
+            future.cancel()
+        executor.shutdown(wait=False)
+        
+        results = {}
+        for field, future in futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                results[field] = future.result()
+                print(f"  ✅ {field}")
+            else:
+                results[field] = f"[翻译失败] {texts[field]}"
+                print(f"  ⚠️ {field} 超時未完成（{self.translate_deadline}s）")
+        print(f"  ⏱️  翻譯耗時 {time.time() - start:.1f}s")
+        return results
     
-    def generate_markdown_zh(self, content: Dict[str, Any]) -> str:
-        """生成繁體中文 Markdown 文件"""
-        date_display = datetime.now().strftime("%Y年%m月%d日")
-        
-        # 图片路径：相对于日期目录，指向 Gate_Rave_Mandala_Collection
-        gate_image_file = content.get('gate_image_local', '')
-        rave_mandala_file = content.get('rave_mandala_local', '')
-        gate_image = f"../../Gate_Rave_Mandala_Collection/{gate_image_file}" if gate_image_file else ''
-        rave_mandala = f"../../Gate_Rave_Mandala_Collection/{rave_mandala_file}" if rave_mandala_file else ''
-        gate_title = content.get('gate_title', '')
-        gate_subtitle = content.get('gate_subtitle', '')
-        lead = content.get('lead_description', '')
-        cross = content.get('cross_info', '')
-        quarter = content.get('quarter_theme', '')
-        main_desc = content.get('main_description', '')
-        line_title = content.get('line_title', '')
-        exaltation = content.get('exaltation', '')
-        detriment = content.get('detriment', '')
-        
-        md = f"""# {gate_title}
-
-**{date_display}**
-
-"""
-        
-        # Gate 图片
-        if gate_image:
-            md += f"""![閘門]({gate_image})
-
-"""
-        
-        md += f"""## *{gate_subtitle}*
-
-> {lead}
-
-"""
-        
-        if cross:
-            md += f"""### {cross}
-
-"""
-        
-        if quarter:
-            md += f"""*{quarter}*
-
-"""
-        
-        md += """---
-
-"""
-        
-        if main_desc:
-            md += f"""{main_desc}
-
-"""
-        
-        # Rave Mandala 大图
-        if rave_mandala:
-            md += f"""![人類圖曼陀羅]({rave_mandala})
-
-"""
-        
-        md += """---
-
-"""
-        
-        if line_title:
-            md += f"""### {line_title}
-
-"""
+    def _translate_field(self, field: str, text: str, deadline: Optional[float] = None) -> str:
+        """逐个翻译一个字段（记录耗时；翻译记忆的句段与预读的 Gate.Line 前缀不作为标签）"""
+        name = field.rsplit('/', 1)[-1]
+        with self.metrics.span('translate_field', field=name if name in self.TRANSLATE_FIELDS else 'segment'):
+            return self._request_translation(text, deadline)
+    
+    @staticmethod
+    def generate_markdown_en(content: Dict[str, Any], date: Optional[datetime] = None) -> str:
+        """生成英文 Markdown 文件（date 为显示的日期，默认今天）"""
+        return render_markdown(content, 'en', date)
+    
+    @staticmethod
+    def generate_markdown_zh(content: Dict[str, Any], date: Optional[datetime] = None) -> str:
+        """生成繁體中文 Markdown 文件（date 为显示的日期，默认今天）"""
+        return render_markdown(content, 'zh', date)
+    
+    @classmethod
+    def write_latest(cls, base_output_dir: Path, rendered: Dict[RenderKey, str]) -> List[str]:
+        """
+        保存 latest 版本到 daily_views 根目录
         
-        if exaltation:
-            md += f"""**☀️ 高階表達:** {exaltation}
-
-"""
+        Args:
+            base_output_dir: daily_views 目录
+            rendered: RENDERER 的输出（取图片路径为 ../ 的 Markdown、HTML 片段与纯文本邮件正文）
+            
+        Returns:
+            写入的文件路径
+        """
+        paths = []
+        for (fmt, lang, depth), text in sorted(rendered.items()):
+            if depth != 1 or fmt not in cls.LATEST_FILES:
+                continue
+            path = Path(base_output_dir) / cls.LATEST_FILES[fmt].format(lang=lang)
+            atomic_write_text(path, text)
+            paths.append(str(path))
+        return paths
+    
+    def _check_duplicate(self) -> Optional[Path]:
+        """
+        检查当前 Gate.Line 是否已有完整内容（防止重复抓取）
         
-        if detriment:
-            md += f"""**🌑 低階表達:** {detriment}
-"""
+        在归档索引中查找该 Gate.Line 最近一次出现的记录：DUPLICATE_WINDOW_DAYS 天内
+        已有中英文版时视为重复。Gate.Line 跨日时，第二天不会再抓取和翻译一次。
         
-        return md
+        Returns:
+            已有英文版的路径；不是重复内容时返回 None
+        """
+        if self.output_dir is None or not self.gate_num:
+            return None
+        
+        seen = self.manifest.last_seen(self._current_gate_line(), before=self.date_str)
+        if seen is None:
+            return None
+        date, entry = seen
+        if 'en' not in entry['artifacts'] or 'zh' not in entry['artifacts']:
+            return None
+        age = datetime.strptime(self.date_str, "%Y-%m-%d") - datetime.strptime(date, "%Y-%m-%d")
+        if age.days > self.DUPLICATE_WINDOW_DAYS:
+            return None
+        return self.manifest.path_of(entry, 'en')
     
-    def _check_duplicate(self) -> bool:
+    def check_due(self, now: Optional[datetime] = None) -> Tuple[bool, Transit]:
         """
-        检查当前内容是否已存在（防止重复抓取）
+        按本地星历判断是否需要抓取（不访问网络）
         
+        太阳当前所在的 Gate.Line 在 DUPLICATE_WINDOW_DAYS 天内已有完整中英文内容时
+        不需要抓取；否则说明换 Line 后还没有抓到新内容。
+        
+        Args:
+            now: 判断的时间（默认现在）
+            
         Returns:
-            True 表示内容已存在，应跳过；False 表示是新内容
+            (是否需要抓取, 当前所在的 Line 及其起止时间)
         """
-        if self.output_dir is None:
-            return False
-        
-        en_file = self.output_dir / f"daily_view_{self.date_str}_en.md"
-        zh_file = self.output_dir / f"daily_view_{self.date_str}_zh.md"
+        transit = active_transit(now)
+        today = archive_date(now)
+        seen = self.manifest.last_seen(transit.gate_line, before=today)
+        if seen is None:
+            return True, transit
+        date, entry = seen
+        if 'en' not in entry['artifacts'] or 'zh' not in entry['artifacts']:
+            return True, transit
+        age = datetime.strptime(today, "%Y-%m-%d") - datetime.strptime(date, "%Y-%m-%d")
+        return age.days > self.DUPLICATE_WINDOW_DAYS, transit
+    
+    def upcoming_gate(self, en_content: Dict[str, Any]) -> Optional[int]:
+        """
+        下一个 Gate：取自页面的 gate_range（"Gate 10 < Gate 58 > Gate 38"），
+        缺失或与当前 Gate 对不上时按曼陀罗顺序推算
+        """
+        match = self.GATE_RANGE_PATTERN.search(en_content.get('gate_range') or '')
+        if match and self.gate_num and match.group(2) == str(self.gate_num):
+            return int(match.group(3))
+        if self.gate_num:
+            return next_gate(int(self.gate_num))
+        return int(match.group(3)) if match else None
+    
+    def lookahead(self, en_content: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        为下一个 Gate 预读，使换 Gate 后的第一次运行与同一 Gate 内的运行一样快
         
-        if en_file.exists() and zh_file.exists():
-            return True
+        - 按当天 Gate 图片地址的规律预先下载下一个 Gate 的图片
+        - 下一个 Gate 在归档中的每一条 Line（各取最近一天）：已有译文的字段保存为归档译文
+          （ARCHIVE_NAMESPACE，不混入按模型区分的翻译缓存）；没有可用译文的字段现在就翻译。
+          Gate 级字段（标题、副标题、描述等）在同一个 Gate 内不变，换 Gate 当天会直接命中
         
-        return False
+        Args:
+            en_content: 当天解析出的英文内容（gate_range 与 gate_image_url）
+            
+        Returns:
+            统计：gate / image（本地路径或 None）/ warmed / translated
+        """
+        gate = self.upcoming_gate(en_content)
+        stats = {'gate': gate, 'image': None, 'warmed': 0, 'translated': 0}
+        if gate is None:
+            print("   ⚠️ 無法確定下一個 Gate")
+            return stats
+        
+        image_url = en_content.get('gate_image_url') or ''
+        if re.search(r'gate-\d+', image_url):
+            image_url = re.sub(r'gate-\d+', f"gate-{gate}", image_url)
+            image_path = self._download_gate_image(gate, image_url)
+            stats['image'] = str(image_path) if image_path else None
+            if image_path and variants_available():
+                self.variants.sync(names=[image_path.name], workers=1, variants=(self.MARKDOWN_VARIANT,))
+        
+        if self.translation_cache is None:
+            print("   ⏭️  翻譯緩存未啟用，只預讀圖片")
+            return stats
+        
+        # 每条 Line 取最近一天（for_gate 按日期升序）
+        latest = {}
+        for date, gate_line, entry in self.manifest.for_gate(str(gate)):
+            latest[gate_line] = entry
+        pending = {}
+        for gate_line, entry in sorted(latest.items()):
+            record = load_day_dir(self.manifest.archive_dir / entry['dir'])
+            if record is None:
+                continue
+            en, zh = record.en.to_dict(), record.zh.to_dict()
+            for field in self.TRANSLATE_FIELDS:
+                text = en.get(field)
+                if (
+                    not text or text in pending.values()
+                    or self._cache_get(text) is not None or self._archived_get(text) is not None
+                ):
+                    continue
+                translation = zh.get(field)
+                if translation and "[翻译失败]" not in translation and translation != text:
+                    self._archived_put(text, translation)
+                    stats['warmed'] += 1
+                else:
+                    pending[f"{gate_line}/{field}"] = text
+        
+        if pending:
+            translate = partial(
+                self.translate_batch if self.batch_translate else self._translate_fields,
+                deadline=self._translation_deadline()
+            )
+            if self.translation_memory is not None:
+                results = self.translation_memory.translate(pending, translate)
+            else:
+                results = translate(pending)
+            for key, translation in results.items():
+                if "[翻译失败]" not in translation:
+                    self._cache_put(pending[key], translation)
+                    stats['translated'] += 1
+        
+        if latest:
+            print(f"   ✅ Gate {gate}: 歸檔中 {len(latest)} 條 Line，預熱緩存 {stats['warmed']} 個字段，預先翻譯 {stats['translated']} 個字段")
+        else:
+            print(f"   ⏭️  Gate {gate} 不在歸檔中，沒有可預熱的譯文")
+        return stats
     
-    def run(self) -> str:
-        """执行完整的抓取、翻译和生成流程"""
-        print("=" * 60)
-        print("IHDS Daily View Fetcher")
-        print("=" * 60)
-        
-        # 1. 获取网页内容
+    def update_search_index(self) -> Dict[str, int]:
+        """按归档索引增量更新全文检索索引（只索引新增或变化的日期）"""
+        try:
+            with SearchIndex(self.search_index_path) as index:
+                stats = index.sync(self.manifest)
+        except sqlite3.Error as e:
+            print(f"   ⚠️ 檢索索引更新失敗: {e}")
+            return {}
+        if stats['indexed'] or stats['removed']:
+            print(f"   🔎 檢索索引: 新增/更新 {stats['indexed']} 天，移除 {stats['removed']} 天")
+        return stats
+    
+    def _current_gate_line(self) -> str:
+        """当前的 Gate.Line 键（与归档目录名一致）"""
+        return f"{self.gate_num}.{self.line_num}" if self.line_num else str(self.gate_num)
+    
+    def _latest_en_path(self) -> str:
+        """归档索引中最新一天的英文版路径"""
+        latest = self.manifest.latest()
+        if latest is not None:
+            return str(self.manifest.path_of(latest[2], 'en'))
+        return str(self.base_output_dir / "latest_en.md")
+    
+    # 流水线阶段：名称 -> (必需输入, 输出, 可选输入, 在这些阶段之后运行)
+    # images / translate / render_en / ai_prompt 互不依赖，会被并发执行；
+    # render_* 一次渲染出该语言的所有格式（rendered_*），latest 直接取其中 ../ 路径的版本；
+    # render_* 与 feed 引用磁盘上的图片变体，不使用 variants 的输出，只需排在它之后
+    STAGES = (
+        ('fetch', (), ('page_html',), (), ()),
+        ('parse', ('page_html',), ('en_content',), (), ()),
+        ('prepare', ('en_content',), ('dir_name',), (), ()),
+        ('images', ('en_content', 'dir_name'), ('images',), (), ()),
+        ('variants', ('images',), ('variants',), (), ()),
+        ('translate', ('en_content', 'dir_name'), ('zh_content',), (), ()),
+        ('render_en', ('en_content', 'dir_name'), ('rendered_en', 'path_en'), ('images',), ('variants',)),
+        ('render_zh', ('zh_content',), ('rendered_zh', 'path_zh'), ('images',), ('variants',)),
+        ('latest', ('rendered_en', 'rendered_zh'), ('latest_paths',), (), ()),
+        ('ai_prompt', ('en_content', 'dir_name'), ('prompt_path',), ('images',), ()),
+        ('record', ('en_content', 'zh_content'), ('record',), ('images',), ()),
+        ('feed', ('record',), ('feed_paths',), (), ('variants',)),
+        ('lookahead', ('en_content', 'record'), ('lookahead',), (), ()),
+    )
+    
+    def build_pipeline(self, max_workers: int = 4) -> Pipeline:
+        """按 STAGES 声明构建流水线，阶段函数为 _stage_<name> 方法"""
+        return Pipeline(
+            [
+                Stage(name, self._timed_stage(name, getattr(self, f"_stage_{name}")), inputs, outputs, optional, after)
+                for name, inputs, outputs, optional, after in self.STAGES
+            ],
+            max_workers=max_workers
+        )
+    
+    def _timed_stage(self, name: str, func):
+        """阶段函数外包一层 span（PipelineHalt 记为提前结束，不算失败）；性能分析模式下同时收集热点与内存分配"""
+        def stage(*args):
+            with self.metrics.span('stage', stage=name) as labels:
+                try:
+                    if self.profiler is not None:
+                        return self.profiler.run_stage(name, func, *args)
+                    return func(*args)
+                except PipelineHalt as halt:
+                    labels['halted'] = True
+                    halted = halt
+            raise halted
+        return stage
+    
+    def _stage_fetch(self) -> str:
+        """获取网页内容（页面未变化时结束流水线）"""
         print("\n📥 正在獲取網頁內容...")
-        html = self.fetch_page()
+        html = self.fetch_page(conditional=not self.force)
+        if html is None:
+            state = self._load_fetch_state()
+            print("   ⏭️  頁面與上次運行相同，無需重新處理")
+            raise PipelineHalt(state.get('output_path') or self._latest_en_path())
         print("   ✅ 網頁獲取成功")
-        
-        # 2. 解析内容（不下载图片）
+        return html
+    
+    def _stage_parse(self, page_html: str) -> Dict[str, Any]:
+        """解析内容（不下载图片）"""
         print("\n🔍 正在解析內容...")
-        en_content = self.parse_content(html)
+        en_content = self.parse_content(page_html)
         print(f"   ✅ 解析成功，Gate: {en_content.get('gate_title', 'Unknown')}")
-        
-        # 3. 根据内容创建目录（格式: 2026-01-06-54.1）
-        dir_name = self._setup_daily_directory(en_content)
+        return en_content
+    
+    def _stage_prepare(self, en_content: Dict[str, Any]) -> str:
+        """创建日期目录；同一个 Gate.Line 的内容已存在时结束流水线"""
+        # 根据内容确定目录（格式: 2026-01-06-54.1），确认不是重复内容后再创建
+        dir_name = self._setup_daily_directory(en_content, create=False)
         print(f"   📁 目錄: {dir_name}")
         
-        # 3.5 重复检测：如果同一个 Gate.Line 的内容已存在，跳过
-        if self._check_duplicate():
-            print(f"\n   ⏭️  {dir_name} 已存在完整內容，跳過本次抓取")
-            print("\n" + "=" * 60)
-            print("✨ 內容已是最新，無需重複抓取!")
-            print("=" * 60)
-            # 返回已有文件的路径
-            return str(self.output_dir / f"daily_view_{self.date_str}_en.md")
-        
-        # 4. 下载图片
+        existing = None if self.force else self._check_duplicate()
+        if existing is not None:
+            print(f"\n   ⏭️  {self._current_gate_line()} 已存在完整內容（{existing.parent.name}），跳過本次抓取")
+            self._save_fetch_state(str(existing))
+            raise PipelineHalt(str(existing))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        return dir_name
+    
+    def _stage_images(self, en_content: Dict[str, Any], dir_name: str) -> Dict[str, str]:
+        """下载图片，返回本地图片文件名"""
         print("\n📷 正在下載圖片...")
-        en_content = self.download_images(en_content)
-        
-        # 5. 翻译内容
+        # 在副本上操作，避免与并发运行的阶段共享可变的内容字典
+        content = self.download_images(dict(en_content))
+        return {
+            key: content[key]
+            for key in ('gate_image_local', 'rave_mandala_local')
+            if content.get(key)
+        }
+    
+    def _stage_variants(self, images: Dict[str, str]) -> Dict[str, int]:
+        """为当天的图片生成 Markdown 引用的变体（未安装 Pillow 时跳过；其余用途由 --build-site 生成）"""
+        if not variants_available():
+            print("   ⏭️  未安裝 Pillow，跳過圖片變體")
+            return {}
+        stats = self.variants.sync(names=images.values(), workers=1, variants=(self.MARKDOWN_VARIANT,))
+        print(f"   🖼️  圖片變體: 生成 {stats['built']} 張，跳過 {stats['skipped']} 張（未變化）")
+        return stats
+    
+    def _stage_translate(self, en_content: Dict[str, Any], dir_name: str) -> Dict[str, Any]:
+        """翻译内容（先从 Gate.Line 语料库取已有译文）"""
         print("\n🌐 正在翻譯為繁體中文...")
-        zh_content = self.translate_content(en_content)
+        gate_line = self._current_gate_line()
+        known = self.corpus.resolve(gate_line, en_content) if self.corpus else None
+        zh_content = self.translate_content(en_content, known=known)
+        if self.corpus is not None and self.line_num:
+            changed = self.corpus.update(gate_line, self.date_str, en_content, zh_content)
+            if changed:
+                self.corpus.save()
+                print(f"   📚 語料庫已更新 {gate_line}（{changed} 個字段）")
         print("   ✅ 翻譯完成")
-        
-        # 6. 生成 Markdown 文件
-        print("\n📝 正在生成 Markdown 文件...")
-        print(f"   📁 保存目錄: {self.output_dir}")
-        
-        # 生成英文版 (保存到日期目录，文件名包含日期)
-        markdown_en = self.generate_markdown_en(en_content)
-        filename_en = f"daily_view_{self.date_str}_en.md"
-        filepath_en = self.output_dir / filename_en
-        with open(filepath_en, 'w', encoding='utf-8') as f:
-            f.write(markdown_en)
+        return zh_content
+    
+    def _render(self, lang: str, content: Dict[str, Any], images: Optional[Dict[str, str]]) -> Tuple[Dict[RenderKey, str], Path]:
+        """渲染一种语言的所有格式（图片引用变体），并把 Markdown 保存到日期目录（文件名包含日期）"""
+        with self.metrics.span('render', lang=lang):
+            rendered = self.RENDERER.render(
+                {lang: dict(content, **(images or {}))},
+                image_files=self.variants.resolver(self.MARKDOWN_VARIANT)
+            )
+        filepath = self.output_dir / f"daily_view_{self.date_str}_{lang}.md"
+        with self.metrics.span('write', file='markdown'):
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(rendered[RenderKey('md', lang, 2)])
+        return rendered, filepath
+    
+    def _stage_render_en(
+        self,
+        en_content: Dict[str, Any],
+        dir_name: str,
+        images: Optional[Dict[str, str]]
+    ) -> Tuple[Dict[RenderKey, str], str]:
+        """生成英文版（排在 variants 之后：引用当天新生成的图片变体）"""
+        rendered_en, filepath_en = self._render('en', en_content, images)
         print(f"   ✅ 英文版: {filepath_en}")
-        
-        # 生成繁體中文版
-        markdown_zh = self.generate_markdown_zh(zh_content)
-        filename_zh = f"daily_view_{self.date_str}_zh.md"
-        filepath_zh = self.output_dir / filename_zh
-        with open(filepath_zh, 'w', encoding='utf-8') as f:
-            f.write(markdown_zh)
+        return rendered_en, str(filepath_en)
+    
+    def _stage_render_zh(
+        self,
+        zh_content: Dict[str, Any],
+        images: Optional[Dict[str, str]]
+    ) -> Tuple[Dict[RenderKey, str], str]:
+        """生成繁體中文版（排在 variants 之后：引用当天新生成的图片变体）"""
+        rendered_zh, filepath_zh = self._render('zh', zh_content, images)
         print(f"   ✅ 繁體中文版: {filepath_zh}")
+        return rendered_zh, str(filepath_zh)
+    
+    def _stage_latest(self, rendered_en: Dict[RenderKey, str], rendered_zh: Dict[RenderKey, str]) -> List[str]:
+        """保存 latest 版本到根目录（图片路径为 ../）和纯文本邮件正文"""
+        with self.metrics.span('write', file='latest'):
+            latest_paths = self.write_latest(self.base_output_dir, {**rendered_en, **rendered_zh})
+        for path in latest_paths:
+            print(f"   ✅ 最新版本: {path}")
+        return latest_paths
+    
+    def _stage_ai_prompt(
+        self,
+        en_content: Dict[str, Any],
+        dir_name: str,
+        images: Optional[Dict[str, str]]
+    ) -> str:
+        """生成 AI 绘图提示词文件（参考图片指向当天的 Rave Mandala）"""
+        prompt_path = self.generate_ai_prompt(dict(en_content, **(images or {})))
+        print(f"   🎨 提示詞文件: {prompt_path}")
+        return prompt_path
+    
+    def _stage_record(
+        self,
+        en_content: Dict[str, Any],
+        zh_content: Dict[str, Any],
+        images: Optional[Dict[str, str]]
+    ) -> DailyView:
+        """保存结构化内容 content_{date}.json"""
+        record = DailyView(
+            date=self.date_str,
+            gate=self.gate_num or '',
+            line=self.line_num or '',
+            en=DailyViewContent.from_dict(dict(en_content, **(images or {}))),
+            zh=DailyViewContent.from_dict(dict(zh_content, **(images or {}))),
+            path=self.output_dir
+        )
+        with self.metrics.span('write', file='content'):
+            sidecar = record.save()
+        print(f"   ✅ 結構化內容: {sidecar}")
+        return record
+    
+    def _stage_feed(self, record: DailyView) -> List[str]:
+        """把当天的条目插到订阅源最前面（排在 variants 之后，条目引用较小的版本）"""
+        with self.metrics.span('write', file='feed'):
+            feed_paths = self.feed.add(record)
+        print(f"   📰 訂閱源: {', '.join(Path(path).name for path in feed_paths)}")
+        return feed_paths
+    
+    def _stage_lookahead(self, en_content: Dict[str, Any], record: DailyView) -> Optional[Dict[str, Any]]:
+        """为下一个 Gate 预读（未启用时不做任何事）"""
+        if not self.lookahead_enabled:
+            return None
+        print("\n🔮 正在為下一個 Gate 預讀...")
+        return self.lookahead(en_content)
+    
+    def run(
+        self,
+        stages: Optional[List[str]] = None,
+        skip: Optional[List[str]] = None,
+        page_html: Optional[str] = None
+    ) -> Optional[DailyView]:
+        """
+        执行完整的抓取、翻译和生成流程
         
-        # 同时保存 latest 版本到根目录（调整图片路径：从 ../../ 改为 ../）
-        latest_markdown_en = markdown_en.replace('../../Gate_Rave_Mandala_Collection/', '../Gate_Rave_Mandala_Collection/')
-        latest_markdown_zh = markdown_zh.replace('../../Gate_Rave_Mandala_Collection/', '../Gate_Rave_Mandala_Collection/')
+        Args:
+            stages: 只运行这些阶段（及其依赖的上游阶段）；指定时忽略"页面未变化"
+                    和"内容已存在"的检查，用于单独重跑某个阶段。上游的输入取自当天
+                    （没有时为最新一天）日期目录中的 content_{date}.json，不再抓取和翻译
+            skip: 跳过的阶段，依赖其输出的阶段也会被跳过
+            page_html: 已经获取的页面（fetch_page() 的结果），提供时不再运行 fetch 阶段；
+                       获取前调用过 begin_run() 时，获取页面的指标计入本次运行
+            
+        Returns:
+            当天的结构化内容记录（record 阶段被跳过且日期目录中没有 content_{date}.json 时，
+            从 Markdown 解析；都没有时返回 None）
+        """
+        print("=" * 60)
+        print("IHDS Daily View Fetcher")
+        print("=" * 60)
         
-        latest_en_path = self.base_output_dir / "latest_en.md"
-        with open(latest_en_path, 'w', encoding='utf-8') as f:
-            f.write(latest_markdown_en)
+        # 调用方已用 begin_run() 打开了本次运行（探测页面的指标保留）时不再重置
+        if not (self._run_open and page_html):
+            self._reset_run_state()
+        self._run_open = False
+        if self.profiler is not None:
+            self.profiler.start()
+        ok = False
+        try:
+            record = self._run_pipeline(stages, skip, page_html)
+            ok = True
+            return record
+        finally:
+            # 出错或提前结束时删除没有用到的临时文件
+            self._discard_spool()
+            self.metrics.finish(ok=ok)
+            if self.profiler is not None:
+                # 分析时的耗时不代表正常运行，不计入指标
+                self.profiler.stop()
+                self._write_profile()
+            elif not ok or self.produced_content:
+                # 失败的运行总是记录；只有页面未变化、内容已存在而提前结束的空转检查不写指标
+                self.export_metrics()
+    
+    def _run_pipeline(
+        self,
+        stages: Optional[List[str]],
+        skip: Optional[List[str]],
+        page_html: Optional[str]
+    ) -> Optional[DailyView]:
+        """run() 的主体（指标在 run() 中导出）"""
+        if stages:
+            self.force = True
+        if page_html:
+            context = {'page_html': page_html}
+        elif stages:
+            context = self._stored_context(stages)
+        else:
+            context = None
+        # 性能分析时阶段依次执行，每个阶段的时间与内存只属于它自己
+        pipeline = self.build_pipeline(max_workers=1 if self.profiler is not None else 4)
+        context = pipeline.run(context, only=stages, skip=skip or ())
+        
+        if pipeline.halted_by:
+            print("\n" + "=" * 60)
+            print("✨ 內容已是最新，無需重複抓取!")
+            print("=" * 60)
+            return load_day_dir(Path(context['result']).parent)
+        
+        self.produced_content = True
         
-        latest_zh_path = self.base_output_dir / "latest_zh.md"
-        with open(latest_zh_path, 'w', encoding='utf-8') as f:
-            f.write(latest_markdown_zh)
-        print(f"   ✅ 最新英文版: {latest_en_path}")
-        print(f"   ✅ 最新中文版: {latest_zh_path}")
+        # 更新归档索引（写了 latest 文件时同时记为最新一天）
+        if self.output_dir is not None and self.output_dir.exists():
+            latest = 'latest_paths' in context
+            with self.metrics.span('index'):
+                if self.profiler is not None:
+                    self.profiler.run_stage('index', self._update_indexes, latest)
+                else:
+                    self._update_indexes(latest)
         
-        # 7. 生成 AI 绘图提示词文件
-        print("\n🎨 正在生成 AI 繪圖提示詞...")
-        prompt_path = self.generate_ai_prompt(en_content)
-        print(f"   ✅ 提示詞文件: {prompt_path}")
+        # 只有完整运行后才记录页面状态，部分运行不影响下次的"页面未变化"判断
+        if not stages and not pipeline.skipped:
+            self._save_fetch_state(context['path_en'])
         
         print("\n" + "=" * 60)
         print("✨ 完成!")
         print("=" * 60)
         
-        return str(filepath_en)
+        if 'record' in context:
+            return context['record']
+        if self.output_dir is not None:
+            return load_day_dir(self.output_dir)
+        return None
+    
+    def _stored_context(self, stages: List[str]) -> Dict[str, Any]:
+        """
+        单独重跑阶段时的初始上下文：当天（没有时为最新一天）日期目录中的 content_{date}.json
+        
+        重跑的阶段自己的输出不放入上下文；没有结构化内容时返回空字典，上游阶段照常运行。
+        """
+        today = self.manifest.days.get(self.date_str, {})
+        if today:
+            date, entry = self.date_str, today[sorted(today)[-1]]
+        else:
+            latest = self.manifest.latest()
+            date, entry = (latest[0], latest[2]) if latest else (None, None)
+        record = load_sidecar(self.manifest.archive_dir / entry['dir'] / f"content_{date}.json") if entry else None
+        if record is None:
+            print("   ⚠️ 沒有已保存的結構化內容（content_{date}.json），重新運行上游階段")
+            return {}
+        print(f"   📂 使用已保存的內容: {record.sidecar_path}")
+        self.date_str = record.date
+        self.output_dir = record.path
+        self.gate_num = record.gate or None
+        self.line_num = record.line or None
+        en_content = record.en.to_dict()
+        context = {
+            'en_content': en_content,
+            'zh_content': record.zh.to_dict(),
+            'dir_name': record.path.name,
+            'images': {key: en_content[key] for key in ('gate_image_local', 'rave_mandala_local') if en_content.get(key)},
+        }
+        rerun = {output for name, _, outputs, _, _ in self.STAGES if name in stages for output in outputs}
+        return {key: value for key, value in context.items() if key not in rerun}
+    
+    def _update_indexes(self, latest: bool):
+        """运行结束后更新归档索引与全文检索索引"""
+        self.manifest.update_day(self.output_dir, latest=latest)
+        self.manifest.save()
+        self.update_search_index()
+    
+    def _write_profile(self):
+        """把性能分析报告写入日期目录的 profile/（没有日期目录时写入 .cache/profiles/）"""
+        if not self.profiler.stages:
+            return
+        if self.output_dir is not None and self.output_dir.exists():
+            directory = self.output_dir / "profile"
+        else:
+            directory = self.cache_dir / "profiles" / datetime.now().strftime("%Y-%m-%d-%H%M%S")
+        try:
+            paths = self.profiler.write_reports(directory)
+        except OSError as e:
+            print(f"   ⚠️ 性能分析報告寫入失敗: {e}")
+            return
+        print(f"\n🔬 性能分析報告: {paths[0]}")
+        print(self.profiler.summary_text(), end='')
+    
+    def export_metrics(self, metrics: Optional[RunMetrics] = None):
+        """导出一次运行的指标（默认本次抓取的指标；写入失败不影响运行结果）"""
+        metrics = metrics or self.metrics
+        try:
+            export_metrics(metrics, self.metrics_log_path, self.metrics_textfile)
+        except OSError as e:
+            print(f"   ⚠️ 指標寫入失敗: {e}")
+            return
+        summary = metrics.summary()
+        tokens = sum(c['value'] for c in summary['counters'] if c['name'] == 'deepseek_tokens' and c['labels'].get('kind') in ('prompt', 'completion'))
+        retries = sum(c['value'] for c in summary['counters'] if c['name'] == 'http_retries')
+        print(f"   📊 指標: {summary['seconds']:.1f}s，{len(metrics.spans)} 個計時，DeepSeek {tokens:.0f} tokens，重試 {retries:.0f} 次")
     
     def generate_ai_prompt(self, content: Dict[str, Any]) -> str:
         """
@@ -595,7 +1416,36 @@ class IHDSDailyViewFetcher:
         Returns:
             提示词文件路径
         """
-        gate_num = self.gate_num or "unknown"
+        prompt_content = self.render_ai_prompt(content, self.date_str, self.gate_num)
+        
+        # 保存到日期目录
+        prompt_filename = f"ai_prompt_{self.date_str}.txt"
+        prompt_path = self.output_dir / prompt_filename
+        
+        with open(prompt_path, 'w', encoding='utf-8') as f:
+            f.write(prompt_content)
+        
+        # 同时保存一份到 base_output_dir 作为 latest
+        latest_prompt_path = self.base_output_dir / "latest_ai_prompt.txt"
+        with open(latest_prompt_path, 'w', encoding='utf-8') as f:
+            f.write(prompt_content)
+        
+        return str(prompt_path)
+    
+    @staticmethod
+    def render_ai_prompt(content: Dict[str, Any], date_str: str, gate_num: Optional[str]) -> str:
+        """
+        生成 AI 绘图提示词文本
+        
+        Args:
+            content: Daily View 英文内容字典
+            date_str: 日期（YYYY-MM-DD）
+            gate_num: Gate 号
+            
+        Returns:
+            提示词文件内容
+        """
+        gate_num = gate_num or "unknown"
         gate_title = content.get('gate_title', '')
         gate_subtitle = content.get('gate_subtitle', '')
         lead = content.get('lead_description', '')
@@ -625,7 +1475,7 @@ Additional elements: starfield background, nebula wisps, sacred symbols, golden
         
         # 完整的提示词文件内容
         prompt_content = f"""# AI 绘图提示词 - {gate_title}
-# 日期: {self.date_str}
+# 日期: {date_str}
 # Gate: {gate_num} | Line: {line_title}
 
 ================================================================================
@@ -652,7 +1502,7 @@ Additional elements: starfield background, nebula wisps, sacred symbols, golden
    📁 output/Gate_Rave_Mandala_Collection/Gate-{gate_num}.jpg
 
 2. Rave Mandala（人类图曼陀罗）:
-   📁 output/Gate_Rave_Mandala_Collection/Gate-{gate_num}-Rave-Mandala.png
+   📁 output/Gate_Rave_Mandala_Collection/{mandala_file(content.get('rave_mandala_local'), gate_num)}
 
 ================================================================================
 ⚙️ 推荐设置 (Leonardo.AI)
@@ -681,19 +1531,7 @@ Additional elements: starfield background, nebula wisps, sacred symbols, golden
 ================================================================================
 """
         
-        # 保存到日期目录
-        prompt_filename = f"ai_prompt_{self.date_str}.txt"
-        prompt_path = self.output_dir / prompt_filename
-        
-        with open(prompt_path, 'w', encoding='utf-8') as f:
-            f.write(prompt_content)
-        
-        # 同时保存一份到 base_output_dir 作为 latest
-        latest_prompt_path = self.base_output_dir / "latest_ai_prompt.txt"
-        with open(latest_prompt_path, 'w', encoding='utf-8') as f:
-            f.write(prompt_content)
-        
-        return str(prompt_path)
+        return prompt_content
 
 
 def main():
@@ -717,15 +1555,66 @@ def main():
         default=None,
         help='Output directory for generated files'
     )
+    parser.add_argument(
+        '--translate-workers',
+        type=int,
+        default=4,
+        help='Number of concurrent translation requests'
+    )
+    parser.add_argument(
+        '--translate-deadline',
+        type=float,
+        default=120,
+        help='Deadline in seconds for translating all fields'
+    )
+    parser.add_argument(
+        '--no-batch-translate',
+        action='store_true',
+        help='Translate each field with its own request'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Disable the persistent translation cache'
+    )
+    parser.add_argument(
+        '--no-translation-memory',
+        action='store_true',
+        help='Translate whole fields instead of reusing sentence-level segments'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Process the page even if it has not changed since the last run'
+    )
+    stage_names = [stage[0] for stage in IHDSDailyViewFetcher.STAGES]
+    parser.add_argument(
+        '--stage',
+        action='append',
+        choices=stage_names,
+        help='Re-run only this stage and the stages it depends on (repeatable)'
+    )
+    parser.add_argument(
+        '--skip-stage',
+        action='append',
+        choices=stage_names,
+        help='Skip this stage and everything that depends on it (repeatable)'
+    )
     
     args = parser.parse_args()
     
     fetcher = IHDSDailyViewFetcher(
         deepseek_api_key=args.api_key,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        translate_workers=args.translate_workers,
+        translate_deadline=args.translate_deadline,
+        batch_translate=not args.no_batch_translate,
+        use_cache=not args.no_cache,
+        use_translation_memory=not args.no_translation_memory,
+        force=args.force
     )
     
-    fetcher.run()
+    fetcher.run(stages=args.stage, skip=args.skip_stage)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Gate Image Collection
+~~~~~~~~~~~~~~~~~~~~~
+
+64 张 Gate 图片（Gate_Rave_Mandala_Collection/Gate-{n}.jpg）的下载与校验。
+
+- 校验清单 Gate_Rave_Mandala_Collection/gate_images.json 记录每张图片的 sha256、
+  大小和下载地址，与图片一起提交，换一台机器也能校验
+- 校验：有清单记录时比对大小和 sha256；没有记录时检查 JPEG 结构
+  （SOI 开头、EOI 结尾），通过后补记到清单中
+- 下载时同样检查 Content-Length 与 JPEG 结构，截断或出错的响应不会写入；
+  只重新下载缺失或校验失败的文件
+- prefetch() 用有上限的线程池一次性补齐全部 64 张，日常运行因此不必等待图片 CDN
+
+下载地址由已知的某个 Gate 图片地址推算（把其中的 gate-58 换成 gate-{n}），
+推算规则记录在清单的 url_template 中。
+
+Usage:
+    from ihds.gate_images import GateImageCollection
+
+    images = GateImageCollection("output/Gate_Rave_Mandala_Collection", http)
+    images.ensure(58, "https://.../gate-58.jpg")   # 日常运行：校验通过时不访问网络
+    images.prefetch(workers=4)                      # 补齐全部 64 张
+"""
+
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .storage import atomic_write_bytes, atomic_write_json
+
+
+GATE_IMAGES_VERSION = 1
+
+# 校验清单（相对于图片收藏目录）
+MANIFEST_NAME = "gate_images.json"
+
+GATES = range(1, 65)
+
+# 并行下载的线程数（传输层每个主机的连接数另有上限）
+DEFAULT_WORKERS = 4
+
+# 单张图片下载后校验失败时的最多尝试次数（HTTP 错误由传输层重试）
+DOWNLOAD_ATTEMPTS = 2
+
+# 图片地址中的 Gate 编号：".../gate-58.jpg"
+GATE_URL_PATTERN = re.compile(r'(gate[-_]?)(\d+)(?=\D*$)', re.IGNORECASE)
+
+
+def gate_file(gate) -> str:
+    """Gate 图片的文件名（相对于图片收藏目录）"""
+    return f"Gate-{gate}.jpg"
+
+
+def url_template(url: str) -> Optional[str]:
+    """某个 Gate 图片地址 -> 地址模板（含 {gate}）；地址中找不到 Gate 编号时返回 None"""
+    if not url or not GATE_URL_PATTERN.search(url):
+        return None
+    return GATE_URL_PATTERN.sub(lambda m: m.group(1) + '{gate}', url.replace('{', '{{').replace('}', '}}'), count=1)
+
+
+def check_jpeg(data: bytes) -> Optional[str]:
+    """检查 JPEG 结构，返回问题描述；完整时返回 None"""
+    if len(data) < 4:
+        return "文件為空" if not data else "文件過短"
+    if not data.startswith(b'\xff\xd8\xff'):
+        return "不是 JPEG"
+    # 部分编码器会在 EOI 之后补零或换行
+    if not data.rstrip(b'\x00\r\n ').endswith(b'\xff\xd9'):
+        return "JPEG 不完整（缺少 EOI）"
+    return None
+
+
+class GateImageCollection:
+    """Gate 图片的校验清单、按需下载与批量预取（线程安全）"""
+
+    def __init__(self, collection_dir, http):
+        """
+        Args:
+            collection_dir: 图片收藏目录（output/Gate_Rave_Mandala_Collection）
+            http: HttpTransport
+        """
+        self.collection_dir = Path(collection_dir)
+        self.manifest_path = self.collection_dir / MANIFEST_NAME
+        self.http = http
+        self._lock = threading.Lock()
+        self.url_template: Optional[str] = None
+        # Gate 编号（字符串）-> {"sha256", "size", "url"}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(manifest, dict) or manifest.get('version') != GATE_IMAGES_VERSION:
+            return
+        self.url_template = manifest.get('url_template')
+        self.entries = manifest.get('gates', {})
+
+    def save(self):
+        """写入校验清单"""
+        with self._lock:
+            manifest = {
+                'version': GATE_IMAGES_VERSION,
+                'url_template': self.url_template,
+                'gates': {gate: self.entries[gate] for gate in sorted(self.entries, key=int)},
+            }
+        atomic_write_json(self.manifest_path, manifest)
+
+    def path_of(self, gate) -> Path:
+        return self.collection_dir / gate_file(gate)
+
+    def url_for(self, gate) -> Optional[str]:
+        """Gate 图片的下载地址：清单中记录的地址，否则按地址模板推算"""
+        entry = self.entries.get(str(gate))
+        if entry and entry.get('url'):
+            return entry['url']
+        return self.url_template.format(gate=gate) if self.url_template else None
+
+    def learn_url(self, url: str) -> bool:
+        """记录一个已知的 Gate 图片地址，用于推算其他 Gate 的地址；返回地址模板是否有变化"""
+        template = url_template(url)
+        with self._lock:
+            if not template or template == self.url_template:
+                return False
+            self.url_template = template
+        return True
+
+    # ------------------------------------------------------------------
+    # 校验
+    # ------------------------------------------------------------------
+
+    def verify(self, gate) -> Tuple[bool, str, bool]:
+        """
+        校验一张 Gate 图片
+
+        Returns:
+            (是否通过, 说明, 清单是否有变化)；没有清单记录但结构完整时补记到清单中
+        """
+        path = self.path_of(gate)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return False, "缺失", False
+        entry = self.entries.get(str(gate))
+        if entry:
+            if len(data) != entry.get('size'):
+                return False, f"大小不符（{len(data)} ≠ {entry.get('size')} 字節）", False
+            if hashlib.sha256(data).hexdigest() != entry.get('sha256'):
+                return False, "sha256 不符", False
+            return True, "通過", False
+        problem = check_jpeg(data)
+        if problem:
+            return False, problem, False
+        self._record(gate, data, None)
+        return True, "通過（已補記校驗和）", True
+
+    def _record(self, gate, data: bytes, url: Optional[str]):
+        entry = {'sha256': hashlib.sha256(data).hexdigest(), 'size': len(data)}
+        with self._lock:
+            url = url or self.entries.get(str(gate), {}).get('url')
+            if url:
+                entry['url'] = url
+            self.entries[str(gate)] = entry
+
+    # ------------------------------------------------------------------
+    # 下载
+    # ------------------------------------------------------------------
+
+    def download(self, gate, url: str) -> Optional[str]:
+        """
+        下载一张 Gate 图片：校验通过后才写入并记入清单（不保存清单）
+
+        Returns:
+            失败原因；成功时返回 None
+        """
+        problem = None
+        for _ in range(DOWNLOAD_ATTEMPTS):
+            try:
+                response = self.http.get(url, timeout=30)
+                response.raise_for_status()
+            except Exception as e:
+                return str(e)
+            data = response.content
+            expected = response.headers.get('Content-Length')
+            if expected and expected.isdigit() and int(expected) != len(data):
+                problem = f"響應被截斷（{len(data)}/{expected} 字節）"
+                continue
+            problem = check_jpeg(data)
+            if problem is None:
+                atomic_write_bytes(self.path_of(gate), data)
+                self._record(gate, data, url)
+                return None
+        return problem
+
+    def ensure(self, gate, url: Optional[str] = None) -> Optional[Path]:
+        """
+        确保一张 Gate 图片存在且完整：校验通过时不访问网络，否则（重新）下载
+
+        Args:
+            gate: Gate 编号
+            url: 当天页面上的图片地址（默认按清单推算）
+
+        Returns:
+            本地路径；无法得到完整的图片时返回 None
+        """
+        name = gate_file(gate)
+        learned = bool(url) and self.learn_url(url)
+        ok, reason, changed = self.verify(gate)
+        if ok:
+            print(f"   ⏭️  {name} 已存在")
+            if changed or learned:
+                self.save()
+            return self.path_of(gate)
+        if reason != "缺失":
+            print(f"   ⚠️ {name} 校驗失敗（{reason}），重新下載")
+        url = url or self.url_for(gate)
+        if not url:
+            print(f"   ⚠️ {name} 無法確定下載地址")
+            return None
+        error = self.download(gate, url)
+        if error:
+            print(f"   ⚠️ Gate 圖片下載失敗: {error}")
+            return None
+        self.save()
+        print(f"   ✅ {name} 已下載")
+        return self.path_of(gate)
+
+    def prefetch(self, gates: Iterable[int] = GATES, workers: int = DEFAULT_WORKERS, force: bool = False) -> Dict[str, int]:
+        """
+        校验全部 Gate 图片，并行下载缺失或校验失败的图片
+
+        Args:
+            gates: 要处理的 Gate（默认 1 ~ 64）
+            workers: 下载线程数
+            force: 忽略本地文件，全部重新下载
+
+        Returns:
+            统计：verified / downloaded / repaired / failed
+        """
+        stats = {'verified': 0, 'downloaded': 0, 'repaired': 0, 'failed': 0}
+        changed = False
+        pending = {}
+        for gate in gates:
+            ok, reason, recorded = self.verify(gate)
+            changed = changed or recorded
+            if ok and not force:
+                stats['verified'] += 1
+            else:
+                pending[gate] = "強制" if ok else reason
+
+        def fetch(gate) -> Tuple[int, Optional[str]]:
+            url = self.url_for(gate)
+            if not url:
+                return gate, "無法確定下載地址"
+            return gate, self.download(gate, url)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers or DEFAULT_WORKERS, len(pending)))) as executor:
+                for gate, error in executor.map(fetch, list(pending)):
+                    name = gate_file(gate)
+                    if error:
+                        print(f"   ⚠️ {name}: {error}")
+                        stats['failed'] += 1
+                        continue
+                    changed = True
+                    if pending[gate] == "缺失":
+                        stats['downloaded'] += 1
+                        print(f"   ✅ {name} 已下載")
+                    else:
+                        stats['repaired'] += 1
+                        print(f"   🔧 {name} 已重新下載（{pending[gate]}）")
+
+        if changed or not self.manifest_path.exists():
+            self.save()
+        return stats
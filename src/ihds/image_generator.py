@@ -15,10 +15,12 @@ Usage:
 import os
 import re
 import time
-import requests
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from .metrics import RunMetrics
+from .transport import HttpTransport, get_transport
+
 
 class LeonardoImageGenerator:
     """Leonardo.AI 图片生成器"""
@@ -33,12 +35,14 @@ class LeonardoImageGenerator:
         "dreamshaper_v7": "ac614f96-1082-45bf-be9d-757f2d31c174",
     }
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, transport: HttpTransport = None, metrics: RunMetrics = None):
         """
         初始化 Leonardo.AI 生成器
         
         Args:
             api_key: Leonardo.AI API Key，如未提供则从环境变量 LEONARDO_API_KEY 读取
+            transport: HTTP 传输层，默认与抓取器共用同一个连接池
+            metrics: 记录上传、创建任务、每次轮询和下载的耗时（默认新建 job 为 'poster' 的 RunMetrics）
         """
         self.api_key = api_key or os.environ.get("LEONARDO_API_KEY")
         if not self.api_key:
@@ -51,6 +55,8 @@ class LeonardoImageGenerator:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        self.http = transport or get_transport()
+        self.metrics = metrics or RunMetrics('poster', transport=self.http)
     
     def generate_prompt(self, content: Dict[str, Any]) -> str:
         """
@@ -110,11 +116,13 @@ Additional elements: stars, nebula, sacred symbols, golden ratio spirals"""
         if extension == 'jpg':
             extension = 'jpeg'
         
-        init_response = requests.post(
-            f"{self.API_BASE}/init-image",
-            headers=self.headers,
-            json={"extension": extension}
-        )
+        # 每次请求都会创建一个新的上传槽位，重放并不安全：按 POST 的默认规则只在 429 时重试
+        with self.metrics.span('leonardo_init_image'):
+            init_response = self.http.post(
+                f"{self.API_BASE}/init-image",
+                headers=self.headers,
+                json={"extension": extension}
+            )
         
         if init_response.status_code != 200:
             print(f"   ⚠️ 获取上传 URL 失败: {init_response.text}")
@@ -125,11 +133,15 @@ Additional elements: stars, nebula, sacred symbols, golden ratio spirals"""
         image_id = init_data['uploadInitImage']['id']
         fields = init_data['uploadInitImage']['fields']
         
-        # 上传图片
+        # 上传图片：预签名地址对应同一个对象，重放只会覆盖同一份文件，可以安全重试；
+        # 先读入内存，每次重试都能重新发送完整内容
         with open(image_path, 'rb') as f:
-            files = {'file': f}
+            image_bytes = f.read()
+        with self.metrics.span('leonardo_upload') as labels:
+            files = {'file': (Path(image_path).name, image_bytes)}
             data = {k: v for k, v in fields.items()}
-            upload_response = requests.post(upload_url, data=data, files=files)
+            upload_response = self.http.post(upload_url, data=data, files=files, timeout=60, idempotent=True)
+            labels['status'] = upload_response.status_code
         
         if upload_response.status_code not in [200, 204]:
             print(f"   ⚠️ 图片上传失败: {upload_response.status_code}")
@@ -190,11 +202,14 @@ Additional elements: stars, nebula, sacred symbols, golden ratio spirals"""
             payload["init_image_id"] = init_image_id
             payload["init_strength"] = init_strength
         
-        response = requests.post(
-            f"{self.API_BASE}/generations",
-            headers=self.headers,
-            json=payload
-        )
+        # 非幂等：5xx 时不重试，避免重复创建生成任务
+        with self.metrics.span('leonardo_create') as labels:
+            response = self.http.post(
+                f"{self.API_BASE}/generations",
+                headers=self.headers,
+                json=payload
+            )
+            labels['status'] = response.status_code
         
         if response.status_code != 200:
             print(f"   ⚠️ 创建生成任务失败: {response.text}")
@@ -224,19 +239,22 @@ Additional elements: stars, nebula, sacred symbols, golden ratio spirals"""
         start_time = time.time()
         
         while time.time() - start_time < timeout:
-            response = requests.get(
-                f"{self.API_BASE}/generations/{generation_id}",
-                headers=self.headers
-            )
+            # 每次轮询一个 span，标签为生成状态（请求失败时为 HTTP 状态码）
+            with self.metrics.span('leonardo_poll') as labels:
+                response = self.http.get(
+                    f"{self.API_BASE}/generations/{generation_id}",
+                    headers=self.headers
+                )
+                status = None
+                if response.status_code == 200:
+                    generation = response.json().get('generations_by_pk', {})
+                    status = generation.get('status')
+                labels['status'] = status or response.status_code
             
             if response.status_code != 200:
                 time.sleep(poll_interval)
                 continue
             
-            data = response.json()
-            generation = data.get('generations_by_pk', {})
-            status = generation.get('status')
-            
             if status == 'COMPLETE':
                 return generation.get('generated_images', [])
             elif status == 'FAILED':
@@ -262,11 +280,13 @@ Additional elements: stars, nebula, sacred symbols, golden ratio spirals"""
             是否成功
         """
         try:
-            response = requests.get(image_url, timeout=60)
-            response.raise_for_status()
+            with self.metrics.span('leonardo_download'):
+                response = self.http.get(image_url, timeout=60)
+                response.raise_for_status()
             
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            with self.metrics.span('write', file='poster'):
+                with open(output_path, 'wb') as f:
+                    f.write(response.content)
             
             return True
         except Exception as e:
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Inline Image Spooler
+~~~~~~~~~~~~~~~~~~~~
+
+流式剥离页面中的内联 base64 图片。
+
+Rave Mandala 以数百 KB 的 data:image/png;base64 URI 内嵌在页面里。
+InlineImageSpooler 在下载过程中逐块扫描 HTML：找到第一个 data URI 后，
+把 base64 内容按块解码写入文件，页面文本中只留下一个很短的占位符，
+因此无论图片多大，内存占用都保持稳定。
+
+Usage:
+    spooler = InlineImageSpooler("output/.cache/rave_mandala.png.tmp")
+    parts = [spooler.feed(chunk) for chunk in chunks]
+    parts.append(spooler.close())
+    page_html = ''.join(parts)
+"""
+
+import base64
+import html
+import re
+from pathlib import Path
+
+
+DATA_URI_PREFIX = "data:image/png;base64,"
+
+# 页面中替代 base64 内容的占位符
+SPOOLED_PLACEHOLDER = "RAVE_MANDALA_SPOOLED"
+
+# base64 内容的结束字符（引号、括号或标签边界）
+PAYLOAD_END = re.compile(r'["\')<>]')
+# 与 base64.b64decode 一致：解码前丢弃字母表以外的字符（空白、换行等）
+NON_BASE64 = re.compile(r'[^A-Za-z0-9+/=]+')
+
+
+class InlineImageSpooler:
+    """把页面中的第一个 base64 PNG 解码写入文件，并以占位符替换"""
+
+    def __init__(self, sink_path: str, prefix: str = DATA_URI_PREFIX):
+        """
+        Args:
+            sink_path: 解码后的 PNG 写入路径
+            prefix: 要识别的 data URI 前缀
+        """
+        self.sink_path = Path(sink_path)
+        self.prefix = prefix
+        self.found = False
+        self.bytes_written = 0
+
+        self._in_payload = False
+        self._done = False
+        self._tail = ""        # 扫描前缀时保留的末尾字符（前缀可能跨块）
+        self._b64_carry = ""   # 不足 4 个字符、尚未解码的 base64
+        self._entity_carry = ""  # 跨块的 HTML 实体（例如 "&#4" + "3;"）
+        self._sink = None
+
+    def feed(self, chunk: str) -> str:
+        """
+        处理一块页面文本
+
+        Returns:
+            去掉 base64 内容后可交给解析器的文本
+        """
+        if self._done:
+            return chunk
+
+        output = []
+        text = self._tail + chunk
+        self._tail = ""
+
+        while text:
+            if self._in_payload:
+                match = PAYLOAD_END.search(text)
+                payload = text if match is None else text[:match.start()]
+                self._write_payload(payload)
+                if match is None:
+                    return ''.join(output)
+                self._finish()
+                output.append(text[match.start():])
+                return ''.join(output)
+
+            index = text.find(self.prefix)
+            if index < 0:
+                # 保留可能是前缀开头的末尾字符，留到下一块再判断
+                keep = len(self.prefix) - 1
+                output.append(text[:-keep] if len(text) > keep else "")
+                self._tail = text[-keep:] if len(text) > keep else text
+                return ''.join(output)
+
+            output.append(text[:index + len(self.prefix)] + SPOOLED_PLACEHOLDER)
+            text = text[index + len(self.prefix):]
+            self._start()
+
+        return ''.join(output)
+
+    def close(self) -> str:
+        """结束处理，返回剩余的页面文本"""
+        if self._in_payload:
+            self._finish()
+        tail, self._tail = self._tail, ""
+        return tail
+
+    def _start(self):
+        self.found = True
+        self._in_payload = True
+        self.sink_path.parent.mkdir(parents=True, exist_ok=True)
+        self._sink = open(self.sink_path, 'wb')
+
+    def _write_payload(self, payload: str):
+        payload = self._entity_carry + payload
+        self._entity_carry = ""
+        if '&' in payload:
+            # 末尾未闭合的实体留到下一块
+            amp = payload.rfind('&')
+            if ';' not in payload[amp:]:
+                payload, self._entity_carry = payload[:amp], payload[amp:]
+            payload = html.unescape(payload)
+        payload = NON_BASE64.sub('', payload)
+
+        data = self._b64_carry + payload
+        usable = len(data) - len(data) % 4
+        if usable:
+            self._emit(base64.b64decode(data[:usable]))
+        self._b64_carry = data[usable:]
+
+    def _finish(self):
+        # 与原实现相同：补齐 padding 后解码剩余内容
+        data = self._b64_carry + NON_BASE64.sub('', html.unescape(self._entity_carry))
+        if data:
+            missing_padding = len(data) % 4
+            if missing_padding:
+                data += '=' * (4 - missing_padding)
+            self._emit(base64.b64decode(data))
+        self._b64_carry = ""
+        self._entity_carry = ""
+        self._in_payload = False
+        self._done = True
+        self._sink.close()
+        self._sink = None
+
+    def _emit(self, data: bytes):
+        self._sink.write(data)
+        self.bytes_written += len(data)
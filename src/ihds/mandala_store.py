@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Rave Mandala Store
+~~~~~~~~~~~~~~~~~~
+
+按内容寻址的 Rave Mandala 图片库：output/Gate_Rave_Mandala_Collection/mandalas/<sha256>.png。
+
+- 键是图片内容的哈希（IHDR、调色板与去掉滤波后的像素），与 PNG 的压缩级别、
+  每行选用的滤波、IDAT 的分块以及时间戳等元数据无关：同一张星盘无论抓取多少次
+  只保存一份
+- 写入前无损重新压缩：扫描行原样保留，只用 zlib 最高压缩级别重新编码 IDAT，
+  并去掉 tEXt / tIME 等不影响显示的元数据块；结果不比原文件小时保留原文件
+- 每天的内容（content_{date}.json 的 rave_mandala_local 与 Markdown 中的图片链接）
+  指向自己的那一份，不再覆盖 Gate-{n}-Rave-Mandala.png
+
+仓库的增长因此只取决于出现过多少张不同的星盘，而不是运行了多少次。
+
+Usage:
+    from ihds.mandala_store import MandalaStore
+
+    store = MandalaStore("output/Gate_Rave_Mandala_Collection")
+    name = store.add_file("output/.cache/rave_mandala.png.tmp", remove=True)
+    # name == "mandalas/<sha256>.png"（相对于图片收藏目录）
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .storage import atomic_write_bytes
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# 图片库所在的子目录（相对于图片收藏目录）
+STORE_DIR = "mandalas"
+
+# 重新编码时保留的辅助块（影响颜色或显示尺寸）；其余辅助块（tEXt、tIME 等）去掉
+KEPT_ANCILLARY = (b'tRNS', b'gAMA', b'cHRM', b'sRGB', b'iCCP', b'sBIT', b'pHYs', b'bKGD')
+
+# 依次尝试的 zlib 策略，取结果最小的
+ZLIB_STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+
+# 各颜色类型每个像素的通道数
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Adam7 隔行扫描的 7 遍：(起始列, 起始行, 列间隔, 行间隔)
+ADAM7 = (
+    (0, 0, 8, 8), (4, 0, 8, 8), (0, 4, 4, 8), (2, 0, 4, 4),
+    (0, 2, 2, 4), (1, 0, 2, 2), (0, 1, 1, 2),
+)
+
+
+def _chunks(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """拆分 PNG 块：[(类型, 数据)]；不是合法 PNG 时抛出 ValueError"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("不是 PNG 文件")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 12 <= len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if len(body) != length:
+            raise ValueError("PNG 块不完整")
+        (crc,) = struct.unpack('>I', data[pos + 8 + length:pos + 12 + length])
+        if zlib.crc32(kind + body) != crc:
+            raise ValueError(f"PNG 块 {kind!r} 校验失败")
+        chunks.append((kind, body))
+        pos += 12 + length
+        if kind == b'IEND':
+            return chunks
+    raise ValueError("PNG 缺少 IEND")
+
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+
+def _paeth(left: int, up: int, up_left: int) -> int:
+    estimate = left + up - up_left
+    distance_left, distance_up, distance_up_left = abs(estimate - left), abs(estimate - up), abs(estimate - up_left)
+    if distance_left <= distance_up and distance_left <= distance_up_left:
+        return left
+    return up if distance_up <= distance_up_left else up_left
+
+
+def _unfiltered(scanlines: bytes, ihdr: bytes) -> bytes:
+    """
+    去掉扫描行的滤波：每行换成滤波类型 0 的形式（0 + 原始像素字节）
+
+    结果只取决于像素，与编码器为每行选择的滤波无关；全部使用类型 0 的图片
+    （目前网站提供的星盘都是）结果就是原来的扫描行。
+
+    Raises:
+        ValueError: IHDR 或扫描行与图片尺寸不符、未知的滤波类型
+    """
+    if len(ihdr) != 13:
+        raise ValueError("PNG IHDR 长度错误")
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', ihdr)
+    if color_type not in CHANNELS:
+        raise ValueError(f"未知的 PNG 颜色类型 {color_type}")
+    bits = CHANNELS[color_type] * bit_depth
+    # 滤波按字节计算时“左边”的距离：一个像素的字节数（不足一字节时为 1）
+    bpp = max(1, bits // 8)
+    out = bytearray()
+    pos = 0
+    for x0, y0, dx, dy in (ADAM7 if interlace else ((0, 0, 1, 1),)):
+        columns = (width - x0 + dx - 1) // dx
+        rows = (height - y0 + dy - 1) // dy
+        if columns <= 0 or rows <= 0:
+            continue
+        stride = (columns * bits + 7) // 8
+        previous = bytearray(stride)
+        for _ in range(rows):
+            if pos + 1 + stride > len(scanlines):
+                raise ValueError("PNG 扫描行不完整")
+            kind = scanlines[pos]
+            row = bytearray(scanlines[pos + 1:pos + 1 + stride])
+            pos += 1 + stride
+            if kind == 1:
+                for i in range(bpp, stride):
+                    row[i] = (row[i] + row[i - bpp]) & 0xFF
+            elif kind == 2:
+                for i in range(stride):
+                    row[i] = (row[i] + previous[i]) & 0xFF
+            elif kind == 3:
+                for i in range(stride):
+                    left = row[i - bpp] if i >= bpp else 0
+                    row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xFF
+            elif kind == 4:
+                for i in range(stride):
+                    if i >= bpp:
+                        row[i] = (row[i] + _paeth(row[i - bpp], previous[i], previous[i - bpp])) & 0xFF
+                    else:
+                        row[i] = (row[i] + previous[i]) & 0xFF
+            elif kind != 0:
+                raise ValueError(f"未知的 PNG 滤波类型 {kind}")
+            out.append(0)
+            out += row
+            previous = row
+    return bytes(out)
+
+
+def optimize_png(data: bytes) -> Tuple[bytes, str]:
+    """
+    无损重新压缩 PNG，并计算与编码方式无关的内容哈希
+
+    Args:
+        data: 原始 PNG 文件内容
+
+    Returns:
+        (重新压缩后的 PNG；不比原文件小时为原文件, 内容哈希)
+
+    Raises:
+        ValueError: 不是合法的 PNG
+    """
+    chunks = _chunks(data)
+    if not chunks or chunks[0][0] != b'IHDR':
+        raise ValueError("PNG 缺少 IHDR")
+    scanlines = zlib.decompress(b''.join(body for kind, body in chunks if kind == b'IDAT'))
+
+    # 内容哈希：决定像素的块 + 去掉滤波后的像素
+    digest = hashlib.sha256()
+    for kind, body in chunks:
+        if kind in (b'IHDR', b'PLTE', b'tRNS'):
+            digest.update(kind + struct.pack('>I', len(body)) + body)
+    digest.update(_unfiltered(scanlines, chunks[0][1]))
+
+    best = None
+    for strategy in ZLIB_STRATEGIES:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+        compressed = compressor.compress(scanlines) + compressor.flush()
+        if best is None or len(compressed) < len(best):
+            best = compressed
+
+    parts = [PNG_SIGNATURE]
+    idat_written = False
+    for kind, body in chunks:
+        if kind == b'IDAT':
+            if not idat_written:
+                parts.append(_chunk(b'IDAT', best))
+                idat_written = True
+        elif kind in (b'IHDR', b'PLTE', b'IEND') or kind in KEPT_ANCILLARY:
+            parts.append(_chunk(kind, body))
+    optimized = b''.join(parts)
+    return (optimized if len(optimized) < len(data) else data), digest.hexdigest()
+
+
+class MandalaStore:
+    """按内容寻址、去重的 Rave Mandala 图片库"""
+
+    def __init__(self, collection_dir):
+        """
+        Args:
+            collection_dir: 图片收藏目录（output/Gate_Rave_Mandala_Collection）
+        """
+        self.collection_dir = Path(collection_dir)
+        self.root = self.collection_dir / STORE_DIR
+
+    def add_bytes(self, data: bytes) -> str:
+        """
+        保存一张星盘（已存在相同内容时不重复写入）
+
+        Returns:
+            相对于图片收藏目录的文件名，例如 "mandalas/<sha256>.png"
+        """
+        try:
+            blob, key = optimize_png(data)
+        except (ValueError, zlib.error):
+            # 无法解析时按原始字节寻址，原样保存
+            blob, key = data, hashlib.sha256(data).hexdigest()
+        name = f"{STORE_DIR}/{key}.png"
+        path = self.collection_dir / name
+        if path.exists():
+            print(f"   ⏭️  Rave Mandala 已存在: {name}")
+        else:
+            atomic_write_bytes(path, blob)
+            print(f"   ✅ Rave Mandala 已保存: {name}（{len(data)} → {len(blob)} 字節）")
+        return name
+
+    def add_file(self, path, remove: bool = False) -> str:
+        """
+        保存一个 PNG 文件
+
+        Args:
+            path: 文件路径（例如流式解码得到的临时文件）
+            remove: 保存后删除原文件
+
+        Returns:
+            相对于图片收藏目录的文件名
+        """
+        path = Path(path)
+        name = self.add_bytes(path.read_bytes())
+        if remove:
+            os.unlink(path)
+        return name
+
+    def path_of(self, name: str) -> Path:
+        """add_* 返回的文件名 -> 绝对路径"""
+        return self.collection_dir / name
+
+    def stats(self) -> Dict[str, int]:
+        """图片库统计：blobs / bytes"""
+        blobs = list(self.root.glob("*.png")) if self.root.exists() else []
+        return {'blobs': len(blobs), 'bytes': sum(blob.stat().st_size for blob in blobs)}
+
+
+def mandala_file(rave_mandala_local: Optional[str], gate) -> str:
+    """一天的 Rave Mandala 文件名（相对于图片收藏目录）：图片库中的文件，旧归档为 Gate-{n}-Rave-Mandala.png"""
+    return rave_mandala_local or f"Gate-{gate}-Rave-Mandala.png"
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Archive Manifest
+~~~~~~~~~~~~~~~~
+
+归档索引：日期 -> Gate.Line -> 产物（路径 + sha256）。
+
+索引保存在 output/.cache/manifest.json，每次运行后原子更新；文件不存在时扫描
+一次归档目录重建。重复检测、"最新一天"和按 Gate 查询都只查内存中的字典，
+不再逐个检查文件是否存在。
+
+Usage:
+    from ihds.manifest import ArchiveManifest
+
+    manifest = ArchiveManifest("output/.cache/manifest.json", "output/daily_views")
+    seen = manifest.last_seen("30.1")        # (日期, 条目) 或 None
+    manifest.update_day(day_dir, latest=True)
+    manifest.save()
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .archive import ArchiveDay, iter_archive_days, parse_day_dir_name
+from .mandala_store import mandala_file
+from .storage import atomic_write_json
+
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _rave_mandala_local(day: ArchiveDay) -> Optional[str]:
+    """content_{date}.json 中记录的当天 Rave Mandala（图片库中的文件）"""
+    try:
+        with open(day.content_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('en', {}).get('rave_mandala_local')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ArchiveManifest:
+    """Daily View 归档索引"""
+
+    def __init__(self, path, archive_dir):
+        """
+        Args:
+            path: 索引文件路径（output/.cache/manifest.json）
+            archive_dir: 归档根目录（output/daily_views）；产物路径相对于其上一级目录保存
+        """
+        self.path = Path(path)
+        self.archive_dir = Path(archive_dir)
+        self.root = self.archive_dir.parent
+        self._lock = threading.Lock()
+
+        # 日期 -> Gate.Line -> {"dir": 目录名, "artifacts": {类型: {"path", "sha256"}}}
+        self.days: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # 最新一天：{"date", "gate_line"}
+        self.latest_key: Optional[Dict[str, str]] = None
+        # Gate.Line -> 出现过的日期（升序）
+        self._by_gate_line: Dict[str, List[str]] = {}
+        # 最近一次读取或写入时索引文件的 (mtime, 大小)
+        self._stamp: Optional[Tuple[int, int]] = None
+
+        if not self._load():
+            self.bootstrap()
+            self.save()
+
+    def _load(self) -> bool:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('version') != MANIFEST_VERSION:
+            return False
+        self.days = data.get('days', {})
+        self.latest_key = data.get('latest')
+        self._reindex()
+        self._stamp = self._file_stamp()
+        return True
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> bool:
+        """
+        索引文件被其他进程（例如手动回填）改写过时重新读取
+
+        常驻进程在每次检查前调用，避免用内存中过期的索引覆盖别人的更新。
+
+        Returns:
+            是否重新读取了
+        """
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        with self._lock:
+            return self._load()
+
+    def _reindex(self):
+        self._by_gate_line = {}
+        for date in sorted(self.days):
+            for gate_line in self.days[date]:
+                self._by_gate_line.setdefault(gate_line, []).append(date)
+
+    def bootstrap(self) -> int:
+        """扫描归档目录重建索引，返回收录的天数"""
+        self.days = {}
+        self.latest_key = None
+        count = 0
+        for day in iter_archive_days(self.archive_dir):
+            if self._scan(day):
+                count += 1
+        self._reindex()
+        self.latest_key = self._guess_latest()
+        return count
+
+    def _guess_latest(self) -> Optional[Dict[str, str]]:
+        """没有记录时，以 latest_en.md 的内容确定最新一天（同一日期可能有两个目录）"""
+        if not self.days:
+            return None
+        date = max(self.days)
+        candidates = sorted(self.days[date])
+        latest_path = self.archive_dir / "latest_en.md"
+        if len(candidates) > 1 and latest_path.exists():
+            latest = latest_path.read_bytes().replace(b'../Gate_Rave', b'../../Gate_Rave')
+            for gate_line in candidates:
+                artifact = self.days[date][gate_line]['artifacts'].get('en')
+                if artifact and (self.root / artifact['path']).read_bytes() == latest:
+                    return {'date': date, 'gate_line': gate_line}
+        return {'date': date, 'gate_line': candidates[-1]}
+
+    def _artifact_paths(self, day: ArchiveDay) -> Dict[str, Path]:
+        """一天的产物（只包含存在的文件）"""
+        paths = {
+            'en': day.en_path,
+            'zh': day.zh_path,
+            'prompt': day.prompt_path,
+            'content': day.content_path,
+        }
+        if day.gate:
+            collection = self.root / "Gate_Rave_Mandala_Collection"
+            paths['gate_image'] = collection / f"Gate-{day.gate}.jpg"
+            paths['rave_mandala'] = collection / mandala_file(_rave_mandala_local(day), day.gate)
+        return {kind: path for kind, path in paths.items() if path.exists()}
+
+    def _scan(self, day: ArchiveDay) -> Optional[Dict[str, Any]]:
+        artifacts = {
+            kind: {
+                'path': path.relative_to(self.root).as_posix(),
+                'sha256': file_sha256(path),
+            }
+            for kind, path in self._artifact_paths(day).items()
+        }
+        if 'en' not in artifacts:
+            return None
+        entry = {'dir': day.path.name, 'artifacts': artifacts}
+        self.days.setdefault(day.date, {})[day.gate_line] = entry
+        return entry
+
+    def update_day(self, day_dir, latest: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        重新扫描一个日期目录并更新索引
+
+        Args:
+            day_dir: 日期目录
+            latest: 是否同时记为最新一天
+
+        Returns:
+            新的条目；目录名不符合格式或没有英文版时返回 None
+        """
+        day_dir = Path(day_dir)
+        day = parse_day_dir_name(day_dir.name)
+        if day is None:
+            return None
+        day = day._replace(path=day_dir)
+        with self._lock:
+            entry = self._scan(day)
+            if entry is None:
+                return None
+            dates = self._by_gate_line.setdefault(day.gate_line, [])
+            if day.date not in dates:
+                dates.append(day.date)
+                dates.sort()
+            if latest:
+                self.latest_key = {'date': day.date, 'gate_line': day.gate_line}
+        return entry
+
+    def get(self, date: str, gate_line: str) -> Optional[Dict[str, Any]]:
+        return self.days.get(date, {}).get(gate_line)
+
+    def last_seen(self, gate_line: str, before: str = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Gate.Line 最近一次出现的日期和条目
+
+        Args:
+            gate_line: 例如 "30.1"
+            before: 只考虑不晚于该日期（含）的记录
+        """
+        for date in reversed(self._by_gate_line.get(gate_line, [])):
+            if before is None or date <= before:
+                return date, self.days[date][gate_line]
+        return None
+
+    def latest(self) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """最新一天：(日期, Gate.Line, 条目)"""
+        if not self.latest_key:
+            return None
+        date, gate_line = self.latest_key['date'], self.latest_key['gate_line']
+        entry = self.get(date, gate_line)
+        return (date, gate_line, entry) if entry else None
+
+    def for_gate(self, gate: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """一个 Gate 的所有记录：[(日期, Gate.Line, 条目)]，按日期升序"""
+        results = []
+        for gate_line, dates in self._by_gate_line.items():
+            if gate_line.split('.')[0] == str(gate):
+                results.extend((date, gate_line, self.days[date][gate_line]) for date in dates)
+        return sorted(results)
+
+    def path_of(self, entry: Dict[str, Any], kind: str) -> Optional[Path]:
+        """条目中某个产物的绝对路径"""
+        artifact = entry['artifacts'].get(kind)
+        return self.root / artifact['path'] if artifact else None
+
+    def save(self):
+        """原子写入索引文件"""
+        with self._lock:
+            data = {
+                'version': MANIFEST_VERSION,
+                'latest': self.latest_key,
+                'days': {date: dict(sorted(self.days[date].items())) for date in sorted(self.days)},
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.path, data)
+        self._stamp = self._file_stamp()
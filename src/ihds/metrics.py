@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Run Metrics
+~~~~~~~~~~~
+
+每次运行的耗时与成本指标：
+
+- span：计时的一段操作（抓取、解析、每个翻译字段、图片解码、渲染、写文件、
+  上传、每次轮询……），附带少量低基数的标签（阶段名、字段名等，不放 URL）
+- 计数器：DeepSeek 返回的 usage token 数、请求数，以及传输层的重试次数
+
+生成了内容的运行结束时导出两份（放在项目根目录的 logs/，与运行日志一样不提交到仓库）：
+- JSON Lines 日志（logs/metrics.jsonl）：每个 span 一行，最后一行是本次运行的汇总，
+  可以直接按时间计算延迟分位数和 API 用量
+- Prometheus 文本文件（logs/metrics.prom，供 node_exporter 的 textfile collector 读取）：
+  跨运行累计的 span 耗时直方图与计数器（累计值保存在 metrics_state.json），以及最近一次运行的耗时和结果
+
+Usage:
+    from ihds.metrics import RunMetrics, export_metrics
+
+    metrics = RunMetrics('daily_view', transport=http)
+    with metrics.span('fetch'):
+        ...
+    metrics.add_usage(response_json.get('usage'))
+    metrics.finish(ok=True)
+    export_metrics(metrics, "logs/metrics.jsonl", "logs/metrics.prom")
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .storage import atomic_write_json, atomic_write_text
+
+
+METRICS_VERSION = 1
+
+# Prometheus 指标名前缀
+PREFIX = "ihds"
+
+# span 耗时直方图的桶（秒）
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# DeepSeek usage 中记录的字段 -> kind 标签
+USAGE_FIELDS = {
+    'prompt_tokens': 'prompt',
+    'completion_tokens': 'completion',
+    'prompt_cache_hit_tokens': 'prompt_cache_hit',
+    'prompt_cache_miss_tokens': 'prompt_cache_miss',
+}
+
+
+def _labels_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+class RunMetrics:
+    """一次运行的 span 与计数器（线程安全：流水线的阶段并发记录）"""
+
+    def __init__(self, job: str, transport=None):
+        """
+        Args:
+            job: 任务名（'daily_view' / 'poster'），作为所有指标的 job 标签
+            transport: HttpTransport；结束时记录本次运行期间的重试次数
+        """
+        self.job = job
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.seconds: Optional[float] = None
+        self.ok: Optional[bool] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+        self._transport = transport
+        self._retries_before = dict(transport.retry_counts) if transport is not None else {}
+
+    @contextmanager
+    def span(self, name: str, **labels) -> Iterator[Dict[str, Any]]:
+        """
+        记录一段操作的耗时；异常时记为失败并继续抛出
+
+        Yields:
+            标签字典，可以在 with 块中补充（例如轮询得到的状态）
+        """
+        labels = dict(labels)
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield labels
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.spans.append({
+                    'span': name,
+                    'labels': {key: str(value) for key, value in labels.items() if value is not None},
+                    'offset': round(start - self._start, 6),
+                    'seconds': round(end - start, 6),
+                    'ok': ok,
+                })
+
+    def add(self, name: str, value: float = 1, **labels):
+        """计数器加上 value"""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def add_usage(self, usage: Optional[Dict[str, Any]], **labels):
+        """记录一次 DeepSeek 请求及其 usage 中的 token 数"""
+        self.add('deepseek_requests', **labels)
+        for field, kind in USAGE_FIELDS.items():
+            value = (usage or {}).get(field)
+            if isinstance(value, (int, float)):
+                self.add('deepseek_tokens', value, kind=kind, **labels)
+
+    def finish(self, ok: bool = True):
+        """结束本次运行：记录总耗时、结果和传输层的重试次数"""
+        if self.seconds is not None:
+            return
+        self.seconds = round(time.perf_counter() - self._start, 6)
+        self.ok = ok
+        if self._transport is not None:
+            for host, count in dict(self._transport.retry_counts).items():
+                delta = count - self._retries_before.get(host, 0)
+                if delta:
+                    self.add('http_retries', delta, host=host)
+
+    def summary(self) -> Dict[str, Any]:
+        """本次运行的汇总（JSON Lines 的最后一行）"""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        totals: Dict[str, Dict[str, float]] = {}
+        for span in spans:
+            entry = totals.setdefault(span['span'], {'count': 0, 'seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] = round(entry['seconds'] + span['seconds'], 6)
+        return {
+            'type': 'run',
+            'run_id': self.run_id,
+            'job': self.job,
+            'ts': self.started_at.isoformat(timespec='seconds'),
+            'seconds': self.seconds,
+            'ok': self.ok,
+            'spans': totals,
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+        }
+
+
+def export_metrics(metrics: RunMetrics, jsonl_path, prom_path, state_path=None):
+    """
+    追加 JSON Lines 日志，并更新累计值与 Prometheus 文本文件
+
+    Args:
+        metrics: RunMetrics（尚未 finish() 时按成功结束）
+        jsonl_path: JSON Lines 日志
+        prom_path: Prometheus 文本文件（原子替换，textfile collector 不会读到一半）
+        state_path: 累计值（默认与 jsonl_path 同目录的 metrics_state.json）
+    """
+    metrics.finish()
+    jsonl_path = Path(jsonl_path)
+    state_path = Path(state_path) if state_path else jsonl_path.parent / "metrics_state.json"
+
+    lines = []
+    base = {'run_id': metrics.run_id, 'job': metrics.job, 'ts': metrics.started_at.isoformat(timespec='seconds')}
+    for span in metrics.spans:
+        lines.append(json.dumps(dict(base, type='span', **span), ensure_ascii=False))
+    lines.append(json.dumps(metrics.summary(), ensure_ascii=False))
+    jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(jsonl_path, 'a', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    state = _load_state(state_path)
+    _accumulate(state, metrics)
+    atomic_write_json(state_path, state)
+    atomic_write_text(prom_path, render_prometheus(state))
+
+
+def _load_state(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+    if not isinstance(state, dict) or state.get('version') != METRICS_VERSION:
+        state = {'version': METRICS_VERSION, 'histograms': {}, 'counters': {}, 'last_run': {}}
+    return state
+
+
+def _series(name: str, labels: Dict[str, str]) -> str:
+    return json.dumps([name, sorted(labels.items())], ensure_ascii=False)
+
+
+def _accumulate(state: Dict[str, Any], metrics: RunMetrics):
+    """把一次运行累加进跨运行的直方图与计数器"""
+    job = metrics.job
+    for span in metrics.spans:
+        labels = dict(span['labels'], job=job, span=span['span'])
+        entry = state['histograms'].setdefault(
+            _series('span_seconds', labels), {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0}
+        )
+        for index, bound in enumerate(BUCKETS):
+            if span['seconds'] <= bound:
+                entry['buckets'][index] += 1
+        entry['sum'] = round(entry['sum'] + span['seconds'], 6)
+        entry['count'] += 1
+        if not span['ok']:
+            key = _series('span_errors', labels)
+            state['counters'][key] = state['counters'].get(key, 0) + 1
+    for (name, labels), value in metrics.counters.items():
+        key = _series(name, dict(labels, job=job))
+        state['counters'][key] = state['counters'].get(key, 0) + value
+    result = 'success' if metrics.ok else 'failure'
+    key = _series('runs', {'job': job, 'result': result})
+    state['counters'][key] = state['counters'].get(key, 0) + 1
+    state['last_run'][job] = {
+        'timestamp': metrics.started_at.timestamp(),
+        'seconds': metrics.seconds,
+        'ok': bool(metrics.ok),
+    }
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not float(value).is_integer() else str(int(value))
+
+
+HELP = {
+    'span_seconds': ("histogram", "Duration of timed operations (fetch, parse, translate, render, upload, poll...)."),
+    'span_errors_total': ("counter", "Timed operations that raised an exception."),
+    'deepseek_requests_total': ("counter", "DeepSeek chat completion requests."),
+    'deepseek_tokens_total': ("counter", "DeepSeek tokens reported in response usage, by kind."),
+    'http_retries_total': ("counter", "HTTP retries made by the shared transport, by host."),
+    'runs_total': ("counter", "Completed runs, by result."),
+    'last_run_timestamp_seconds': ("gauge", "Start time of the most recent run."),
+    'last_run_duration_seconds': ("gauge", "Duration of the most recent run."),
+    'last_run_success': ("gauge", "Whether the most recent run succeeded."),
+}
+
+
+def render_prometheus(state: Dict[str, Any]) -> str:
+    """累计值 -> Prometheus 文本格式"""
+    families: Dict[str, List[str]] = {}
+
+    for key, entry in sorted(state['histograms'].items()):
+        name, labels = json.loads(key)
+        lines = families.setdefault(name, [])
+        for bound, count in zip(BUCKETS, entry['buckets']):
+            lines.append(f"{PREFIX}_{name}_bucket{_format_labels(labels + [['le', _number(bound)]])} {count}")
+        lines.append(f"{PREFIX}_{name}_bucket{_format_labels(labels + [['le', '+Inf']])} {entry['count']}")
+        lines.append(f"{PREFIX}_{name}_sum{_format_labels(labels)} {_number(entry['sum'])}")
+        lines.append(f"{PREFIX}_{name}_count{_format_labels(labels)} {entry['count']}")
+
+    for key, value in sorted(state['counters'].items()):
+        name, labels = json.loads(key)
+        families.setdefault(f"{name}_total", []).append(f"{PREFIX}_{name}_total{_format_labels(labels)} {_number(value)}")
+
+    for job, last in sorted(state['last_run'].items()):
+        labels = _format_labels([('job', job)])
+        families.setdefault('last_run_timestamp_seconds', []).append(
+            f"{PREFIX}_last_run_timestamp_seconds{labels} {_number(round(last['timestamp'], 3))}")
+        families.setdefault('last_run_duration_seconds', []).append(
+            f"{PREFIX}_last_run_duration_seconds{labels} {_number(last['seconds'] or 0)}")
+        families.setdefault('last_run_success', []).append(
+            f"{PREFIX}_last_run_success{labels} {1 if last['ok'] else 0}")
+
+    out = []
+    for name, lines in families.items():
+        kind, text = HELP.get(name, ("untyped", name))
+        out.append(f"# HELP {PREFIX}_{name} {text}")
+        out.append(f"# TYPE {PREFIX}_{name} {kind}")
+        out.extend(lines)
+    return '\n'.join(out) + '\n'
+
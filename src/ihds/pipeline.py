@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Stage Pipeline
+~~~~~~~~~~~~~~
+
+按依赖关系调度的阶段执行器。
+
+每个阶段声明输入和输出的名称；所有输入就绪的阶段会被并发执行，
+彼此独立的阶段（例如下载图片、翻译、生成英文版）因此可以同时进行。
+可以只运行指定阶段（连同它依赖的上游阶段），也可以跳过某些阶段。
+
+Usage:
+    from ihds.pipeline import Pipeline, Stage
+
+    pipeline = Pipeline([
+        Stage('fetch', fetch, outputs=('page_html',)),
+        Stage('parse', parse, inputs=('page_html',), outputs=('content',)),
+        Stage('render', render, inputs=('content',), outputs=('page',), after=('thumbnails',)),
+        Stage('thumbnails', thumbnails, inputs=('content',), outputs=('thumbnails',)),
+    ])
+    context = pipeline.run()
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class Stage(NamedTuple):
+    """
+    一个流水线阶段
+
+    Attributes:
+        name: 阶段名
+        func: 阶段函数，按 inputs 的顺序接收参数；返回值按 outputs 写入上下文
+              （只有一个输出时直接返回该值，多个输出时返回同样顺序的元组）
+        inputs: 必需的输入名称
+        outputs: 产出的名称
+        optional: 可选输入名称（缺失时传入 None，不阻止阶段运行）
+        after: 只约束顺序的阶段名称：它们在本次运行中等待或正在运行时，本阶段等它们结束后再运行；
+               不传入参数，也不会因此被选中（未选中或被跳过时不影响本阶段）
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+
+
+class PipelineHalt(Exception):
+    """阶段主动结束整个流水线（例如内容未变化），value 作为流水线的结果"""
+
+    def __init__(self, value: Any = None):
+        super().__init__(value)
+        self.value = value
+
+
+class Pipeline:
+    """依赖图调度器"""
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4):
+        names = [stage.name for stage in stages]
+        if len(names) != len(set(names)):
+            raise ValueError("阶段名称重复")
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max_workers
+
+        # 输出名称 -> 产出它的阶段
+        self.producers: Dict[str, str] = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"输出 {output} 由多个阶段产出")
+                self.producers[output] = stage.name
+        for stage in stages:
+            for name in stage.after:
+                if name not in self.stages:
+                    raise ValueError(f"阶段 {stage.name} 的 after 引用了未知阶段: {name}")
+
+        # 运行结果
+        self.completed: List[str] = []
+        self.skipped: List[str] = []
+        self.halted_by: Optional[str] = None
+
+    def upstream(self, names: Iterable[str], provided: Iterable[str] = ()) -> Set[str]:
+        """返回指定阶段及其依赖的全部上游阶段（provided 中已提供的输入不再追溯其上游）"""
+        provided = set(provided)
+        selected = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in selected:
+                continue
+            if name not in self.stages:
+                raise ValueError(f"未知阶段: {name}（可用: {', '.join(self.stages)}）")
+            selected.add(name)
+            stage = self.stages[name]
+            for needed in stage.inputs + stage.optional:
+                if needed in provided:
+                    continue
+                producer = self.producers.get(needed)
+                if producer:
+                    pending.append(producer)
+        return selected
+
+    def run(
+        self,
+        context: Dict[str, Any] = None,
+        only: Iterable[str] = None,
+        skip: Iterable[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        执行流水线
+
+        Args:
+            context: 初始上下文（预先提供的输入；输出已全部提供的阶段不再运行）
+            only: 只运行这些阶段及其上游依赖（None 表示全部；上下文中已提供的输入不再运行其上游）
+            skip: 跳过的阶段；依赖其输出的下游阶段同样会被跳过
+
+        Returns:
+            包含所有阶段输出的上下文；被 PipelineHalt 结束时 'result' 为其 value
+        """
+        context = dict(context or {})
+        selected = self.upstream(only, provided=context) if only else set(self.stages)
+        skip = set(skip)
+        for name in skip:
+            if name not in self.stages:
+                raise ValueError(f"未知阶段: {name}（可用: {', '.join(self.stages)}）")
+        pending = [
+            name for name in self.stages
+            if name in selected and name not in skip
+            and not (self.stages[name].outputs and all(key in context for key in self.stages[name].outputs))
+        ]
+        self.skipped = [name for name in self.stages if name in skip]
+        running = {}
+
+        def can_still_produce(key: str) -> bool:
+            producer = self.producers.get(key)
+            return producer in pending or producer in running.values()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while pending or running:
+                if self.halted_by is None:
+                    for name in list(pending):
+                        stage = self.stages[name]
+                        missing = [key for key in stage.inputs if key not in context]
+                        if any(can_still_produce(key) for key in missing):
+                            continue
+                        if any(can_still_produce(key) for key in stage.optional if key not in context):
+                            continue
+                        if any(other in pending or other in running.values() for other in stage.after):
+                            continue
+                        pending.remove(name)
+                        if missing:
+                            # 必需输入永远无法就绪（上游被跳过或未选中）
+                            self.skipped.append(name)
+                            print(f"   ⏭️  跳過階段 {name}（缺少 {', '.join(missing)}）")
+                            continue
+                        args = [context[key] for key in stage.inputs]
+                        args += [context.get(key) for key in stage.optional]
+                        running[executor.submit(stage.func, *args)] = name
+                else:
+                    pending.clear()
+
+                if not running:
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    stage = self.stages[name]
+                    try:
+                        value = future.result()
+                    except PipelineHalt as halt:
+                        if self.halted_by is None:
+                            self.halted_by = name
+                            context['result'] = halt.value
+                        continue
+                    if len(stage.outputs) == 1:
+                        context[stage.outputs[0]] = value
+                    elif stage.outputs:
+                        context.update(zip(stage.outputs, value))
+                    self.completed.append(name)
+
+        return context
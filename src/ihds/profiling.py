@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Stage Profiler
+~~~~~~~~~~~~~~
+
+性能分析模式（main.py --profile）：每个流水线阶段在 cProfile 和 tracemalloc 下运行，
+结束后在当天的日期目录中写入 profile/：
+
+- summary.txt           各阶段的耗时（墙钟 / CPU）、内存峰值与净分配，按耗时排序
+- NN-<阶段>.txt          热点函数（按累计时间、按自身时间）与最大的内存分配位置
+- NN-<阶段>.prof         cProfile 原始数据（可用 snakeviz / pstats 进一步查看）
+
+墙钟时间远大于 CPU 时间的阶段主要在等待网络；CPU 时间高的阶段再看热点函数
+（页面解析、base64 解码、PNG 重新压缩等）。分析期间阶段依次执行（不并发），
+每个阶段的时间和内存因此只属于它自己；结果文件与正常运行相同。cProfile 只记录
+启用它的线程，阶段内不应再把工作交给其他线程（fetcher 在分析时单线程翻译）。
+
+Usage:
+    from ihds.profiling import StageProfiler
+
+    profiler = StageProfiler()
+    profiler.start()
+    value = profiler.run_stage('parse', parse, page_html)
+    profiler.stop()
+    profiler.write_reports("output/daily_views/2026-01-10-54.6/profile")
+"""
+
+import cProfile
+import io
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, List, NamedTuple
+from unicodedata import east_asian_width
+
+from .storage import atomic_write_text
+
+
+# 每份报告列出的热点函数与分配位置数量
+DEFAULT_TOP = 25
+
+# 统计分配位置时忽略的帧（tracemalloc 自身与导入系统）
+ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class StageProfile(NamedTuple):
+    """一个阶段的分析结果"""
+    name: str
+    wall: float             # 墙钟时间（秒）
+    cpu: float              # 进程 CPU 时间（秒，包含阶段内的工作线程）
+    peak: int               # 阶段内的内存峰值（字节，相对于阶段开始时）
+    net: int                # 阶段结束时仍保留的净分配（字节）
+    profile: cProfile.Profile
+    allocations: List[tracemalloc.StatisticDiff]
+    ok: bool
+
+
+def _mib(size: int) -> str:
+    return f"{size / 1024 / 1024:.2f} MiB"
+
+
+def _pad(text: str, width: int, right: bool = False) -> str:
+    """按显示宽度补齐（中文字符占两格）"""
+    fill = ' ' * max(0, width - sum(2 if east_asian_width(char) in 'WF' else 1 for char in text))
+    return fill + text if right else text + fill
+
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+
+
+class StageProfiler:
+    """按阶段收集 CPU 热点与内存分配"""
+
+    def __init__(self, top: int = DEFAULT_TOP):
+        """
+        Args:
+            top: 每份报告列出的热点函数与分配位置数量
+        """
+        self.top = top
+        self.stages: List[StageProfile] = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def start(self):
+        """开始跟踪内存分配（已在跟踪时沿用）"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """停止 start() 开始的内存跟踪"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def run_stage(self, name: str, func: Callable[..., Any], *args) -> Any:
+        """
+        在 cProfile 与 tracemalloc 下运行一个阶段（异常照常抛出，结果同样记录）
+
+        阶段必须依次执行：tracemalloc 的峰值是整个进程的。
+        """
+        with self._lock:
+            tracing = tracemalloc.is_tracing()
+            if tracing:
+                before = tracemalloc.take_snapshot().filter_traces(ALLOCATION_FILTERS)
+                # Python 3.9+：峰值从阶段开始时重新计算
+                if hasattr(tracemalloc, 'reset_peak'):
+                    tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            profile = cProfile.Profile()
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            ok = False
+            profile.enable()
+            try:
+                value = func(*args)
+                ok = True
+                return value
+            finally:
+                profile.disable()
+                wall = time.perf_counter() - wall_start
+                cpu = time.process_time() - cpu_start
+                peak = net = 0
+                allocations = []
+                if tracing:
+                    current, peak_total = tracemalloc.get_traced_memory()
+                    after = tracemalloc.take_snapshot().filter_traces(ALLOCATION_FILTERS)
+                    allocations = [
+                        diff for diff in after.compare_to(before, 'lineno')
+                        if diff.size_diff > 0
+                    ][:self.top]
+                    peak = max(0, peak_total - baseline)
+                    net = current - baseline
+                self.stages.append(StageProfile(name, wall, cpu, peak, net, profile, allocations, ok))
+
+    def write_reports(self, directory) -> List[Path]:
+        """
+        写入 summary.txt 与每个阶段的报告
+
+        Returns:
+            写入的文件路径
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for index, stage in enumerate(self.stages, 1):
+            stem = f"{index:02d}-{_slug(stage.name)}"
+            report = directory / f"{stem}.txt"
+            atomic_write_text(report, self._stage_report(stage))
+            stage.profile.dump_stats(str(directory / f"{stem}.prof"))
+            paths += [report, directory / f"{stem}.prof"]
+        summary = directory / "summary.txt"
+        atomic_write_text(summary, self.summary_text())
+        paths.insert(0, summary)
+        return paths
+
+    def summary_text(self) -> str:
+        """各阶段的耗时与内存汇总（summary.txt 的内容）"""
+        lines = [
+            _pad('階段', 12) + ' ' + ' '.join(_pad(title, width, right=True) for title, width in (
+                ('牆鐘 s', 8), ('CPU s', 8), ('等待 s', 8), ('記憶體峰值', 12), ('淨分配', 12)
+            )) + "  狀態",
+            "-" * 72,
+        ]
+        for stage in sorted(self.stages, key=lambda s: s.wall, reverse=True):
+            lines.append(
+                f"{stage.name:<12} {stage.wall:>8.3f} {stage.cpu:>8.3f} {max(0.0, stage.wall - stage.cpu):>8.3f} "
+                f"{_mib(stage.peak):>12} {_mib(stage.net):>12}  {'完成' if stage.ok else '出錯/提前結束'}"
+            )
+        total_wall = sum(stage.wall for stage in self.stages)
+        total_cpu = sum(stage.cpu for stage in self.stages)
+        lines += [
+            "-" * 72,
+            f"{_pad('合計', 12)} {total_wall:>8.3f} {total_cpu:>8.3f} {max(0.0, total_wall - total_cpu):>8.3f}",
+            "",
+            "等待 = 牆鐘 - CPU：阻塞的時間（網絡、磁碟、等待工作線程）",
+            "記憶體峰值：階段內相對於階段開始時的最高值；淨分配：階段結束時仍保留的部分",
+        ]
+        if not hasattr(tracemalloc, 'reset_peak'):
+            lines.append("（Python < 3.9：記憶體峰值從運行開始時算起）")
+        return "\n".join(lines) + "\n"
+
+    def _stage_report(self, stage: StageProfile) -> str:
+        out = io.StringIO()
+        out.write(f"階段: {stage.name}{'' if stage.ok else '（出錯/提前結束）'}\n")
+        out.write(
+            f"牆鐘: {stage.wall:.3f}s   CPU: {stage.cpu:.3f}s   "
+            f"記憶體峰值: {_mib(stage.peak)}   淨分配: {_mib(stage.net)}\n\n"
+        )
+        for title, key in (("熱點函數（累計時間）", 'cumulative'), ("熱點函數（自身時間）", 'tottime')):
+            out.write(f"== {title} ==\n")
+            stats = pstats.Stats(stage.profile, stream=out)
+            stats.strip_dirs().sort_stats(key).print_stats(self.top)
+        out.write("== 最大的記憶體分配位置（階段內的淨增長）==\n")
+        if not stage.allocations:
+            out.write("（無）\n")
+        for rank, diff in enumerate(stage.allocations, 1):
+            frame = diff.traceback[0]
+            out.write(
+                f"{rank:>3}. {frame.filename}:{frame.lineno}  "
+                f"+{diff.size_diff / 1024:.1f} KiB，{diff.count_diff:+d} 塊"
+                f"（共 {diff.size / 1024:.1f} KiB）\n"
+            )
+        return out.getvalue()
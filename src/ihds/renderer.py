@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Daily View Renderer
+~~~~~~~~~~~~~~~~~~~
+
+按版式一次性渲染 Daily View 的 Markdown、HTML 片段和纯文本（邮件正文）。
+
+版式（LAYOUT）只声明一次：每个块对应一个内容字段，各输出格式只提供块的模板。
+模板在创建 Renderer 时编译为片段列表（模板常量与字段的取值函数），渲染时每个字段
+只读取、转换一次，同时产出所有格式、两种语言和两种图片路径深度（日期目录 ../../、
+latest 文件 ../）。
+
+Usage:
+    from ihds.renderer import Renderer, RenderKey
+
+    outputs = Renderer().render({'en': en_content, 'zh': zh_content}, date)
+    markdown_en = outputs[RenderKey('md', 'en', 2)]
+    latest_zh = outputs[RenderKey('md', 'zh', 1)]
+"""
+
+import html
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+IMAGE_COLLECTION = "Gate_Rave_Mandala_Collection"
+
+# 图片路径深度：2 = 日期目录中的文件，1 = daily_views 根目录中的 latest 文件，
+# 0 = output 根目录中的文件（订阅源）
+IMAGE_PREFIX = {
+    2: f"../../{IMAGE_COLLECTION}/",
+    1: f"../{IMAGE_COLLECTION}/",
+    0: f"{IMAGE_COLLECTION}/",
+}
+
+FORMATS = ('md', 'html', 'txt')
+LANGS = ('en', 'zh')
+DEPTHS = (2, 1)
+
+# 各语言的标签与日期格式
+LABELS = {
+    'en': {
+        'date': "%B %d, %Y",
+        'gate_image': "Gate",
+        'rave_mandala': "Rave Mandala",
+        'exaltation': "☀️ Exaltation:",
+        'detriment': "🌑 Detriment:",
+    },
+    'zh': {
+        'date': "%Y年%m月%d日",
+        'gate_image': "閘門",
+        'rave_mandala': "人類圖曼陀羅",
+        'exaltation': "☀️ 高階表達:",
+        'detriment': "🌑 低階表達:",
+    },
+}
+
+
+class Block(NamedTuple):
+    """版式中的一个块"""
+    name: str        # 值的名称（内容字段，或 date / rule）
+    kind: str        # 块类型，决定使用哪个模板
+    optional: bool   # 值为空时是否省略整个块
+
+
+LAYOUT = (
+    Block('gate_title', 'title', False),
+    Block('date', 'date', False),
+    Block('gate_image', 'image', True),
+    Block('gate_subtitle', 'subtitle', False),
+    Block('lead_description', 'quote', False),
+    Block('cross_info', 'heading', True),
+    Block('quarter_theme', 'emphasis', True),
+    Block('rule', 'rule', False),
+    Block('main_description', 'body', True),
+    Block('rave_mandala', 'image', True),
+    Block('rule', 'rule', False),
+    Block('line_title', 'heading', True),
+    Block('exaltation', 'labeled', True),
+    Block('detriment', 'labeled_last', True),
+)
+
+# 各格式的块模板：{label} 在编译时替换，{value} 在渲染时替换；None 表示该格式不输出此类块
+TEMPLATES = {
+    'md': {
+        'title': "# {value}\n\n",
+        'date': "**{value}**\n\n",
+        'image': "![{label}]({value})\n\n",
+        'subtitle': "## *{value}*\n\n",
+        'quote': "> {value}\n\n",
+        'heading': "### {value}\n\n",
+        'emphasis': "*{value}*\n\n",
+        'rule': "---\n\n",
+        'body': "{value}\n\n",
+        'labeled': "**{label}** {value}\n\n",
+        'labeled_last': "**{label}** {value}\n",
+    },
+    'html': {
+        'title': "<h1>{value}</h1>\n",
+        'date': "<p class=\"date\"><strong>{value}</strong></p>\n",
+        'image': "<figure><img src=\"{value}\" alt=\"{label}\"></figure>\n",
+        'subtitle': "<h2><em>{value}</em></h2>\n",
+        'quote': "<blockquote>{value}</blockquote>\n",
+        'heading': "<h3>{value}</h3>\n",
+        'emphasis': "<p class=\"quarter\"><em>{value}</em></p>\n",
+        'rule': "<hr>\n",
+        'body': "<p>{value}</p>\n",
+        'labeled': "<p><strong>{label}</strong> {value}</p>\n",
+        'labeled_last': "<p><strong>{label}</strong> {value}</p>\n",
+    },
+    'txt': {
+        'title': "{value}\n\n",
+        'date': "{value}\n\n",
+        'image': None,
+        'subtitle': "{value}\n\n",
+        'quote': "{value}\n\n",
+        'heading': "{value}\n\n",
+        'emphasis': "{value}\n\n",
+        'rule': "-" * 40 + "\n\n",
+        'body': "{value}\n\n",
+        'labeled': "{label} {value}\n\n",
+        'labeled_last': "{label} {value}\n",
+    },
+}
+
+
+def _html_inline(value: str) -> str:
+    return html.escape(value).replace('\n', '<br>\n')
+
+
+def _html_body(value: str) -> str:
+    paragraphs = [p.strip() for p in value.split('\n\n') if p.strip()]
+    return '</p>\n<p>'.join(_html_inline(p) for p in paragraphs)
+
+
+def _identity(value: str) -> str:
+    return value
+
+
+# 各格式的值转换：(块类型 -> 转换函数)，未列出的块类型使用 default
+VALUE_TRANSFORMS: Dict[str, Dict[str, Callable[[str], str]]] = {
+    'md': {'default': _identity},
+    'html': {'default': _html_inline, 'body': _html_body, 'image': html.escape},
+    'txt': {'default': _identity},
+}
+
+
+class _Slot(NamedTuple):
+    """编译后的块：值前后的模板常量；optional 的块在值为空时整块省略，图片块在值前留出路径前缀的位置"""
+    name: str
+    optional: bool
+    image: bool
+    prefix: str
+    suffix: str
+
+
+class RenderKey(NamedTuple):
+    """一个输出：格式、语言、图片路径深度"""
+    format: str
+    lang: str
+    depth: int
+
+
+class Renderer:
+    """编译后的版式；同一个实例可重复、并发使用"""
+
+    def __init__(
+        self,
+        formats=FORMATS,
+        langs=LANGS,
+        depths=DEPTHS,
+        image_prefixes: Optional[Dict[int, str]] = None,
+        image_files: Optional[Callable[[str], str]] = None
+    ):
+        """
+        Args:
+            formats: 需要输出的格式（'md' / 'html' / 'txt'）
+            langs: 支持的语言（'en' / 'zh'）
+            depths: 图片路径深度（2 = 日期目录，1 = latest 文件，0 = output 根目录）
+            image_prefixes: 覆盖某些深度的图片路径前缀，例如 {0: "https://example.com/Gate_Rave_Mandala_Collection/"}
+            image_files: 原图文件名 -> 实际引用的文件名（例如 ImageVariants.resolver('web') 换成预先生成的变体）
+        """
+        self.image_files = image_files
+        self.formats = tuple(formats)
+        self.langs = tuple(langs)
+        self.depths = tuple(depths)
+        prefixes = {**IMAGE_PREFIX, **(image_prefixes or {})}
+        self._image_prefixes = {
+            fmt: tuple(
+                html.escape(prefixes[depth]) if fmt == 'html' else prefixes[depth]
+                for depth in self.depths
+            )
+            for fmt in self.formats
+        }
+        self._functions = {
+            (fmt, lang): (
+                self._compile(fmt, lang),
+                tuple(RenderKey(fmt, lang, depth) for depth in self.depths),
+            )
+            for fmt in self.formats
+            for lang in self.langs
+        }
+
+    def _compile(self, fmt: str, lang: str) -> Callable[..., List[str]]:
+        """
+        把版式编译成片段列表，返回渲染函数：
+        func(内容, 日期文本, 各深度的图片前缀, 图片文件名查找) -> 各深度的结果
+
+        片段是模板常量（相邻的合并为一个）或块（_Slot）。渲染时每个字段只读取、
+        转换一次，所有片段放进一个列表；各深度只替换列表中的图片路径前缀，再 join 一次。
+        """
+        labels = LABELS[lang]
+        transforms = VALUE_TRANSFORMS[fmt]
+        # 值的名称 -> 取值函数（内容, 图片文件名查找 -> 转换后的值）
+        getters: Dict[str, Callable[[Any, Optional[Callable[[str], str]]], str]] = {}
+        parts: List[Any] = []
+
+        for block in LAYOUT:
+            template = TEMPLATES[fmt][block.kind]
+            if template is None:
+                continue
+            label = labels.get(block.name, '')
+            if fmt == 'html':
+                label = html.escape(label)
+            prefix, _, suffix = template.replace('{label}', label).partition('{value}')
+
+            if block.name == 'rule':
+                parts.append(prefix + suffix)
+                continue
+            if block.name != 'date' and block.name not in getters:
+                getters[block.name] = self._getter(block, transforms.get(block.kind, transforms['default']))
+            slot = _Slot(block.name, block.optional, block.kind == 'image', prefix, suffix)
+            if not slot.optional and not slot.image:
+                # 总会输出的块拆成常量与值，常量与相邻的常量合并
+                parts += [prefix, slot._replace(prefix='', suffix=''), suffix]
+            else:
+                parts.append(slot)
+
+        merged: List[Any] = []
+        for part in parts:
+            if isinstance(part, str) and merged and isinstance(merged[-1], str):
+                merged[-1] += part
+            elif not isinstance(part, str) or part:
+                merged.append(part)
+        parts = merged
+        getter_items = tuple(getters.items())
+
+        def render(
+            content: Any,
+            date_text: str,
+            image_prefixes: Tuple[str, ...],
+            image_files: Optional[Callable[[str], str]]
+        ) -> List[str]:
+            values = {name: getter(content, image_files) for name, getter in getter_items}
+            values['date'] = date_text
+            pieces: List[Optional[str]] = []
+            holes: List[int] = []
+            for part in parts:
+                if isinstance(part, str):
+                    pieces.append(part)
+                    continue
+                value = values[part.name]
+                if part.optional and not value:
+                    continue
+                if part.prefix:
+                    pieces.append(part.prefix)
+                if part.image:
+                    holes.append(len(pieces))
+                    pieces.append(None)
+                pieces.append(value)
+                if part.suffix:
+                    pieces.append(part.suffix)
+            if not holes:
+                return [''.join(pieces)] * len(image_prefixes)
+            outputs = []
+            for image_prefix in image_prefixes:
+                for hole in holes:
+                    pieces[hole] = image_prefix
+                outputs.append(''.join(pieces))
+            return outputs
+
+        return render
+
+    @staticmethod
+    def _getter(block: Block, transform: Callable[[str], str]) -> Callable[[Any, Optional[Callable[[str], str]]], str]:
+        """块的取值函数：读取内容字段，图片块换成实际引用的文件名，再按格式转换"""
+        field = _IMAGE_FIELDS.get(block.name, block.name)
+        image = block.kind == 'image'
+        if transform is _identity:
+            transform = None
+
+        def get(content: Any, image_files: Optional[Callable[[str], str]]) -> str:
+            value = content.get(field, '') or ''
+            if value and image and image_files is not None:
+                value = image_files(value)
+            if value and transform is not None:
+                value = transform(value)
+            return value
+
+        return get
+
+    def render(
+        self,
+        contents: Dict[str, Any],
+        date: Optional[datetime] = None,
+        image_files: Optional[Callable[[str], str]] = None
+    ) -> Dict[RenderKey, str]:
+        """
+        渲染所有格式
+
+        Args:
+            contents: 语言 -> 内容（字典或 DailyViewContent），值为 None 的语言跳过
+            date: 显示的日期（默认今天）
+            image_files: 本次渲染使用的原图文件名查找（默认为创建时的 image_files）
+
+        Returns:
+            RenderKey -> 渲染结果
+        """
+        date = date or datetime.now()
+        image_files = image_files or self.image_files
+        outputs = {}
+        for lang, content in contents.items():
+            if content is None:
+                continue
+            date_text = _date_text(date.toordinal(), LABELS[lang]['date'])
+            for fmt in self.formats:
+                function, keys = self._functions[(fmt, lang)]
+                outputs.update(zip(keys, function(content, date_text, self._image_prefixes[fmt], image_files)))
+        return outputs
+
+
+@lru_cache(maxsize=1024)
+def _date_text(ordinal: int, pattern: str) -> str:
+    """格式化日期（strftime 比渲染本身还慢，回填时同一日期会反复用到）"""
+    return datetime.fromordinal(ordinal).strftime(pattern)
+
+
+# 图片块取值的内容字段（本地文件名）
+_IMAGE_FIELDS = {
+    'gate_image': 'gate_image_local',
+    'rave_mandala': 'rave_mandala_local',
+}
+
+# 只输出日期目录 Markdown 的渲染器（generate_markdown_* 与回填使用；回填按调用传入图片变体的查找）
+MARKDOWN_RENDERER = Renderer(formats=('md',), depths=(2,))
+
+
+def render_markdown(content, lang: str, date: Optional[datetime] = None) -> str:
+    """渲染日期目录中的 Markdown（图片路径 ../../）"""
+    return MARKDOWN_RENDERER.render({lang: content}, date)[RenderKey('md', lang, 2)]
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Archive Search
+~~~~~~~~~~~~~~
+
+中英文归档的全文检索（SQLite 倒排索引）。
+
+- 英文：按小写单词切分
+- 中文：连续的 CJK 字符切为单字和相邻两字（bigram），不需要分词词典
+- 每一天的英文版和中文版各是一篇文档，按 BM25 排序，结果按日期合并
+- 用双引号括起的短语（"Channel of Struggle"）要求按原顺序相邻出现：
+  先按词项取候选文档，再在索引中保存的原文上核对
+- 增量更新：与归档索引（manifest.json）中的 sha256 比较，只重新索引新增或变化的日期
+
+Usage:
+    from ihds.search import SearchIndex
+
+    with SearchIndex("output/.cache/search.sqlite3") as index:
+        index.sync(manifest)
+        for hit in index.search('"Channel of Struggle"'):
+            print(hit.date, hit.gate_line, hit.score)
+"""
+
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+from .archive import parse_day_dir_name
+from .content import CONTENT_FIELDS, load_day
+
+
+# 英文单词，或连续的 CJK 字符（含扩展 A 区与兼容区）
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+# 参与检索的字段（不包含图片地址和文件名）
+SEARCH_FIELDS = tuple(
+    field for field in CONTENT_FIELDS
+    if field not in ('gate_image_url', 'gate_image_local', 'rave_mandala_local')
+)
+
+# 查询中用双引号括起的短语
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+# 短语中相邻词项之间允许的分隔（空白、标点等非词项字符）
+PHRASE_GAP = r'[^a-z0-9\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]*'
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str, query: bool = False) -> List[str]:
+    """
+    切分文本
+
+    Args:
+        text: 英文或中文文本
+        query: 查询模式——多字的中文只取 bigram（要求相邻），单字才取单字
+
+    Returns:
+        词项列表（可重复）
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if token[0] < '\u3400':
+            tokens.append(token)
+            continue
+        bigrams = [token[i:i + 2] for i in range(len(token) - 1)]
+        if query:
+            tokens.extend(bigrams or [token])
+        else:
+            tokens.extend(token)
+            tokens.extend(bigrams)
+    return tokens
+
+
+def phrase_pattern(phrase: str) -> Optional["re.Pattern"]:
+    """
+    短语 -> 在小写原文中查找的正则：词项按顺序相邻出现，中间只允许空白和标点
+
+    Returns:
+        正则；短语中没有词项时返回 None
+    """
+    tokens = TOKEN_PATTERN.findall(phrase.lower())
+    if not tokens:
+        return None
+    body = PHRASE_GAP.join(re.escape(token) for token in tokens)
+    # 英文词项不能是更长单词的一部分
+    return re.compile(r'(?<![a-z0-9])' + body + r'(?![a-z0-9])')
+
+
+class SearchHit(NamedTuple):
+    """一条检索结果（按日期合并中英文文档）"""
+    date: str
+    gate_line: str
+    dir: str
+    score: float
+    langs: str
+    title: str
+
+
+class SearchIndex:
+    """基于 SQLite 的倒排索引"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                dir TEXT NOT NULL,
+                lang TEXT NOT NULL,
+                date TEXT NOT NULL,
+                gate_line TEXT NOT NULL,
+                title TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                signature TEXT NOT NULL,
+                UNIQUE (dir, lang)
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc);
+            CREATE TABLE IF NOT EXISTS texts (
+                doc INTEGER PRIMARY KEY,
+                text TEXT NOT NULL
+            );
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def sync(self, manifest) -> Dict[str, int]:
+        """
+        按归档索引更新：新增或哈希变化的日期重新索引，已不存在的日期删除
+
+        Args:
+            manifest: ArchiveManifest
+
+        Returns:
+            统计：indexed / removed / unchanged
+        """
+        wanted = {}
+        for date, gate_lines in manifest.days.items():
+            for entry in gate_lines.values():
+                artifacts = entry['artifacts']
+                signature = '/'.join(
+                    artifacts[kind]['sha256'] if kind in artifacts else '-'
+                    for kind in ('content', 'en', 'zh')
+                )
+                wanted[entry['dir']] = signature
+
+        with self._lock:
+            existing = {}
+            # 没有保存原文的旧文档（短语查询需要）视为已变化，重新索引
+            for dir_name, signature in self._conn.execute(
+                "SELECT d.dir, CASE WHEN t.doc IS NULL THEN '' ELSE d.signature END "
+                "FROM docs d LEFT JOIN texts t ON t.doc = d.id"
+            ):
+                # 同一天的中英文文档中有一篇需要重新索引时，整天重新索引
+                existing[dir_name] = signature if existing.get(dir_name, signature) == signature else ''
+
+        stats = {'indexed': 0, 'removed': 0, 'unchanged': 0}
+        for dir_name in sorted(set(existing) - set(wanted)):
+            self.remove_day(dir_name)
+            stats['removed'] += 1
+        for dir_name, signature in sorted(wanted.items()):
+            if existing.get(dir_name) == signature:
+                stats['unchanged'] += 1
+                continue
+            if self.index_day(manifest.archive_dir / dir_name, signature):
+                stats['indexed'] += 1
+        return stats
+
+    def index_day(self, day_dir, signature: str) -> bool:
+        """索引一天的中英文内容（替换旧的文档）"""
+        day = parse_day_dir_name(day_dir.name)
+        if day is None:
+            return False
+        record = load_day(day._replace(path=day_dir))
+        if record is None:
+            return False
+
+        with self._lock, self._conn:
+            self._delete(day_dir.name)
+            for lang, content in (('en', record.en), ('zh', record.zh)):
+                text = '\n'.join(content.get(field) for field in SEARCH_FIELDS)
+                counts = Counter(tokenize(text))
+                if not counts:
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT INTO docs (dir, lang, date, gate_line, title, length, signature) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (day_dir.name, lang, record.date, record.gate_line,
+                     content.gate_title, sum(counts.values()), signature)
+                )
+                self._conn.executemany(
+                    "INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)",
+                    ((term, cursor.lastrowid, tf) for term, tf in counts.items())
+                )
+                self._conn.execute(
+                    "INSERT INTO texts (doc, text) VALUES (?, ?)", (cursor.lastrowid, text.lower())
+                )
+        return True
+
+    def remove_day(self, dir_name: str):
+        with self._lock, self._conn:
+            self._delete(dir_name)
+
+    def _delete(self, dir_name: str):
+        doc_ids = [row[0] for row in self._conn.execute("SELECT id FROM docs WHERE dir = ?", (dir_name,))]
+        for doc_id in doc_ids:
+            self._conn.execute("DELETE FROM postings WHERE doc = ?", (doc_id,))
+            self._conn.execute("DELETE FROM texts WHERE doc = ?", (doc_id,))
+        self._conn.execute("DELETE FROM docs WHERE dir = ?", (dir_name,))
+
+    def search(self, query: str, lang: Optional[str] = None, limit: int = 20) -> List[SearchHit]:
+        """
+        检索包含全部查询词的日期
+
+        Args:
+            query: 查询（英文单词和/或中文）；双引号括起的部分按短语匹配
+            lang: 只检索 'en' 或 'zh'（默认两者）
+            limit: 最多返回的日期数
+
+        Returns:
+            按 BM25 得分降序的结果
+        """
+        terms = list(dict.fromkeys(tokenize(query.replace('"', ' '), query=True)))
+        if not terms:
+            return []
+        phrases = [pattern for pattern in map(phrase_pattern, PHRASE_PATTERN.findall(query)) if pattern]
+
+        with self._lock:
+            lang_filter = " WHERE lang = ?" if lang else ""
+            params = (lang,) if lang else ()
+            total, avg_length = self._conn.execute(
+                f"SELECT COUNT(*), AVG(length) FROM docs{lang_filter}", params
+            ).fetchone()
+            if not total:
+                return []
+
+            scores: Optional[Dict[int, float]] = None
+            for term in terms:
+                postings = self._conn.execute(
+                    "SELECT p.doc, p.tf, d.length FROM postings p JOIN docs d ON d.id = p.doc "
+                    f"WHERE p.term = ?{' AND d.lang = ?' if lang else ''}",
+                    (term,) + params
+                ).fetchall()
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                term_scores = {}
+                for doc, tf, length in postings:
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    term_scores[doc] = idf * tf * (BM25_K1 + 1) / norm
+                # 所有查询词都必须出现
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores}
+                if not scores:
+                    return []
+
+            if phrases:
+                # 词项都出现的候选文档中，只保留按顺序包含每个短语的文档
+                placeholders = ','.join('?' * len(scores))
+                texts = self._conn.execute(
+                    f"SELECT doc, text FROM texts WHERE doc IN ({placeholders})", list(scores)
+                ).fetchall()
+                matched = {doc for doc, text in texts if all(pattern.search(text) for pattern in phrases)}
+                scores = {doc: score for doc, score in scores.items() if doc in matched}
+                if not scores:
+                    return []
+
+            placeholders = ','.join('?' * len(scores))
+            rows = self._conn.execute(
+                f"SELECT id, dir, lang, date, gate_line, title FROM docs WHERE id IN ({placeholders})",
+                list(scores)
+            ).fetchall()
+
+        # 同一天的中英文文档合并，取较高的得分
+        days: Dict[str, SearchHit] = {}
+        langs: Dict[str, set] = {}
+        for doc, dir_name, doc_lang, date, gate_line, title in rows:
+            langs.setdefault(dir_name, set()).add(doc_lang)
+            if dir_name not in days or scores[doc] > days[dir_name].score:
+                days[dir_name] = SearchHit(date, gate_line, dir_name, scores[doc], '', title)
+        hits = sorted(days.values(), key=lambda hit: (-hit.score, hit.date))
+        return [hit._replace(langs=','.join(sorted(langs[hit.dir]))) for hit in hits[:limit]]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            docs, days = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT dir) FROM docs").fetchone()
+            terms = self._conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+        return {'docs': docs, 'days': days, 'terms': terms}
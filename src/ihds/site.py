@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Static Site Builder
+~~~~~~~~~~~~~~~~~~~
+
+把 Daily View 归档发布为静态 HTML 网站（output/site/）：
+
+- days/{日期目录}.html      每天一页（中英文，带前后一天的导航）
+- gates/{Gate}.html         每个 Gate 的索引页（出现过的所有日期）
+- calendar/{YYYY-MM}.html   月历
+- index.html                首页（最新一天、月份列表、64 个 Gate）
+
+输入只来自 fetcher.run() 写入的产物：归档索引（manifest.json）与每天的
+content_{date}.json。每个页面的签名由它依赖的数据计算（内容哈希、前后一天、
+同一 Gate / 同一月份的日期列表），记录在 output/.cache/site_state.json；
+签名未变化且文件存在的页面不会重新生成。新增一天时只会重建当天页面、
+前一天页面（“下一天”链接）、所属 Gate 页、所属月份和首页。
+
+图片直接引用 output/Gate_Rave_Mandala_Collection/（页面中为 ../../ 相对路径），
+发布时把 site/ 与图片目录一起放在 output/ 下即可。提供 ImageVariants 时每日页面使用
+960px WebP、Gate 页使用缩略图（变体未生成时仍引用原图），页面签名包含实际引用的文件名。
+
+Usage:
+    from ihds.site import SiteBuilder
+
+    stats = SiteBuilder(manifest, "output/site", "output/.cache/site_state.json").build()
+"""
+
+import calendar
+import hashlib
+import html
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .content import DailyView, load_day_dir
+from .manifest import ArchiveManifest
+from .renderer import IMAGE_COLLECTION, RenderKey, Renderer
+from .storage import atomic_write_json, atomic_write_text
+
+
+# 页面模板版本：修改下面的页面版式时递增，所有页面会重新生成
+SITE_VERSION = 2
+
+# 日期目录中的页面与 Markdown 一样位于两级子目录下，图片路径同为 ../../
+HTML_RENDERER = Renderer(formats=('html',), depths=(2,))
+
+STYLESHEET = """\
+body { max-width: 46rem; margin: 0 auto; padding: 1rem; font-family: -apple-system, "PingFang TC", "Noto Sans TC", sans-serif; line-height: 1.7; color: #222; }
+nav { display: flex; flex-wrap: wrap; gap: .5rem 1rem; font-size: .9rem; border-bottom: 1px solid #ddd; padding-bottom: .5rem; }
+nav .next { margin-left: auto; }
+a { color: #7a4b00; }
+img { max-width: 100%; height: auto; }
+img.thumb { max-width: 240px; }
+figure { margin: 1rem 0; }
+blockquote { margin: 1rem 0; padding-left: 1rem; border-left: 3px solid #c9a25a; color: #555; }
+article + article { margin-top: 3rem; border-top: 2px solid #eee; }
+.date { color: #777; }
+table.calendar { border-collapse: collapse; width: 100%; }
+table.calendar th, table.calendar td { border: 1px solid #eee; padding: .3rem; vertical-align: top; width: 14.28%; height: 3.5rem; }
+table.calendar td span { color: #999; font-size: .8rem; }
+ul.gates { display: grid; grid-template-columns: repeat(8, 1fr); list-style: none; padding: 0; gap: .3rem; }
+ul.gates li { text-align: center; }
+"""
+
+WEEKDAYS = "一二三四五六日"
+
+
+def _signature(*parts: Any) -> str:
+    data = json.dumps([SITE_VERSION, parts], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _content_signature(entry: Dict[str, Any]) -> str:
+    """一天的内容哈希（与检索索引相同：content / en / zh 的 sha256）"""
+    artifacts = entry['artifacts']
+    return '/'.join(
+        artifacts[kind]['sha256'] if kind in artifacts else '-'
+        for kind in ('content', 'en', 'zh')
+    )
+
+
+def _esc(text: str) -> str:
+    return html.escape(text or '')
+
+
+class SiteDay:
+    """站点中的一天（只含归档索引里的信息，不读取内容）"""
+
+    __slots__ = ('date', 'gate_line', 'dir', 'content', 'images')
+
+    def __init__(self, date: str, gate_line: str, entry: Dict[str, Any]):
+        self.date = date
+        self.gate_line = gate_line
+        self.dir = entry['dir']
+        self.content = _content_signature(entry)
+        # 当天引用的图片（相对于图片收藏目录）
+        self.images = tuple(
+            entry['artifacts'][kind]['path'].split(f"{IMAGE_COLLECTION}/", 1)[-1]
+            for kind in ('gate_image', 'rave_mandala')
+            if kind in entry['artifacts']
+        )
+
+    @property
+    def gate(self) -> str:
+        return self.gate_line.split('.')[0]
+
+    @property
+    def month(self) -> str:
+        return self.date[:7]
+
+    @property
+    def page(self) -> str:
+        return f"days/{self.dir}.html"
+
+    @property
+    def label(self) -> str:
+        return f"{self.date} · {self.gate_line}" if self.gate_line else self.date
+
+    def key(self) -> Tuple[str, str, str]:
+        """导航链接依赖的信息"""
+        return (self.dir, self.date, self.gate_line)
+
+
+class SiteBuilder:
+    """增量构建静态网站"""
+
+    def __init__(self, manifest: ArchiveManifest, site_dir, state_path, variants=None):
+        """
+        Args:
+            manifest: 归档索引
+            site_dir: 网站输出目录（output/site）
+            state_path: 页面签名记录（output/.cache/site_state.json）
+            variants: ImageVariants（None 表示页面引用原图）
+        """
+        self.manifest = manifest
+        self.site_dir = Path(site_dir)
+        self.state_path = Path(state_path)
+        self.variants = variants
+        self.html_renderer = HTML_RENDERER
+        if variants is not None:
+            self.html_renderer = Renderer(formats=('html',), depths=(2,), image_files=variants.resolver('web'))
+        self._records: Dict[str, Optional[DailyView]] = {}
+
+    def _load_state(self) -> Dict[str, str]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get('version') != SITE_VERSION:
+            return {}
+        return state.get('pages', {})
+
+    def _record(self, day: SiteDay) -> Optional[DailyView]:
+        if day.dir not in self._records:
+            self._records[day.dir] = load_day_dir(self.manifest.archive_dir / day.dir)
+        return self._records[day.dir]
+
+    def _days(self) -> List[SiteDay]:
+        return [
+            SiteDay(date, gate_line, entry)
+            for date in sorted(self.manifest.days)
+            for gate_line, entry in sorted(self.manifest.days[date].items())
+        ]
+
+    def pages(self) -> Dict[str, Tuple[str, Callable[[], str]]]:
+        """
+        网站的所有页面
+
+        Returns:
+            相对路径 -> (签名, 生成页面 HTML 的函数)
+        """
+        days = self._days()
+        by_gate: Dict[str, List[SiteDay]] = {}
+        by_month: Dict[str, List[SiteDay]] = {}
+        for day in days:
+            if day.gate:
+                by_gate.setdefault(day.gate, []).append(day)
+            by_month.setdefault(day.month, []).append(day)
+        months = sorted(by_month)
+
+        pages: Dict[str, Tuple[str, Callable[[], str]]] = {}
+        for i, day in enumerate(days):
+            prev_day = days[i - 1] if i > 0 else None
+            next_day = days[i + 1] if i + 1 < len(days) else None
+            pages[day.page] = (
+                _signature('day', day.key(), day.content, [self._image(name, 'web') for name in day.images],
+                           prev_day and prev_day.key(), next_day and next_day.key()),
+                lambda day=day, prev_day=prev_day, next_day=next_day: self.render_day(day, prev_day, next_day)
+            )
+        for gate, gate_days in by_gate.items():
+            pages[f"gates/{gate}.html"] = (
+                _signature('gate', gate, [(d.key(), d.content) for d in gate_days], self._gate_thumb(gate, gate_days)),
+                lambda gate=gate, gate_days=gate_days: self.render_gate(gate, gate_days)
+            )
+        for i, month in enumerate(months):
+            neighbours = (months[i - 1] if i > 0 else None, months[i + 1] if i + 1 < len(months) else None)
+            pages[f"calendar/{month}.html"] = (
+                _signature('month', month, [d.key() for d in by_month[month]], neighbours),
+                lambda month=month, neighbours=neighbours: self.render_month(month, by_month[month], *neighbours)
+            )
+        latest = self._latest_day(days)
+        month_counts = [(month, len(by_month[month])) for month in months]
+        gate_counts = {gate: len(gate_days) for gate, gate_days in by_gate.items()}
+        pages["index.html"] = (
+            _signature('index', latest and latest.key(), month_counts, gate_counts),
+            lambda: self.render_index(latest, month_counts, gate_counts)
+        )
+        pages["style.css"] = (_signature('style', STYLESHEET), lambda: STYLESHEET)
+        return pages
+
+    def _image(self, name: str, variant: str) -> str:
+        """页面中引用的图片文件名（变体或原图）"""
+        return self.variants.resolve(name, variant) if self.variants is not None else name
+
+    def _gate_thumb(self, gate: str, gate_days: List[SiteDay]) -> Optional[str]:
+        """Gate 页的缩略图（归档中有该 Gate 的图片时）"""
+        name = f"Gate-{gate}.jpg"
+        if any(name in day.images for day in gate_days):
+            return self._image(name, 'thumb')
+        return None
+
+    def _latest_day(self, days: List[SiteDay]) -> Optional[SiteDay]:
+        latest = self.manifest.latest()
+        if latest is not None:
+            for day in reversed(days):
+                if (day.date, day.gate_line) == latest[:2]:
+                    return day
+        return days[-1] if days else None
+
+    def build(self, force: bool = False) -> Dict[str, int]:
+        """
+        生成签名变化或文件缺失的页面，删除归档中已不存在的页面
+
+        Args:
+            force: 忽略签名，全部重新生成
+
+        Returns:
+            统计：rendered / skipped / removed
+        """
+        state = {} if force else self._load_state()
+        pages = self.pages()
+        stats = {'rendered': 0, 'skipped': 0, 'removed': 0}
+
+        for page in sorted(set(state) - set(pages)):
+            path = self.site_dir / page
+            if path.exists():
+                path.unlink()
+            del state[page]
+            stats['removed'] += 1
+
+        for page, (signature, render) in sorted(pages.items()):
+            path = self.site_dir / page
+            if state.get(page) == signature and path.exists():
+                stats['skipped'] += 1
+                continue
+            atomic_write_text(path, render())
+            state[page] = signature
+            stats['rendered'] += 1
+
+        if stats['rendered'] or stats['removed'] or force:
+            atomic_write_json(self.state_path, {'version': SITE_VERSION, 'pages': dict(sorted(state.items()))})
+        return stats
+
+    # ---- 页面版式 ----
+
+    @staticmethod
+    def _page(title: str, body: str, root: str) -> str:
+        """完整的 HTML 页面；root 为回到网站根目录的相对路径"""
+        return (
+            "<!DOCTYPE html>\n"
+            "<html lang=\"zh-Hant\">\n"
+            "<head>\n"
+            "<meta charset=\"utf-8\">\n"
+            "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+            f"<title>{_esc(title)}</title>\n"
+            f"<link rel=\"stylesheet\" href=\"{root}style.css\">\n"
+            "</head>\n"
+            "<body>\n"
+            f"{body}"
+            "</body>\n"
+            "</html>\n"
+        )
+
+    def render_day(self, day: SiteDay, prev_day: Optional[SiteDay], next_day: Optional[SiteDay]) -> str:
+        record = self._record(day)
+        nav = ["<nav>", "<a href=\"../index.html\">首頁</a>",
+               f"<a href=\"../calendar/{day.month}.html\">{day.month}</a>"]
+        if day.gate:
+            nav.append(f"<a href=\"../gates/{day.gate}.html\">Gate {_esc(day.gate)}</a>")
+        if prev_day:
+            nav.append(f"<a class=\"prev\" href=\"{prev_day.dir}.html\">← {_esc(prev_day.label)}</a>")
+        if next_day:
+            nav.append(f"<a class=\"next\" href=\"{next_day.dir}.html\">{_esc(next_day.label)} →</a>")
+        nav.append("</nav>\n")
+
+        articles = []
+        title = day.label
+        if record is not None:
+            title = f"{record.en.gate_title or day.label} · {day.date}"
+            contents = {'zh': record.zh if record.zh.gate_title else None, 'en': record.en}
+            rendered = self.html_renderer.render(contents, datetime.strptime(record.date, "%Y-%m-%d"))
+            for lang, html_lang in (('zh', 'zh-Hant'), ('en', 'en')):
+                key = RenderKey('html', lang, 2)
+                if key in rendered:
+                    articles.append(f"<article lang=\"{html_lang}\">\n{rendered[key]}</article>\n")
+        return self._page(title, "\n".join(nav) + "".join(articles), "../")
+
+    def render_gate(self, gate: str, gate_days: List[SiteDay]) -> str:
+        latest = self._record(gate_days[-1])
+        heading = f"Gate {gate}"
+        if latest is not None and latest.en.gate_title:
+            heading = latest.en.gate_title
+            if latest.zh.gate_title:
+                heading += f" · {latest.zh.gate_title}"
+        rows = []
+        for day in reversed(gate_days):
+            record = self._record(day)
+            line_title = ''
+            if record is not None:
+                line_title = record.zh.line_title or record.en.line_title
+            rows.append(
+                f"<li><a href=\"../days/{day.dir}.html\">{_esc(day.label)}</a> {_esc(line_title)}</li>"
+            )
+        thumb = self._gate_thumb(gate, gate_days)
+        figure = ''
+        if thumb:
+            figure = f"<p><img class=\"thumb\" src=\"../../{IMAGE_COLLECTION}/{_esc(thumb)}\" alt=\"Gate {_esc(gate)}\"></p>\n"
+        body = (
+            "<nav><a href=\"../index.html\">首頁</a></nav>\n"
+            f"<h1>{_esc(heading)}</h1>\n"
+            f"{figure}"
+            f"<p>共 {len(gate_days)} 天</p>\n"
+            "<ul>\n" + "\n".join(rows) + "\n</ul>\n"
+        )
+        return self._page(heading, body, "../")
+
+    def render_month(self, month: str, month_days: List[SiteDay], prev_month: Optional[str], next_month: Optional[str]) -> str:
+        year, month_num = int(month[:4]), int(month[5:7])
+        links: Dict[int, List[str]] = {}
+        for day in month_days:
+            text = _esc(day.gate_line or day.date)
+            links.setdefault(int(day.date[8:10]), []).append(f"<a href=\"../days/{day.dir}.html\">{text}</a>")
+
+        rows = ["<tr>" + "".join(f"<th>{w}</th>" for w in WEEKDAYS) + "</tr>"]
+        for week in calendar.Calendar(firstweekday=0).monthdayscalendar(year, month_num):
+            cells = []
+            for day_num in week:
+                if not day_num:
+                    cells.append("<td></td>")
+                    continue
+                cell = f"<span>{day_num}</span>"
+                if day_num in links:
+                    cell += "<br>" + "<br>".join(links[day_num])
+                cells.append(f"<td>{cell}</td>")
+            rows.append("<tr>" + "".join(cells) + "</tr>")
+
+        nav = ["<nav>", "<a href=\"../index.html\">首頁</a>"]
+        if prev_month:
+            nav.append(f"<a class=\"prev\" href=\"{prev_month}.html\">← {prev_month}</a>")
+        if next_month:
+            nav.append(f"<a class=\"next\" href=\"{next_month}.html\">{next_month} →</a>")
+        nav.append("</nav>\n")
+        body = (
+            "\n".join(nav)
+            + f"<h1>{year}年{month_num}月</h1>\n"
+            + "<table class=\"calendar\">\n" + "\n".join(rows) + "\n</table>\n"
+        )
+        return self._page(f"{year}年{month_num}月", body, "../")
+
+    def render_index(self, latest: Optional[SiteDay], month_counts: List[Tuple[str, int]], gate_counts: Dict[str, int]) -> str:
+        parts = ["<h1>IHDS Daily View</h1>\n"]
+        if latest is not None:
+            parts.append(f"<p>最新：<a href=\"days/{latest.dir}.html\">{_esc(latest.label)}</a></p>\n")
+        parts.append("<h2>月曆</h2>\n<ul>\n")
+        parts.extend(
+            f"<li><a href=\"calendar/{month}.html\">{month}</a>（{count} 天）</li>\n"
+            for month, count in reversed(month_counts)
+        )
+        parts.append("</ul>\n<h2>Gate</h2>\n<ul class=\"gates\">\n")
+        for gate in range(1, 65):
+            count = gate_counts.get(str(gate))
+            if count:
+                parts.append(f"<li><a href=\"gates/{gate}.html\" title=\"{count} 天\">{gate}</a></li>\n")
+            else:
+                parts.append(f"<li>{gate}</li>\n")
+        parts.append("</ul>\n")
+        return self._page("IHDS Daily View", "".join(parts), "")
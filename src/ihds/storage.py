@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Storage Helpers
+~~~~~~~~~~~~~~~
+
+原子写入文件：先写入同目录下的临时文件，再用 os.replace 替换，
+中途失败不会留下写了一半的文件。
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+def atomic_write_bytes(path, data: bytes):
+    """原子写入二进制文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_text(path, text: str):
+    """原子写入 UTF-8 文本文件"""
+    atomic_write_bytes(path, text.encode('utf-8'))
+
+
+def atomic_write_json(path, data: Any, indent: int = 1):
+    """原子写入 JSON 文件（保留中文字符）"""
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=indent))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Translation Cache
+~~~~~~~~~~~~~~~~~
+
+基于 SQLite 的持久化翻译缓存。
+
+缓存键为「原文 + 命名空间 + 模型 + temperature」的 SHA-256，
+任意一项变化都会视为新的翻译请求。命名空间标识译文遵循的翻译要求（抓取器使用
+翻译系统提示词），而不是产生某条译文的具体请求：逐个翻译、批量翻译和句段拼接的
+译文共用同一个命名空间。超过容量上限时按最近使用时间淘汰。
+
+Usage:
+    from ihds.translation_cache import TranslationCache
+
+    cache = TranslationCache("output/.cache/translations.sqlite3")
+    text = cache.get(source, namespace, model, temperature)
+    if text is None:
+        cache.put(source, namespace, model, temperature, translated)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+class TranslationCache:
+    """内容寻址的翻译缓存（线程安全）"""
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        """
+        初始化翻译缓存
+
+        Args:
+            path: SQLite 数据库文件路径（目录不存在时自动创建）
+            max_entries: 最多保留的条目数，超过后淘汰最久未使用的条目
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        # 本次运行的命中统计
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                model TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str, namespace: str, model: str, temperature: float) -> str:
+        """计算缓存键：原文、命名空间、模型与 temperature 的 SHA-256"""
+        digest = hashlib.sha256()
+        for part in (text, namespace, model, repr(float(temperature))):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, text: str, namespace: str, model: str, temperature: float) -> Optional[str]:
+        """查询缓存，未命中返回 None（每次查询计一次命中或未命中）"""
+        key = self.make_key(text, namespace, model, temperature)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE translations SET last_used = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (time.time(), key)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, text: str, namespace: str, model: str, temperature: float, translation: str):
+        """写入缓存，并在超过容量时淘汰最久未使用的条目"""
+        key = self.make_key(text, namespace, model, temperature)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO translations (key, source, translation, model, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET translation = excluded.translation,
+                                               last_used = excluded.last_used
+                """,
+                (key, text, translation, model, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """淘汰超出容量的条目（调用方需持有锁）"""
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                """
+                DELETE FROM translations WHERE key IN (
+                    SELECT key FROM translations ORDER BY last_used ASC LIMIT ?
+                )
+                """,
+                (excess,)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """返回缓存统计信息"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
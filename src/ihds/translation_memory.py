@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Translation Memory
+~~~~~~~~~~~~~~~~~~
+
+句段级翻译记忆。
+
+字段按段落、句子切分为句段（保留句段之间的分隔符）；已翻译过的句段直接复用
+（例如两个 Gate 共用的 Channel 段落、整个 64 Gate 循环里重复出现的通用句子），
+只有新句段才合并成一次请求发送给 DeepSeek。没有任何已知句段的字段整段发送，
+保留上下文；任一句段翻译失败时整个字段记为失败，不把失败的原文混进译文。
+句段译文存放在 TranslationCache 中。
+
+Usage:
+    from ihds.translation_memory import TranslationMemory
+
+    memory = TranslationMemory(lookup=cache_get, store=cache_put)
+    zh = memory.translate({"main_description": text}, translate_batch)
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# 句子边界：句末标点（可带右引号/右括号）+ 空白 + 大写字母、数字或左引号开头
+SENTENCE_BOUNDARY = re.compile(
+    r'(?:(?<=[.!?])|(?<=[.!?]["\'”’)]))\s+(?=["\'“‘(]?[A-Z0-9])'
+)
+PARAGRAPH_BOUNDARY = re.compile(r'\n\s*\n')
+
+# 句段之间的分隔符：段落边界或句子边界（切分时保留，拼回译文时使用）
+SEGMENT_BOUNDARY = re.compile(f'({PARAGRAPH_BOUNDARY.pattern}|{SENTENCE_BOUNDARY.pattern})')
+
+FAILED_PREFIX = "[翻译失败]"
+
+
+def split_segments(text: str) -> Tuple[List[str], List[str]]:
+    """
+    将文本切分为句段
+
+    Returns:
+        (句段列表, 分隔符列表)；separators[i] 位于 segments[i] 与 segments[i + 1] 之间
+    """
+    text = text.strip()
+    if not text:
+        return [], []
+    parts = SEGMENT_BOUNDARY.split(text)
+    return parts[0::2], parts[1::2]
+
+
+def join_segments(segments: List[str], separators: List[str]) -> str:
+    """
+    将译文句段拼回文本：保留原文分隔符中的换行（段落之间空一行、段落内的单个换行），
+    只有空格的分隔符去掉（中文句子直接相连）
+    """
+    parts = segments[:1]
+    for separator, segment in zip(separators, segments[1:]):
+        newlines = separator.count('\n')
+        parts.append('\n\n' if newlines > 1 else '\n' * newlines)
+        parts.append(segment)
+    return ''.join(parts)
+
+
+class TranslationMemory:
+    """句段级翻译记忆"""
+
+    def __init__(
+        self,
+        lookup: Callable[[str], Optional[str]],
+        store: Callable[[str, str], None]
+    ):
+        """
+        初始化翻译记忆
+
+        Args:
+            lookup: 查询句段译文，未命中返回 None
+            store: 保存句段译文
+        """
+        self.lookup = lookup
+        self.store = store
+
+        # 本次运行的句段统计
+        self.reused = 0
+        self.translated = 0
+        self.failed = 0
+
+    def translate(
+        self,
+        texts: Dict[str, str],
+        translate_batch: Callable[[Dict[str, str]], Dict[str, str]]
+    ) -> Dict[str, str]:
+        """
+        翻译多个字段，只有记忆中没有的句段才交给 translate_batch
+
+        没有任何已知句段的字段整段交给 translate_batch（保留上下文）；有已知句段的
+        字段只发送新句段。任一句段翻译失败的字段返回 "[翻译失败] 原文"。
+
+        Args:
+            texts: 字段名 -> 英文原文
+            translate_batch: 批量翻译函数（键 -> 原文 => 键 -> 译文），一次调用完成所有新句段
+
+        Returns:
+            字段名 -> 繁体中文译文
+        """
+        structures = {field: split_segments(text) for field, text in texts.items()}
+
+        # 已知句段的译文；需要翻译的单位（新句段，或整段发送的字段原文），去重
+        known: Dict[str, str] = {}
+        units: List[str] = []
+        whole = set()
+        for field, (segments, _) in structures.items():
+            hits = {}
+            for segment in segments:
+                if segment in known:
+                    hits[segment] = known[segment]
+                    continue
+                cached = self.lookup(segment)
+                if cached is not None:
+                    hits[segment] = cached
+            known.update(hits)
+            if not hits:
+                whole.add(field)
+                pending = [texts[field].strip()]
+            else:
+                pending = [segment for segment in segments if segment not in known]
+            units += [unit for unit in pending if unit not in units]
+
+        whole_units = {texts[field].strip() for field in whole}
+        reused = sum(1 for segment in known if segment not in units)
+        self.reused += reused
+        new_segments = sum(1 for unit in units if unit not in whole_units)
+        print(f"  🧩 翻譯記憶: 複用 {reused} 個句段，新句段 {new_segments} 個，整段翻譯 {len(whole)} 個字段")
+
+        replies: Dict[str, str] = {}
+        if units:
+            keys = {f"s{i + 1}": unit for i, unit in enumerate(units)}
+            answers = translate_batch(keys)
+            for key, unit in keys.items():
+                translation = answers.get(key)
+                if not translation or translation.startswith(FAILED_PREFIX):
+                    self.failed += 1
+                    continue
+                replies[unit] = translation
+                self.translated += 1
+                # 整段发送的字段由调用方按字段缓存；句段存入翻译记忆
+                if unit not in whole_units:
+                    self.store(unit, translation)
+
+        results = {}
+        for field, (segments, separators) in structures.items():
+            if field in whole:
+                translation = replies.get(texts[field].strip())
+                results[field] = translation if translation else f"{FAILED_PREFIX} {texts[field]}"
+                continue
+            translated = [known.get(segment) or replies.get(segment) for segment in segments]
+            if all(translated):
+                results[field] = join_segments(translated, separators)
+            else:
+                # 与逐字段翻译一致：整个字段记为失败，不混入未翻译的原文
+                results[field] = f"{FAILED_PREFIX} {texts[field]}"
+        return results
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+HTTP Transport
+~~~~~~~~~~~~~~
+
+抓取器与 Leonardo.AI 生成器共用的 HTTP 传输层。
+
+- 每个主机一个 requests.Session，连接池保持 keep-alive，避免每次请求重新握手
+- 每个主机的连接数有上限（连接池满时等待空闲连接）
+- 所有请求都有默认超时
+- 429 / 5xx 与连接错误按指数退避 + 随机抖动重试，并遵守 Retry-After
+- 可选的截止时间（deadline）：包括重试在内，整个请求不超过调用方的时间预算
+
+Usage:
+    from ihds.transport import get_transport
+
+    http = get_transport()
+    response = http.get("https://ihdschool.com/the-daily-view")
+    response = http.post(url, json=payload, idempotent=True)
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 会重试的 HTTP 状态码
+RETRY_STATUS = frozenset([429, 500, 502, 503, 504])
+
+# 幂等方法：5xx 与连接错误时可以安全重试
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+
+class HttpTransport:
+    """带连接池、默认超时和退避重试的 HTTP 传输层（线程安全）"""
+
+    def __init__(
+        self,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 30,
+        per_host_connections: int = 4
+    ):
+        """
+        Args:
+            timeout: 默认超时（秒），调用时可通过 timeout 参数覆盖
+            max_retries: 最多重试次数
+            backoff: 第一次重试的基础等待时间（秒），之后每次翻倍
+            max_backoff: 单次等待时间上限（秒）
+            per_host_connections: 每个主机的最大连接数
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.per_host_connections = per_host_connections
+
+        # 累计重试次数（按主机统计）
+        self.retry_counts: Dict[str, int] = {}
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def session(self, host: str) -> requests.Session:
+        """返回指定主机的 Session（首次使用时创建）"""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.per_host_connections,
+                    pool_block=True
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        retries: Optional[int] = None,
+        deadline: Optional[float] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        发送请求
+
+        Args:
+            method: HTTP 方法
+            url: 请求地址
+            idempotent: 请求是否可安全重放（默认按方法判断，POST 为 False）；
+                        非幂等请求只在 429 时重试
+            retries: 本次请求的最多重试次数（默认使用 max_retries）
+            deadline: 绝对截止时间（time.monotonic()）；每次尝试的超时不超过剩余时间，
+                      退避等待会超过截止时间时不再重试，截止时间已过时抛出 requests.Timeout
+            **kwargs: 传给 requests.Session.request 的其他参数
+
+        Returns:
+            最后一次请求的响应（不会对 4xx/5xx 抛出异常，由调用方处理）
+        """
+        method = method.upper()
+        host = urlsplit(url).netloc
+        session = self.session(host)
+        timeout = kwargs.pop('timeout', self.timeout)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        max_retries = self.max_retries if retries is None else retries
+
+        attempt = 0
+        while True:
+            kwargs['timeout'] = timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"{method} {url}: 已超過截止時間")
+                kwargs['timeout'] = min(timeout, remaining)
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or attempt >= max_retries:
+                    raise
+                delay = self._retry_delay(attempt, None)
+                if not self._in_time(delay, deadline):
+                    raise
+                self._sleep_before_retry(host, delay)
+                attempt += 1
+                continue
+
+            retryable = response.status_code == 429 or (
+                idempotent and response.status_code in RETRY_STATUS
+            )
+            if not retryable or attempt >= max_retries:
+                return response
+
+            delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+            if not self._in_time(delay, deadline):
+                return response
+            response.close()
+            self._sleep_before_retry(host, delay)
+            attempt += 1
+
+    @staticmethod
+    def _in_time(delay: float, deadline: Optional[float]) -> bool:
+        """退避等待后是否仍在截止时间之前"""
+        return deadline is None or time.monotonic() + delay < deadline
+
+    def _sleep_before_retry(self, host: str, delay: float):
+        """记录一次重试并等待"""
+        with self._lock:
+            self.retry_counts[host] = self.retry_counts.get(host, 0) + 1
+        time.sleep(delay)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """指数退避 + 随机抖动；服务器给出 Retry-After（秒）时以其为准"""
+        delay = None
+        if retry_after:
+            try:
+                delay = min(float(retry_after), self.max_backoff)
+            except ValueError:
+                delay = None
+        if delay is None:
+            # 等待时间在 [base/2, base] 之间随机，避免多个客户端同时重试
+            base = min(self.max_backoff, self.backoff * (2 ** attempt))
+            delay = base / 2 + random.uniform(0, base / 2)
+        return delay
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """关闭所有 Session"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """返回进程内共享的默认传输层"""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
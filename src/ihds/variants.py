@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Image Variants
+~~~~~~~~~~~~~~
+
+为 Gate_Rave_Mandala_Collection 中的图片预先生成缩略图和 WebP 等较小的变体：
+
+- thumb   240px JPEG   Gate 索引页的缩略图
+- email   640px JPEG   订阅源 / 邮件（邮件客户端对 WebP 支持不好）
+- web     960px WebP   静态网站的每日页面
+
+变体保存在 Gate_Rave_Mandala_Collection/variants/ 下，文件名只取决于源文件和用途
+（variant_name()，例如 variants/Gate-58-960w.webp、variants/mandalas/<sha256>-960w.webp），
+不会放大小于目标宽度的图片。output/.cache/image_variants.json 记录每个源文件的 sha256：
+源文件变化时重新生成，已删除的源文件的变体一并删除；多个源文件由多个进程并行处理。
+
+渲染时通过 resolver() 把原图文件名换成某个用途的变体。是否引用变体只看变体文件是否存在，
+与本地的 image_variants.json 无关：新检出的仓库与生成变体的机器渲染出相同的链接；
+变体还没有生成（例如 Pillow 未能安装）时仍引用原图。
+
+Usage:
+    from ihds.variants import ImageVariants
+
+    variants = ImageVariants("output/Gate_Rave_Mandala_Collection", "output/.cache/image_variants.json")
+    variants.sync(workers=4)
+    variants.resolve("Gate-58.jpg", 'web')   # "variants/Gate-58-960w.webp"
+"""
+
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .storage import atomic_write_bytes, atomic_write_json
+
+try:
+    from PIL import Image
+except ImportError:  # requirements.txt 中的依赖；未安装时不生成变体，只引用原图
+    Image = None
+
+
+VARIANTS_VERSION = 1
+
+# 变体所在的子目录（相对于图片收藏目录）
+VARIANTS_DIR = "variants"
+
+
+class Variant(NamedTuple):
+    """一种图片变体"""
+    width: int
+    format: str    # 'jpg' / 'webp'
+    quality: int
+
+
+VARIANTS = {
+    'thumb': Variant(240, 'jpg', 80),
+    'email': Variant(640, 'jpg', 82),
+    'web': Variant(960, 'webp', 80),
+}
+
+# 需要生成变体的源文件（相对于图片收藏目录）；旧归档的 Gate-{n}-Rave-Mandala.png
+# 只被已有的归档引用，继续引用原图，不为它们生成变体
+SOURCE_PATTERNS = ("Gate-*.jpg", "mandalas/*.png")
+
+
+def available() -> bool:
+    """是否安装了 Pillow"""
+    return Image is not None
+
+
+def variant_name(source: str, variant: str) -> str:
+    """源文件名 -> 变体文件名（相对于图片收藏目录）"""
+    spec = VARIANTS[variant]
+    stem = source.rsplit('.', 1)[0]
+    return f"{VARIANTS_DIR}/{stem}-{spec.width}w.{spec.format}"
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_variants(
+    collection_dir: str, source: str, names: Tuple[str, ...] = tuple(VARIANTS)
+) -> Tuple[str, Dict[str, str], Optional[str]]:
+    """
+    生成一个源文件的变体（在子进程中运行）
+
+    源图片窄于目标宽度时不放大；每种变体都写到自己的 variant_name()，
+    链接因此不需要记录就能推算出来。
+
+    Args:
+        names: 要生成的变体（VARIANTS 中的名称）
+
+    Returns:
+        (源文件名, 变体 -> 文件名, 错误信息)
+    """
+    collection = Path(collection_dir)
+    try:
+        with Image.open(collection / source) as image:
+            image.load()
+            resample = getattr(Image, 'Resampling', Image).LANCZOS
+            files = {}
+            for name in names:
+                spec = VARIANTS[name]
+                width = min(spec.width, image.width)
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), resample) if width != image.width else image.copy()
+                buffer = io.BytesIO()
+                if spec.format == 'jpg':
+                    if resized.mode in ('RGBA', 'LA', 'P'):
+                        # JPEG 不支持透明：铺在白色背景上
+                        rgba = resized.convert('RGBA')
+                        flattened = Image.new('RGB', rgba.size, (255, 255, 255))
+                        flattened.paste(rgba, mask=rgba.split()[-1])
+                        resized = flattened
+                    elif resized.mode != 'RGB':
+                        resized = resized.convert('RGB')
+                    resized.save(buffer, 'JPEG', quality=spec.quality, optimize=True, progressive=True)
+                else:
+                    resized.save(buffer, 'WEBP', quality=spec.quality, method=4)
+                files[name] = variant_name(source, name)
+                atomic_write_bytes(collection / files[name], buffer.getvalue())
+        return source, files, None
+    except Exception as e:
+        return source, {}, f"{type(e).__name__}: {e}"
+
+
+class ImageVariants:
+    """图片变体的生成与查找"""
+
+    def __init__(self, collection_dir, state_path):
+        """
+        Args:
+            collection_dir: 图片收藏目录（output/Gate_Rave_Mandala_Collection）
+            state_path: 源文件哈希记录（output/.cache/image_variants.json）
+        """
+        self.collection_dir = Path(collection_dir)
+        self.state_path = Path(state_path)
+        # 源文件名 -> {"sha256", "variants": {变体: 文件名}}
+        self.sources: Dict[str, Dict[str, object]] = self._load_state()
+
+    def _load_state(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get('version') != VARIANTS_VERSION:
+            return {}
+        return state.get('sources', {})
+
+    def _save_state(self):
+        atomic_write_json(self.state_path, {
+            'version': VARIANTS_VERSION,
+            'sources': dict(sorted(self.sources.items())),
+        })
+
+    def list_sources(self) -> List[str]:
+        """图片收藏目录中需要生成变体的源文件"""
+        names = set()
+        for pattern in SOURCE_PATTERNS:
+            names.update(path.relative_to(self.collection_dir).as_posix() for path in self.collection_dir.glob(pattern))
+        return sorted(names)
+
+    def sync(
+        self,
+        names: Optional[Iterable[str]] = None,
+        workers: int = None,
+        force: bool = False,
+        variants: Iterable[str] = tuple(VARIANTS)
+    ) -> Dict[str, int]:
+        """
+        为新增或变化的源文件生成变体，删除已不存在的源文件的变体
+
+        Args:
+            names: 只处理这些源文件（默认整个图片收藏目录，并清理已删除的源文件）
+            workers: 进程数（默认 CPU 核数；1 表示在当前进程中处理）
+            force: 忽略哈希记录，全部重新生成
+            variants: 只生成这些用途的变体（每日运行只生成 Markdown 引用的那一种）
+
+        Returns:
+            统计：built / skipped / removed / failed（未安装 Pillow 时全部为 0）
+        """
+        stats = {'built': 0, 'skipped': 0, 'removed': 0, 'failed': 0}
+        if not available():
+            return stats
+
+        wanted = tuple(variants)
+        full_scan = names is None
+        names = self.list_sources() if full_scan else [name for name in names if name]
+        changed = False
+        if full_scan:
+            existing = set(names)
+            for source in sorted(set(self.sources) - existing):
+                for file in self.sources.pop(source).get('variants', {}).values():
+                    path = self.collection_dir / file
+                    if path.exists():
+                        path.unlink()
+                stats['removed'] += 1
+                changed = True
+
+        pending = {}
+        for source in names:
+            path = self.collection_dir / source
+            if not path.exists():
+                continue
+            digest = _file_sha256(path)
+            entry = self.sources.get(source)
+            if (
+                not force and entry and entry.get('sha256') == digest
+                and all(self.has_variant(source, name) for name in wanted)
+            ):
+                stats['skipped'] += 1
+                continue
+            pending[source] = digest
+
+        if pending:
+            workers = min(workers or os.cpu_count() or 1, len(pending))
+            if workers == 1:
+                results = [build_variants(str(self.collection_dir), source, wanted) for source in pending]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(
+                        build_variants, [str(self.collection_dir)] * len(pending), list(pending),
+                        [wanted] * len(pending)
+                    ))
+            for source, files, error in results:
+                if error:
+                    print(f"   ⚠️ {source}: {error}")
+                    stats['failed'] += 1
+                    continue
+                # 源文件未变化时保留这次没有生成的其他用途；源文件变化后它们已过期，删除
+                old = self.sources.get(source, {})
+                old_files = old.get('variants', {})
+                kept = dict(old_files) if old.get('sha256') == pending[source] else {}
+                kept.update(files)
+                for file in set(old_files.values()) - set(kept.values()):
+                    path = self.collection_dir / file
+                    if path.exists():
+                        path.unlink()
+                self.sources[source] = {'sha256': pending[source], 'variants': kept}
+                stats['built'] += 1
+                changed = True
+
+        if changed:
+            self._save_state()
+        return stats
+
+    def has_variant(self, source: str, variant: str) -> bool:
+        """某个用途的变体文件是否存在（只看磁盘，不看哈希记录）"""
+        return (self.collection_dir / variant_name(source, variant)).exists()
+
+    def resolve(self, source: str, variant: str) -> str:
+        """
+        某个用途引用的文件名（相对于图片收藏目录）
+
+        Args:
+            source: 原图文件名，例如 "Gate-58.jpg"
+            variant: VARIANTS 中的名称
+
+        Returns:
+            变体文件存在时为变体文件名，否则为原图文件名
+        """
+        return variant_name(source, variant) if self.has_variant(source, variant) else source
+
+    def resolver(self, variant: str) -> Callable[[str], str]:
+        """供 Renderer(image_files=...) 使用的查找函数"""
+        return lambda source: self.resolve(source, variant)
+
+    def files(self, variant: str) -> Dict[str, str]:
+        """磁盘上已有的某个用途的变体：原图文件名 -> 变体文件名（与 resolve 一致，可传给子进程）"""
+        return {
+            source: variant_name(source, variant)
+            for source in self.list_sources()
+            if self.has_variant(source, variant)
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """已生成变体的源文件数与变体总大小（字节）"""
+        files = {file for entry in self.sources.values() for file in entry.get('variants', {}).values()}
+        return {
+            'sources': len(self.sources),
+            'variants': len(files),
+            'bytes': sum((self.collection_dir / file).stat().st_size for file in files if (self.collection_dir / file).exists()),
+        }
@@ -0,0 +1,11 @@
+"""
+测试配置：从仓库的 src/ 导入 ihds（与 main.py 相同，不需要安装）
+
+运行：python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
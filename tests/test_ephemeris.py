@@ -0,0 +1,114 @@
+"""
+星历（ihds.ephemeris）：太阳黄经、Gate.Line 与换 Line 时间
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ihds.ephemeris import (
+    LINE_WIDTH,
+    MANDALA_START,
+    _line_index,
+    active_transit,
+    archive_date,
+    gate_line_at,
+    sun_longitude,
+    transits_on,
+)
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+# 二分二至点（天文台公布的时间，精确到分钟）与当时的太阳视黄经
+SEASONS = [
+    (utc(2024, 3, 20, 3, 6), 0.0),
+    (utc(2024, 6, 20, 20, 51), 90.0),
+    (utc(2024, 9, 22, 12, 44), 180.0),
+    (utc(2024, 12, 21, 9, 21), 270.0),
+]
+
+# 固定的换 Line 时间（本模块计算的结果；改动公式导致偏移超过误差范围时需要重新核对）
+KNOWN_TRANSITS = [
+    (utc(2024, 3, 20, 3, 6), 25, 2, utc(2024, 3, 19, 7, 25, 58), utc(2024, 3, 20, 6, 4, 17)),
+    (utc(2026, 1, 7, 12, 0), 54, 3, utc(2026, 1, 7, 7, 23, 33), utc(2026, 1, 8, 5, 28, 9)),
+    (utc(2025, 12, 27, 0, 0), 58, 2, utc(2025, 12, 26, 8, 23, 42), utc(2025, 12, 27, 6, 28, 37)),
+]
+
+# 历史归档中的日期目录（北京时间）：当天太阳经过的 Line 中应包含归档的 Gate.Line
+ARCHIVED_DAYS = [
+    ("2025-12-27", "58.3"),
+    ("2026-01-06", "54.1"),
+    ("2026-01-07", "54.2"),
+]
+
+
+@pytest.mark.parametrize("when, longitude", SEASONS)
+def test_sun_longitude_at_equinoxes_and_solstices(when, longitude):
+    # 低精度公式的误差约 0.01°
+    assert abs((sun_longitude(when) - longitude + 180) % 360 - 180) < 0.01
+
+
+def test_gate_line_at_mandala_start():
+    assert gate_line_at(MANDALA_START) == (41, 1)
+    assert gate_line_at(MANDALA_START + LINE_WIDTH) == (41, 2)
+    assert gate_line_at(MANDALA_START - LINE_WIDTH / 2) == (60, 6)
+    assert gate_line_at(0.0) == (25, 2)
+
+
+@pytest.mark.parametrize("when, gate, line, start, end", KNOWN_TRANSITS)
+def test_known_transits(when, gate, line, start, end):
+    transit = active_transit(when)
+    assert (transit.gate, transit.line) == (gate, line)
+    # 误差约 15 分钟；这里允许 1 分钟，捕捉公式或迭代的意外改动
+    assert abs(transit.start - start) <= timedelta(minutes=1)
+    assert abs(transit.end - end) <= timedelta(minutes=1)
+
+
+@pytest.mark.parametrize("date, gate_line", ARCHIVED_DAYS)
+def test_archived_days(date, gate_line):
+    assert gate_line in [transit.gate_line for transit in transits_on(date)]
+
+
+def test_consecutive_transits_tile():
+    """一年中相邻的 Line 首尾相接，每个时段的起点在该 Line 中、前一秒不在"""
+    when = utc(2025, 1, 1)
+    transit = active_transit(when)
+    previous = None
+    for _ in range(390):
+        assert transit.start <= when < transit.end
+        assert transit.end - transit.start > timedelta(hours=20)
+        index = _line_index(sun_longitude(transit.start))
+        assert gate_line_at(sun_longitude(transit.start)) == (transit.gate, transit.line)
+        assert _line_index(sun_longitude(transit.start - timedelta(seconds=1))) == (index - 1) % 384
+        if previous is not None:
+            assert transit.start == previous.end
+            assert (index - _line_index(sun_longitude(previous.start))) % 384 == 1
+        # 从时段中间和终点前一秒查询得到同一个时段（不依赖 start <= when 的修正）
+        middle = transit.start + (transit.end - transit.start) / 2
+        assert active_transit(middle) == transit
+        assert active_transit(transit.end - timedelta(seconds=1)) == transit
+        previous = transit
+        when = transit.end
+        transit = active_transit(when)
+    # 390 条 Line 超过一整圈（384 条）
+    assert transit.start > utc(2026, 1, 1)
+
+
+def test_transits_on_covers_the_day():
+    tz = timezone(timedelta(hours=8))
+    transits = transits_on("2026-01-07", tz)
+    day_start = datetime(2026, 1, 7, tzinfo=tz)
+    assert transits[0].start <= day_start < transits[0].end
+    assert transits[-1].end >= day_start + timedelta(days=1)
+    for earlier, later in zip(transits, transits[1:]):
+        assert earlier.end == later.start
+
+
+def test_archive_date_uses_the_archive_timezone():
+    # 北京时间已经是第二天，UTC 仍是前一天
+    assert archive_date(utc(2026, 1, 6, 17, 30)) == "2026-01-07"
+    assert archive_date(utc(2026, 1, 6, 15, 59)) == "2026-01-06"
+    assert archive_date(utc(2026, 1, 6, 17, 30), timezone.utc) == "2026-01-06"
@@ -0,0 +1,81 @@
+"""
+流式 Daily View 解析（ihds.extractor）与 BeautifulSoup 实现的对照
+"""
+
+from pathlib import Path
+
+from ihds import DailyViewFetcher
+from ihds.extractor import DailyViewExtractor, extract_daily_view
+from ihds.inline_image import SPOOLED_PLACEHOLDER
+
+PAGE = (Path(__file__).parent / 'fixtures' / 'daily_view.html').read_text(encoding='utf-8')
+
+
+class FakeResponse:
+    """按固定大小分块返回页面的假响应（对应 requests 的 stream=True）"""
+
+    status_code = 200
+    encoding = 'utf-8'
+    headers = {'ETag': '"v1"'}
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=None):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+
+class FakeTransport:
+    def __init__(self, response):
+        self.response = response
+        self.retry_counts = {}
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def soup_content(page_html):
+    return DailyViewFetcher.parse_content_soup(None, page_html)
+
+
+def test_extractor_matches_soup_parser():
+    content = extract_daily_view(PAGE)
+    assert content == soup_content(PAGE)
+    assert content['gate_title'] == 'Gate 61 - Inner Truth'
+    assert content['main_description'].count('\n\n') == 2
+    assert content['exaltation'].startswith('Pluto exalted.')
+
+
+def test_incremental_feed_matches_whole_page():
+    expected = extract_daily_view(PAGE)
+    for size in (1, 7, 64, 4096):
+        extractor = DailyViewExtractor()
+        for start in range(0, len(PAGE), size):
+            extractor.feed(PAGE[start:start + size])
+        assert extractor.result() == expected
+
+
+def test_download_loop_parses_while_streaming(tmp_path, monkeypatch):
+    fetcher = DailyViewFetcher('key', output_dir=str(tmp_path))
+    fetcher.http = FakeTransport(FakeResponse(PAGE.encode('utf-8'), chunk_size=50))
+    page_html = fetcher.fetch_page(conditional=False)
+    assert SPOOLED_PLACEHOLDER in page_html
+
+    # 下载时已经解析完成：parse_content 不再解析同一页面
+    import ihds.fetcher
+    monkeypatch.setattr(ihds.fetcher, 'extract_daily_view', None)
+    content = fetcher.parse_content(page_html)
+    assert content == soup_content(page_html)
+    assert content['rave_mandala_b64'] == SPOOLED_PLACEHOLDER
+    fetcher._discard_spool()
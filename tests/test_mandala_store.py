@@ -0,0 +1,118 @@
+"""
+Rave Mandala 图片库（ihds.mandala_store）：无损重新压缩与按内容去重
+"""
+
+import struct
+import zlib
+
+import pytest
+
+from ihds.mandala_store import PNG_SIGNATURE, MandalaStore, _chunks, _paeth, optimize_png
+
+
+WIDTH, HEIGHT = 7, 5
+
+
+def chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+
+def rgba_rows():
+    return [
+        bytes((x * 37 + y * 11 + c * 29) * (y + 1) % 256 for x in range(WIDTH) for c in range(4))
+        for y in range(HEIGHT)
+    ]
+
+
+def filter_row(kind: int, row: bytes, previous: bytes, bpp: int) -> bytes:
+    """按 PNG 规范对一行做滤波（编码方向）"""
+    out = bytearray()
+    for i, value in enumerate(row):
+        left = row[i - bpp] if i >= bpp else 0
+        up = previous[i]
+        up_left = previous[i - bpp] if i >= bpp else 0
+        predictor = (0, left, up, (left + up) >> 1, _paeth(left, up, up_left))[kind]
+        out.append((value - predictor) & 0xFF)
+    return bytes([kind]) + bytes(out)
+
+
+def encode(rows, filters, bpp=4, color_type=6, level=6, idat_parts=1, extra=()):
+    """生成 PNG：每行按 filters 选择滤波，IDAT 拆成 idat_parts 块，extra 为 IHDR 之后的其他块"""
+    ihdr = struct.pack('>IIBBBBB', WIDTH, HEIGHT, 8, color_type, 0, 0, 0)
+    previous = bytes(len(rows[0]))
+    scanlines = b''
+    for y, row in enumerate(rows):
+        scanlines += filter_row(filters[y % len(filters)], row, previous, bpp)
+        previous = row
+    compressed = zlib.compress(scanlines, level)
+    size = -(-len(compressed) // idat_parts)
+    idats = [compressed[i:i + size] for i in range(0, len(compressed), size)]
+    return (
+        PNG_SIGNATURE + chunk(b'IHDR', ihdr) + b''.join(chunk(kind, body) for kind, body in extra)
+        + b''.join(chunk(b'IDAT', idat) for idat in idats) + chunk(b'IEND', b'')
+    )
+
+
+def decoded(png: bytes):
+    chunks = _chunks(png)
+    scanlines = zlib.decompress(b''.join(body for kind, body in chunks if kind == b'IDAT'))
+    return chunks, scanlines
+
+
+def test_round_trip_keeps_pixels_and_header():
+    palette = bytes(range(3 * 4))
+    transparency = bytes((0, 128, 255, 64))
+    rows = [bytes((x + y) % 4 for x in range(WIDTH)) for y in range(HEIGHT)]
+    original = encode(
+        rows, [0, 1, 2, 3, 4], bpp=1, color_type=3, level=1,
+        extra=[(b'PLTE', palette), (b'tRNS', transparency), (b'tEXt', b'Software\x00test'), (b'tIME', bytes(7))],
+    )
+    optimized, _ = optimize_png(original)
+
+    before, before_scanlines = decoded(original)
+    after, after_scanlines = decoded(optimized)
+    # 扫描行原样保留（包括每行的滤波类型），决定像素的块不变，元数据块去掉
+    assert after_scanlines == before_scanlines
+    for kind in (b'IHDR', b'PLTE', b'tRNS'):
+        assert [body for k, body in after if k == kind] == [body for k, body in before if k == kind]
+    assert [kind for kind, _ in after] == [b'IHDR', b'PLTE', b'tRNS', b'IDAT', b'IEND']
+
+
+def test_result_is_never_larger():
+    original = encode(rgba_rows(), [0], level=9)
+    optimized, _ = optimize_png(original)
+    assert len(optimized) <= len(original)
+    assert decoded(optimized)[1] == decoded(original)[1]
+
+
+@pytest.mark.parametrize("filters", [[1], [2], [3], [4], [4, 3, 2, 1, 0]])
+def test_key_ignores_filters_compression_and_metadata(filters):
+    rows = rgba_rows()
+    _, key = optimize_png(encode(rows, [0], level=9))
+    _, other = optimize_png(encode(rows, filters, level=1, idat_parts=3, extra=[(b'tEXt', b'Comment\x00x')]))
+    assert other == key
+
+
+def test_key_changes_with_pixels():
+    rows = rgba_rows()
+    changed = list(rows)
+    changed[2] = bytes([(changed[2][0] + 1) % 256]) + changed[2][1:]
+    assert optimize_png(encode(rows, [0]))[1] != optimize_png(encode(changed, [0]))[1]
+
+
+def test_store_dedupes_reencoded_charts(tmp_path):
+    store = MandalaStore(tmp_path)
+    rows = rgba_rows()
+    first = store.add_bytes(encode(rows, [0], level=9))
+    second = store.add_bytes(encode(rows, [4, 1], level=1, idat_parts=2))
+    assert first == second
+    assert first.startswith("mandalas/") and first.endswith(".png")
+    assert store.stats()['blobs'] == 1
+    assert decoded(store.path_of(first).read_bytes())[1] == decoded(encode(rows, [0], level=9))[1]
+
+
+def test_invalid_png_is_rejected():
+    with pytest.raises(ValueError):
+        optimize_png(b'not a png')
+    with pytest.raises(ValueError):
+        optimize_png(encode(rgba_rows(), [0])[:-20])
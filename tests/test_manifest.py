@@ -0,0 +1,99 @@
+"""
+归档索引（ihds.manifest）与按 Gate.Line 的重复检测
+"""
+
+from datetime import datetime, timezone
+
+from ihds import DailyViewFetcher
+from ihds.ephemeris import active_transit
+from ihds.manifest import ArchiveManifest
+
+
+def add_day(archive, name, langs=('en', 'zh')):
+    """创建一个日期目录（例如 2026-02-13-30.1），写入指定语言的 Markdown"""
+    day = archive / name
+    day.mkdir(parents=True)
+    date = name[:10]
+    for lang in langs:
+        (day / f"daily_view_{date}_{lang}.md").write_text(f"# {name} {lang}\n", encoding='utf-8')
+    return day
+
+
+def test_bootstrap_indexes_days_by_gate_line(tmp_path):
+    archive = tmp_path / 'daily_views'
+    add_day(archive, '2026-02-13-30.1')
+    add_day(archive, '2026-02-14-30.1')
+    add_day(archive, '2026-02-14-30.2', langs=('en',))
+    (archive / 'not-a-day').mkdir()
+
+    manifest = ArchiveManifest(tmp_path / '.cache' / 'manifest.json', archive)
+
+    assert sorted(manifest.days) == ['2026-02-13', '2026-02-14']
+    assert manifest.last_seen('30.1')[0] == '2026-02-14'
+    assert manifest.last_seen('30.1', before='2026-02-13')[0] == '2026-02-13'
+    assert manifest.last_seen('30.1', before='2026-02-12') is None
+    assert manifest.last_seen('31.1') is None
+    entry = manifest.get('2026-02-14', '30.2')
+    assert set(entry['artifacts']) == {'en'}
+    assert manifest.path_of(entry, 'en') == archive / '2026-02-14-30.2' / 'daily_view_2026-02-14_en.md'
+    assert [gate_line for _, gate_line, _ in manifest.for_gate('30')] == ['30.1', '30.1', '30.2']
+
+
+def test_updates_are_saved_and_picked_up_by_other_instances(tmp_path):
+    archive = tmp_path / 'daily_views'
+    path = tmp_path / '.cache' / 'manifest.json'
+    manifest = ArchiveManifest(path, archive)
+    other = ArchiveManifest(path, archive)
+    assert manifest.days == {}
+
+    manifest.update_day(add_day(archive, '2026-02-15-30.3'), latest=True)
+    manifest.save()
+
+    assert ArchiveManifest(path, archive).latest()[:2] == ('2026-02-15', '30.3')
+    # 常驻进程中的另一个实例看到文件变化后重新读取
+    assert other.last_seen('30.3') is None
+    assert other.reload_if_changed()
+    assert other.last_seen('30.3')[0] == '2026-02-15'
+    assert not other.reload_if_changed()
+
+
+def make_fetcher(tmp_path):
+    return DailyViewFetcher(
+        'key', output_dir=str(tmp_path / 'daily_views'), use_cache=False, use_corpus=False
+    )
+
+
+def check_duplicate(fetcher, date, gate_line):
+    fetcher.date_str = date
+    fetcher.gate_num, fetcher.line_num = gate_line.split('.')
+    fetcher.output_dir = fetcher.base_output_dir / f"{date}-{gate_line}"
+    return fetcher._check_duplicate()
+
+
+def test_duplicate_gate_line_within_the_window(tmp_path):
+    archive = tmp_path / 'daily_views'
+    add_day(archive, '2026-02-13-30.1')
+    add_day(archive, '2026-02-14-30.2', langs=('en',))
+    fetcher = make_fetcher(tmp_path)
+
+    # Gate.Line 跨日：第二天视为重复，返回已有的英文版
+    assert check_duplicate(fetcher, '2026-02-14', '30.1') == archive / '2026-02-13-30.1' / 'daily_view_2026-02-13_en.md'
+    assert check_duplicate(fetcher, '2026-02-20', '30.1') is not None
+    # 超出窗口、只有英文版、从未出现过的 Gate.Line 都需要抓取
+    assert check_duplicate(fetcher, '2026-02-21', '30.1') is None
+    assert check_duplicate(fetcher, '2026-02-14', '30.2') is None
+    assert check_duplicate(fetcher, '2026-02-14', '30.3') is None
+    # 只看不晚于当天的记录
+    assert check_duplicate(fetcher, '2026-02-12', '30.1') is None
+
+
+def test_check_due_follows_the_ephemeris_and_the_manifest(tmp_path):
+    now = datetime(2026, 2, 14, 4, 0, tzinfo=timezone.utc)   # 北京时间 2026-02-14 12:00
+    gate_line = active_transit(now).gate_line
+    fetcher = make_fetcher(tmp_path)
+
+    due, transit = fetcher.check_due(now)
+    assert due and transit.gate_line == gate_line
+
+    fetcher.manifest.update_day(add_day(fetcher.base_output_dir, f"2026-02-13-{gate_line}"))
+    assert fetcher.check_due(now) == (False, transit)
@@ -0,0 +1,191 @@
+"""
+阶段流水线（ihds.pipeline）与抓取器的单独重跑（--stage）
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from ihds import DailyViewFetcher
+from ihds.pipeline import Pipeline, PipelineHalt, Stage
+
+PAGE = (Path(__file__).parent / 'fixtures' / 'daily_view.html').read_text(encoding='utf-8')
+
+
+class Recorder:
+    """记录阶段的开始与结束顺序"""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def stage(self, name, result=None, delay=0.0):
+        def run(*args):
+            with self.lock:
+                self.events.append(('start', name, args))
+            time.sleep(delay)
+            with self.lock:
+                self.events.append(('end', name))
+            return result if result is not None else name
+        return run
+
+    def started(self):
+        return [event[1] for event in self.events if event[0] == 'start']
+
+    def args(self, name):
+        return next(event[2] for event in self.events if event[:2] == ('start', name))
+
+    def index(self, kind, name):
+        return self.events.index(next(event for event in self.events if event[:2] == (kind, name)))
+
+
+def diamond(recorder, **delays):
+    """fetch -> parse -> (translate, render_en) -> latest"""
+    return Pipeline([
+        Stage('fetch', recorder.stage('fetch', 'html'), outputs=('page',)),
+        Stage('parse', recorder.stage('parse', 'content'), inputs=('page',), outputs=('en',)),
+        Stage('translate', recorder.stage('translate', 'zh', delays.get('translate', 0)), inputs=('en',), outputs=('zh',)),
+        Stage('render_en', recorder.stage('render_en', 'md', delays.get('render_en', 0)), inputs=('en',), outputs=('md',)),
+        Stage('latest', recorder.stage('latest'), inputs=('md',), outputs=('latest',), optional=('zh',)),
+    ])
+
+
+def test_stages_run_after_their_inputs_and_independent_ones_overlap():
+    recorder = Recorder()
+    pipeline = diamond(recorder, translate=0.2, render_en=0.2)
+    context = pipeline.run()
+
+    assert context['latest'] == 'latest'
+    assert recorder.args('parse') == ('html',)
+    assert recorder.args('latest') == ('md', 'zh')
+    assert recorder.index('end', 'parse') < recorder.index('start', 'translate')
+    # translate 与 render_en 同时运行
+    assert recorder.index('start', 'render_en') < recorder.index('end', 'translate')
+    assert recorder.index('start', 'translate') < recorder.index('end', 'render_en')
+    assert sorted(pipeline.completed) == sorted(['fetch', 'parse', 'translate', 'render_en', 'latest'])
+    assert pipeline.skipped == []
+
+
+def test_skip_passes_none_for_optional_inputs_and_skips_dependents():
+    recorder = Recorder()
+    pipeline = diamond(recorder)
+    pipeline.run(skip=['translate'])
+    assert recorder.args('latest') == ('md', None)
+
+    recorder = Recorder()
+    pipeline = diamond(recorder)
+    context = pipeline.run(skip=['render_en'])
+    # latest 的必需输入永远不会就绪
+    assert 'latest' not in recorder.started()
+    assert pipeline.skipped == ['render_en', 'latest']
+    assert 'latest' not in context
+
+
+def test_only_runs_upstream_and_stops_at_provided_inputs():
+    recorder = Recorder()
+    diamond(recorder).run(only=['render_en'])
+    assert recorder.started() == ['fetch', 'parse', 'render_en']
+
+    recorder = Recorder()
+    diamond(recorder).run({'en': 'stored content'}, only=['render_en'])
+    assert recorder.started() == ['render_en']
+    assert recorder.args('render_en') == ('stored content',)
+
+
+def test_stages_whose_outputs_are_provided_do_not_run():
+    recorder = Recorder()
+    diamond(recorder).run({'page': 'html', 'en': 'content'})
+    assert 'fetch' not in recorder.started() and 'parse' not in recorder.started()
+
+
+def test_after_orders_stages_without_passing_or_selecting_them():
+    recorder = Recorder()
+    pipeline = Pipeline([
+        Stage('images', recorder.stage('images', delay=0.2), outputs=('images',)),
+        Stage('render', recorder.stage('render'), outputs=('md',), after=('images',)),
+    ])
+    pipeline.run()
+    assert recorder.index('end', 'images') < recorder.index('start', 'render')
+    assert recorder.args('render') == ()
+
+    # 单独运行时不会因为 after 而运行 images
+    recorder = Recorder()
+    pipeline = Pipeline([
+        Stage('images', recorder.stage('images'), outputs=('images',)),
+        Stage('render', recorder.stage('render'), outputs=('md',), after=('images',)),
+    ])
+    pipeline.run(only=['render'])
+    assert recorder.started() == ['render']
+
+    with pytest.raises(ValueError):
+        Pipeline([Stage('render', recorder.stage('render'), after=('missing',))])
+
+
+def test_halt_ends_the_run_with_a_result():
+    recorder = Recorder()
+
+    def unchanged(page):
+        raise PipelineHalt('latest_en.md')
+
+    pipeline = Pipeline([
+        Stage('fetch', recorder.stage('fetch', 'html'), outputs=('page',)),
+        Stage('parse', unchanged, inputs=('page',), outputs=('en',)),
+        Stage('render', recorder.stage('render'), inputs=('en',), outputs=('md',)),
+    ])
+    context = pipeline.run()
+    assert pipeline.halted_by == 'parse'
+    assert context['result'] == 'latest_en.md'
+    assert recorder.started() == ['fetch']
+
+
+def test_invalid_declarations_are_rejected():
+    noop = Recorder().stage('noop')
+    with pytest.raises(ValueError):
+        Pipeline([Stage('a', noop), Stage('a', noop)])
+    with pytest.raises(ValueError):
+        Pipeline([Stage('a', noop, outputs=('x',)), Stage('b', noop, outputs=('x',))])
+    with pytest.raises(ValueError):
+        Pipeline([Stage('a', noop)]).run(only=['b'])
+
+
+class NoNetwork:
+    """抓取器的假传输层：任何请求都失败（图片下载失败不影响运行）"""
+
+    retry_counts = {}
+
+    def get(self, url, **kwargs):
+        raise ConnectionError(f"no network: {url}")
+
+    post = get
+
+
+def make_fetcher(tmp_path):
+    fetcher = DailyViewFetcher(
+        'key', output_dir=str(tmp_path / 'daily_views'), transport=NoNetwork(),
+        use_cache=False, use_corpus=False, batch_translate=False, translate_workers=1
+    )
+    fetcher.metrics_log_path = tmp_path / 'logs' / 'metrics.jsonl'
+    fetcher.metrics_textfile = tmp_path / 'logs' / 'metrics.prom'
+    return fetcher
+
+
+def test_stage_rerun_uses_the_saved_sidecar(tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    fetcher._chat_completion = lambda system_prompt, user_prompt, **kwargs: "譯文"
+    record = fetcher.run(page_html=PAGE)
+    assert record.zh_path.exists()
+    record.zh_path.unlink()
+
+    # 重跑 render_zh：中英文内容取自 content_{date}.json，不抓取页面、不请求翻译
+    rerun = make_fetcher(tmp_path)
+
+    def offline(*args, **kwargs):
+        raise AssertionError("不應訪問網絡")
+    rerun.fetch_page = offline
+    rerun._chat_completion = offline
+    rerun.run(stages=['render_zh'])
+
+    assert record.zh_path.exists()
+    assert "譯文" in record.zh_path.read_text(encoding='utf-8')
@@ -0,0 +1,116 @@
+"""
+编译后的渲染器（ihds.renderer）与原来逐段拼接的 Markdown 模板逐字节一致
+
+legacy_markdown 是 generate_markdown_en / generate_markdown_zh 改用 Renderer 之前的实现。
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from ihds import DailyViewFetcher
+from ihds.content import DailyViewContent
+from ihds.extractor import extract_daily_view
+from ihds.renderer import Renderer, RenderKey
+
+PAGE = (Path(__file__).parent / 'fixtures' / 'daily_view.html').read_text(encoding='utf-8')
+
+LEGACY_LABELS = {
+    'en': ("%B %d, %Y", "Gate", "Rave Mandala", "☀️ Exaltation:", "🌑 Detriment:"),
+    'zh': ("%Y年%m月%d日", "閘門", "人類圖曼陀羅", "☀️ 高階表達:", "🌑 低階表達:"),
+}
+
+
+def legacy_markdown(content, lang, date):
+    date_format, gate_label, mandala_label, exaltation_label, detriment_label = LEGACY_LABELS[lang]
+    date_display = date.strftime(date_format)
+    gate_image_file = content.get('gate_image_local', '')
+    rave_mandala_file = content.get('rave_mandala_local', '')
+    gate_image = f"../../Gate_Rave_Mandala_Collection/{gate_image_file}" if gate_image_file else ''
+    rave_mandala = f"../../Gate_Rave_Mandala_Collection/{rave_mandala_file}" if rave_mandala_file else ''
+
+    md = f"# {content.get('gate_title', '')}\n\n**{date_display}**\n\n"
+    if gate_image:
+        md += f"![{gate_label}]({gate_image})\n\n"
+    md += f"## *{content.get('gate_subtitle', '')}*\n\n> {content.get('lead_description', '')}\n\n"
+    if content.get('cross_info'):
+        md += f"### {content['cross_info']}\n\n"
+    if content.get('quarter_theme'):
+        md += f"*{content['quarter_theme']}*\n\n"
+    md += "---\n\n"
+    if content.get('main_description'):
+        md += f"{content['main_description']}\n\n"
+    if rave_mandala:
+        md += f"![{mandala_label}]({rave_mandala})\n\n"
+    md += "---\n\n"
+    if content.get('line_title'):
+        md += f"### {content['line_title']}\n\n"
+    if content.get('exaltation'):
+        md += f"**{exaltation_label}** {content['exaltation']}\n\n"
+    if content.get('detriment'):
+        md += f"**{detriment_label}** {content['detriment']}\n"
+    return md
+
+
+FULL = dict(
+    extract_daily_view(PAGE),
+    gate_image_local='Gate-61.jpg',
+    rave_mandala_local='mandalas/3f9a.png',
+)
+ZH = dict(
+    FULL,
+    gate_title='第 61 號閘門 - 內在真理',
+    lead_description='覺察普世的根本法則。',
+    main_description='第一段。\n\n第二段，含 *星號* 與 <標籤> & 符號。',
+)
+CASES = {
+    'full': FULL,
+    'zh_text': ZH,
+    'no_images': {key: value for key, value in FULL.items() if not key.endswith('_local')},
+    'optional_blocks_missing': {
+        'gate_title': 'Gate 1 - The Creative',
+        'gate_subtitle': 'Gate of Self-Expression',
+        'lead_description': 'Creation as a primal force.',
+        'gate_image_local': 'Gate-1.jpg',
+    },
+    'empty': {},
+}
+DATES = [datetime(2026, 1, 7), datetime(2026, 12, 31)]
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+@pytest.mark.parametrize('lang', ['en', 'zh'])
+@pytest.mark.parametrize('date', DATES)
+def test_markdown_matches_the_legacy_templates(name, lang, date):
+    content = CASES[name]
+    expected = legacy_markdown(content, lang, date)
+
+    generate = DailyViewFetcher.generate_markdown_en if lang == 'en' else DailyViewFetcher.generate_markdown_zh
+    assert generate(content, date).encode('utf-8') == expected.encode('utf-8')
+
+    rendered = Renderer().render({lang: DailyViewContent.from_dict(content)}, date)
+    assert rendered[RenderKey('md', lang, 2)] == expected
+    # latest 文件原来由日期目录的版本替换图片路径得到
+    assert rendered[RenderKey('md', lang, 1)] == expected.replace(
+        '../../Gate_Rave_Mandala_Collection/', '../Gate_Rave_Mandala_Collection/'
+    )
+
+
+def test_one_pass_renders_both_languages_and_every_format():
+    date = DATES[0]
+    rendered = Renderer().render({'en': FULL, 'zh': ZH}, date)
+    assert {(key.format, key.lang) for key in rendered} == {
+        (fmt, lang) for fmt in ('md', 'html', 'txt') for lang in ('en', 'zh')
+    }
+    assert rendered[RenderKey('md', 'zh', 2)] == legacy_markdown(ZH, 'zh', date)
+    # HTML 片段转义正文
+    assert '&lt;標籤&gt; &amp; 符號' in rendered[RenderKey('html', 'zh', 2)]
+
+
+def test_image_lookup_only_changes_image_paths():
+    date = DATES[0]
+    plain = Renderer().render({'en': FULL}, date)[RenderKey('md', 'en', 2)]
+    lookup = {'Gate-61.jpg': 'variants/Gate-61-640w.jpg'}
+    swapped = Renderer().render({'en': FULL}, date, image_files=lambda name: lookup.get(name, name))
+    assert swapped[RenderKey('md', 'en', 2)] == plain.replace('Gate-61.jpg', 'variants/Gate-61-640w.jpg')
@@ -0,0 +1,169 @@
+"""
+翻译：并发逐个翻译、批量翻译与截止时间（translate_content / _translate_fields / translate_batch）
+
+DeepSeek 请求由假的 _chat_completion 代替，不访问网络。
+"""
+
+import json
+import threading
+import time
+
+from ihds import DailyViewFetcher
+
+FIELDS = DailyViewFetcher.TRANSLATE_FIELDS
+
+
+def make_fetcher(tmp_path, **kwargs):
+    options = dict(use_cache=False, use_translation_memory=False, use_corpus=False, batch_translate=False)
+    options.update(kwargs)
+    return DailyViewFetcher('key', output_dir=str(tmp_path / 'daily_views'), **options)
+
+
+def fake_completion(delays=None, calls=None):
+    """逐个翻译的假请求：译文为 "譯:<原文>"；delays 为原文 -> 等待秒数"""
+    lock = threading.Lock()
+
+    def complete(system_prompt, user_prompt, max_tokens=2000, json_mode=False, timeout=60, deadline=None):
+        text = user_prompt.split('\n\n', 1)[1]
+        with lock:
+            if calls is not None:
+                calls.append(text)
+        time.sleep((delays or {}).get(text, 0))
+        return f"譯:{text}"
+    return complete
+
+
+def test_fields_are_translated_in_field_order(tmp_path):
+    fetcher = make_fetcher(tmp_path, translate_workers=4)
+    calls = []
+    fetcher._chat_completion = fake_completion(calls=calls)
+    content = {field: f"text of {field}" for field in FIELDS}
+    content['gate_image_filename'] = 'gate-61.jpg'
+
+    result = fetcher.translate_content(content)
+
+    assert list(result)[:len(FIELDS)] == FIELDS
+    assert all(result[field] == f"譯:text of {field}" for field in FIELDS)
+    # 不需要翻译的字段原样复制
+    assert result['gate_image_filename'] == 'gate-61.jpg'
+    assert sorted(calls) == sorted(content[field] for field in FIELDS)
+
+
+def test_fields_run_concurrently(tmp_path):
+    fetcher = make_fetcher(tmp_path, translate_workers=4)
+    texts = {field: f"text of {field}" for field in FIELDS[:4]}
+    fetcher._chat_completion = fake_completion(delays={text: 0.3 for text in texts.values()})
+
+    start = time.monotonic()
+    results = fetcher._translate_fields(texts)
+
+    assert time.monotonic() - start < 0.9
+    assert results == {field: f"譯:{text}" for field, text in texts.items()}
+
+
+def test_deadline_keeps_english_for_slow_fields(tmp_path):
+    fetcher = make_fetcher(tmp_path, translate_workers=4, translate_deadline=0.3)
+    texts = {'gate_title': 'fast', 'lead_description': 'slow'}
+    fetcher._chat_completion = fake_completion(delays={'slow': 2})
+
+    start = time.monotonic()
+    results = fetcher._translate_fields(texts)
+
+    assert time.monotonic() - start < 1
+    assert results == {'gate_title': '譯:fast', 'lead_description': '[翻译失败] slow'}
+
+
+def test_sequential_translation_stops_at_the_deadline(tmp_path):
+    fetcher = make_fetcher(tmp_path, translate_workers=1, translate_deadline=0.3)
+    calls = []
+    texts = {'gate_title': 'one', 'gate_subtitle': 'two', 'lead_description': 'three'}
+    fetcher._chat_completion = fake_completion(delays={'one': 0.2, 'two': 0.2}, calls=calls)
+
+    results = fetcher._translate_fields(texts)
+
+    assert calls == ['one', 'two']
+    assert results['lead_description'] == '[翻译失败] three'
+
+
+def test_request_errors_become_failed_fields(tmp_path):
+    fetcher = make_fetcher(tmp_path, translate_workers=4)
+
+    def complete(system_prompt, user_prompt, **kwargs):
+        if 'broken' in user_prompt:
+            raise RuntimeError('HTTP 500')
+        return '好'
+    fetcher._chat_completion = complete
+
+    results = fetcher._translate_fields({'gate_title': 'fine', 'gate_subtitle': 'broken'})
+
+    assert results == {'gate_title': '好', 'gate_subtitle': '[翻译失败] broken'}
+
+
+def fake_batch_completion(reply=None, error=None, delay=0, calls=None):
+    """批量请求返回 reply(texts) 或抛出 error；逐个翻译的请求与 fake_completion 相同"""
+    single = fake_completion(calls=calls)
+
+    def complete(system_prompt, user_prompt, max_tokens=2000, json_mode=False, timeout=60, deadline=None):
+        if not json_mode:
+            return single(system_prompt, user_prompt)
+        if calls is not None:
+            calls.append('<batch>')
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return reply(json.loads(user_prompt))
+    return complete
+
+
+def test_batch_translates_every_field_in_one_request(tmp_path):
+    fetcher = make_fetcher(tmp_path, batch_translate=True)
+    calls = []
+    fetcher._chat_completion = fake_batch_completion(
+        reply=lambda texts: json.dumps({key: f"批:{text}" for key, text in texts.items()}, ensure_ascii=False),
+        calls=calls
+    )
+    content = {field: f"text of {field}" for field in FIELDS}
+
+    result = fetcher.translate_content(content)
+
+    assert calls == ['<batch>']
+    assert all(result[field] == f"批:text of {field}" for field in FIELDS)
+
+
+def test_missing_batch_fields_fall_back_to_single_requests(tmp_path):
+    fetcher = make_fetcher(tmp_path, batch_translate=True)
+    calls = []
+    # 回复缺少一个字段，另一个字段为空字符串
+    fetcher._chat_completion = fake_batch_completion(
+        reply=lambda texts: json.dumps({'gate_title': '批:title', 'gate_subtitle': '  '}),
+        calls=calls
+    )
+
+    results = fetcher.translate_batch({'gate_title': 'title', 'gate_subtitle': 'subtitle', 'line_title': 'line'})
+
+    assert calls[0] == '<batch>'
+    assert sorted(calls[1:]) == ['line', 'subtitle']
+    assert results == {'gate_title': '批:title', 'gate_subtitle': '譯:subtitle', 'line_title': '譯:line'}
+
+
+def test_unparseable_batch_reply_falls_back_per_field(tmp_path):
+    fetcher = make_fetcher(tmp_path, batch_translate=True)
+    fetcher._chat_completion = fake_batch_completion(reply=lambda texts: 'not json')
+
+    results = fetcher.translate_batch({'gate_title': 'title', 'line_title': 'line'})
+
+    assert results == {'gate_title': '譯:title', 'line_title': '譯:line'}
+
+
+def test_batch_and_fallback_share_one_deadline(tmp_path):
+    fetcher = make_fetcher(tmp_path, batch_translate=True, translate_workers=1, translate_deadline=0.3)
+    calls = []
+    fetcher._chat_completion = fake_batch_completion(error=TimeoutError('slow batch'), delay=0.35, calls=calls)
+
+    start = time.monotonic()
+    results = fetcher.translate_batch({'gate_title': 'title', 'line_title': 'line'})
+
+    # 批量请求用完了截止时间：回退时不再逐个请求
+    assert time.monotonic() - start < 1
+    assert calls == ['<batch>']
+    assert results == {'gate_title': '[翻译失败] title', 'line_title': '[翻译失败] line'}
@@ -0,0 +1,72 @@
+"""
+持久化翻译缓存（ihds.translation_cache）与抓取器使用的缓存键
+"""
+
+from ihds import DailyViewFetcher
+from ihds.translation_cache import TranslationCache
+
+
+def test_key_covers_text_namespace_model_and_temperature():
+    key = TranslationCache.make_key("Gate 61", "prompt", "deepseek-chat", 0.3)
+    assert key == TranslationCache.make_key("Gate 61", "prompt", "deepseek-chat", 0.3)
+    assert len({
+        key,
+        TranslationCache.make_key("Gate 62", "prompt", "deepseek-chat", 0.3),
+        TranslationCache.make_key("Gate 61", "other prompt", "deepseek-chat", 0.3),
+        TranslationCache.make_key("Gate 61", "prompt", "deepseek-reasoner", 0.3),
+        TranslationCache.make_key("Gate 61", "prompt", "deepseek-chat", 0.7),
+    }) == 5
+    # 各部分之间有分隔符：拼接后相同的两组输入得到不同的键
+    assert TranslationCache.make_key("ab", "c", "m", 0) != TranslationCache.make_key("a", "bc", "m", 0)
+    # temperature 按浮点数计算：0 与 0.0 相同
+    assert TranslationCache.make_key("a", "b", "m", 0) == TranslationCache.make_key("a", "b", "m", 0.0)
+
+
+def test_cache_persists_and_evicts_least_recently_used(tmp_path):
+    path = tmp_path / "cache" / "translations.sqlite3"
+    cache = TranslationCache(path, max_entries=2)
+    cache.put("one", "ns", "m", 0.3, "一")
+    cache.put("two", "ns", "m", 0.3, "二")
+    assert cache.get("one", "ns", "m", 0.3) == "一"   # one 比 two 更近使用
+    cache.put("three", "ns", "m", 0.3, "三")
+    cache.close()
+
+    reopened = TranslationCache(path, max_entries=2)
+    assert reopened.get("one", "ns", "m", 0.3) == "一"
+    assert reopened.get("two", "ns", "m", 0.3) is None
+    assert reopened.get("three", "ns", "m", 0.3) == "三"
+    assert reopened.get("one", "other", "m", 0.3) is None
+    assert reopened.stats() == {"entries": 2, "max_entries": 2, "hits": 2, "misses": 2}
+    reopened.close()
+
+
+def test_fetcher_namespace_is_the_translation_prompt(tmp_path):
+    fetcher = DailyViewFetcher('key', output_dir=str(tmp_path / 'daily_views'), use_corpus=False)
+    assert fetcher.CACHE_NAMESPACE == fetcher.TRANSLATE_SYSTEM_PROMPT
+    # 批量提示词只是在翻译要求后追加输出格式，与逐个翻译共用缓存
+    assert fetcher.BATCH_SYSTEM_PROMPT.startswith(fetcher.CACHE_NAMESPACE)
+
+    fetcher._cache_put("Inner Truth", "內在真理")
+    assert fetcher.translation_cache.get(
+        "Inner Truth", fetcher.TRANSLATE_SYSTEM_PROMPT, fetcher.DEEPSEEK_MODEL, fetcher.TRANSLATE_TEMPERATURE
+    ) == "內在真理"
+    # 失败结果不缓存；归档译文在单独的命名空间，不会被当作模型译文
+    fetcher._cache_put("Mystery", "[翻译失败] Mystery")
+    fetcher._archived_put("Silence", "沉默")
+    assert fetcher._cache_get("Mystery") is None
+    assert fetcher._cache_get("Silence") is None
+    assert fetcher._archived_get("Silence") == "沉默"
+
+
+def test_cached_translation_skips_the_request(tmp_path):
+    fetcher = DailyViewFetcher('key', output_dir=str(tmp_path / 'daily_views'), use_corpus=False)
+    requests = []
+
+    def complete(system_prompt, user_prompt, **kwargs):
+        requests.append(user_prompt)
+        return "內在真理"
+    fetcher._chat_completion = complete
+
+    assert fetcher.translate_to_chinese("Inner Truth") == "內在真理"
+    assert fetcher.translate_to_chinese("Inner Truth") == "內在真理"
+    assert len(requests) == 1
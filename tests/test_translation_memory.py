@@ -0,0 +1,62 @@
+"""
+句段级翻译记忆（ihds.translation_memory）
+"""
+
+from ihds.translation_memory import FAILED_PREFIX, TranslationMemory, join_segments, split_segments
+
+
+def fake_batch(calls, fail=()):
+    """假的批量翻译：记录每次请求，译文为 "<原文>" 的中文标记；fail 中的原文不返回"""
+    def translate(texts):
+        calls.append(dict(texts))
+        return {key: f"譯[{text}]" for key, text in texts.items() if text not in fail}
+    return translate
+
+
+def memory_with(cache):
+    return TranslationMemory(lookup=cache.get, store=cache.__setitem__)
+
+
+def test_split_and_join_keep_newlines():
+    segments, separators = split_segments("A b. C d.\nE f!\n\nG h? I j.")
+    assert segments == ["A b.", "C d.", "E f!", "G h?", "I j."]
+    assert join_segments(segments, separators) == "A b.C d.\nE f!\n\nG h?I j."
+
+
+def test_field_without_known_segments_is_sent_whole():
+    cache = {}
+    calls = []
+    text = "First sentence. Second sentence.\nThird line."
+    result = memory_with(cache).translate({'body': text}, fake_batch(calls))
+    assert calls == [{'s1': text}]
+    assert result == {'body': f"譯[{text}]"}
+    # 整段的译文由调用方按字段缓存，不作为句段存入
+    assert cache == {}
+
+
+def test_known_segments_are_reused_and_separators_kept():
+    cache = {"Shared sentence.": "共用句。"}
+    calls = []
+    memory = memory_with(cache)
+    result = memory.translate({'body': "Shared sentence. New one.\n\nOther paragraph."}, fake_batch(calls))
+    assert calls == [{'s1': "New one.", 's2': "Other paragraph."}]
+    assert result['body'] == "共用句。譯[New one.]\n\n譯[Other paragraph.]"
+    assert cache["New one."] == "譯[New one.]"
+    assert (memory.reused, memory.translated, memory.failed) == (1, 2, 0)
+
+
+def test_failed_segment_fails_the_whole_field():
+    cache = {"Shared sentence.": "共用句。"}
+    text = "Shared sentence. Broken one. Fine one."
+    memory = memory_with(cache)
+    result = memory.translate({'body': text}, fake_batch([], fail={"Broken one."}))
+    assert result['body'] == f"{FAILED_PREFIX} {text}"
+    # 成功的句段仍然存入，失败的不计入已翻译
+    assert cache["Fine one."] == "譯[Fine one.]"
+    assert (memory.translated, memory.failed) == (1, 1)
+
+
+def test_failed_whole_field():
+    text = "Only new text."
+    result = memory_with({}).translate({'body': text}, fake_batch([], fail={text}))
+    assert result['body'] == f"{FAILED_PREFIX} {text}"
@@ -0,0 +1,52 @@
+"""
+图片变体（ihds.variants）：链接只取决于磁盘上的变体文件
+"""
+
+import pytest
+
+from ihds.variants import ImageVariants, available, variant_name
+
+pytestmark = pytest.mark.skipif(not available(), reason="需要 Pillow")
+
+
+def make_collection(tmp_path):
+    from PIL import Image
+
+    collection = tmp_path / "collection"
+    collection.mkdir()
+    Image.new('RGB', (800, 600), (200, 120, 40)).save(collection / "Gate-58.jpg")
+    Image.new('RGB', (100, 100), (10, 20, 30)).save(collection / "Gate-58-Rave-Mandala.png")
+    return collection
+
+
+def test_links_do_not_depend_on_local_state(tmp_path):
+    collection = make_collection(tmp_path)
+    variants = ImageVariants(collection, tmp_path / "state.json")
+    assert variants.resolve("Gate-58.jpg", 'email') == "Gate-58.jpg"
+
+    stats = variants.sync(workers=1, variants=('email',))
+    assert stats['built'] == 1
+    assert (collection / variant_name("Gate-58.jpg", 'email')).exists()
+    assert not (collection / variant_name("Gate-58.jpg", 'web')).exists()
+
+    # 新检出的仓库没有 image_variants.json：链接与生成变体的机器相同
+    fresh = ImageVariants(collection, tmp_path / "missing.json")
+    assert fresh.resolve("Gate-58.jpg", 'email') == "variants/Gate-58-640w.jpg"
+    assert fresh.resolve("Gate-58.jpg", 'web') == "Gate-58.jpg"
+    assert fresh.files('email') == {"Gate-58.jpg": "variants/Gate-58-640w.jpg"}
+
+
+def test_legacy_mandalas_keep_the_original(tmp_path):
+    collection = make_collection(tmp_path)
+    variants = ImageVariants(collection, tmp_path / "state.json")
+    variants.sync(workers=1)
+    assert variants.list_sources() == ["Gate-58.jpg"]
+    assert variants.resolve("Gate-58-Rave-Mandala.png", 'email') == "Gate-58-Rave-Mandala.png"
+
+
+def test_partial_sync_keeps_other_variants(tmp_path):
+    collection = make_collection(tmp_path)
+    variants = ImageVariants(collection, tmp_path / "state.json")
+    variants.sync(workers=1)
+    assert variants.sync(workers=1, variants=('email',))['skipped'] == 1
+    assert all(variants.has_variant("Gate-58.jpg", name) for name in ('thumb', 'email', 'web'))